@@ -27,6 +27,11 @@ setup(
     include_package_data=True,
     install_requires=["jsonschema[format]", "python-slugify", "six>=1.11.0"],
     tests_require=test_requirements,
+    entry_points={
+        "scrapy.commands": [
+            "validate = spidermon.contrib.scrapy.commands.validate:Command"
+        ]
+    },
     extras_require={
         # Specific monitors and tools to support notifications and reports
         "monitoring": [
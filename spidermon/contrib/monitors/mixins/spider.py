@@ -113,6 +113,4 @@ class SpiderMonitorMixin(StatsMonitorMixin, JobMonitorMixin):
 
     @property
     def responses(self):
-        if not hasattr(self, "_responses"):
-            self._responses = ResponsesInfo(self.stats)
-        return self._responses
+        return self._get_stats_view("responses", ResponsesInfo)
@@ -1,4 +1,5 @@
 from __future__ import absolute_import
+from spidermon.data import Data
 from spidermon.exceptions import NotConfigured
 
 
@@ -8,3 +9,20 @@ class StatsMonitorMixin(object):
         if not self.data.stats:
             raise NotConfigured("Stats not available!")
         return self.data.stats
+
+    def _get_stats_view(self, name, factory):
+        """
+        Returns ``factory(stats)``, that is computed only once for all the
+        monitors sharing the same stats.
+        """
+        stats = self.stats
+        if isinstance(stats, Data):
+            return stats.get_view(name, factory)
+        # Plain dicts are not shared, so views are kept by the monitor until
+        # it gets new stats
+        if getattr(self, "_stats_views_source", None) is not stats:
+            self._stats_views_source = stats
+            self._stats_views = {}
+        if name not in self._stats_views:
+            self._stats_views[name] = factory(stats)
+        return self._stats_views[name]
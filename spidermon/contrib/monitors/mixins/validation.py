@@ -7,7 +7,10 @@ from spidermon.contrib.stats.counters import (
     AttributeDictPercentCounter,
 )
 from spidermon.contrib.stats.analyzer import StatsAnalyzer
-from spidermon.contrib.scrapy.stats import STATS_DEFAULT_VALIDATION_PREFIX
+from spidermon.contrib.scrapy.stats import (
+    STATS_DEFAULT_VALIDATION_PREFIX,
+    get_validation_counters,
+)
 
 from .stats import StatsMonitorMixin
 
@@ -16,7 +19,7 @@ class MetaDictPercentCounter(DictPercentCounter):
     def add_values(self, key, subkey, value):
         if key not in self._dict:
             self._create_item(key)
-        self[key].add_value(subkey, value)
+        self._dict[key].add_value(subkey, value)
 
 
 class ErrorsDictPercentCounter(AttributeDictPercentCounter):
@@ -51,15 +54,49 @@ class ItemsInfo(object):
 
 
 class ValidationInfo(object):
-    def __init__(self, stats, prefix=None):
-        self.analyzer = StatsAnalyzer(
+    """
+    Validation counts of the ``stats``. If the ``counters`` kept in memory
+    by the stats manager that wrote them are given (see
+    ``get_validation_counters``) and have the same counts as the stats (or
+    ``check_counters`` is ``False``), the counts are read from them instead
+    of parsing the names of the stats.
+    Counters can be ahead of the stats if these are only written
+    periodically, then the stats are used.
+
+    ``types`` has the same information for each item type, by the name of
+    the type in the stats. It is read from the ``counters`` of each type
+    if the ones of all the items are used, so the stats of each type are
+    only needed otherwise.
+
+    Samples of the errors are only available from the ``counters`` (see
+    ``get_error_samples``).
+    """
+
+    def __init__(
+        self, stats, prefix=None, counters=None, analyzer=None, check_counters=True
+    ):
+        self.analyzer = analyzer or StatsAnalyzer(
             stats=stats, prefix=prefix or STATS_DEFAULT_VALIDATION_PREFIX
         )
+        self._types = None
+        self._error_samples = counters.error_samples if counters is not None else {}
 
         # items
-        items_count = sum(self.analyzer.search("items$").values())
-        items_with_errors_count = sum(self.analyzer.search("items/errors$").values())
-        items_dropped_count = sum(self.analyzer.search("items/dropped$").values())
+        if counters is not None and (
+            not check_counters or self._match_counters(counters)
+        ):
+            items_count = counters.items
+            items_with_errors_count = counters.items_with_errors
+            items_dropped_count = counters.items_dropped
+            fields_count = counters.fields
+        else:
+            counters = None
+            items_count = sum(self.analyzer.search("items$").values())
+            items_with_errors_count = sum(
+                self.analyzer.search("items/errors$").values()
+            )
+            items_dropped_count = sum(self.analyzer.search("items/dropped$").values())
+            fields_count = sum(self.analyzer.search("fields$").values())
         self.items = ItemsInfo(
             items_count=items_count,
             items_with_errors=items_with_errors_count,
@@ -67,42 +104,133 @@ class ValidationInfo(object):
         )
 
         # errors & fields
-        fields_count = sum(self.analyzer.search("fields$").values())
         self.errors = ErrorsInfo(items_count)
         self.fields = FieldErrorsInfo(
             fields_count=fields_count, items_count=items_count
         )
 
-        field_errors = self.analyzer.search(
-            "fields/errors/([^/]+)$", include_matches=True
-        )
-        for _, error in field_errors.values():
-            field_errors_per_field = self.analyzer.search(
-                "fields/errors/%s/([^/]+)$" % error, include_matches=True
+        if counters is not None:
+            field_errors = (
+                (error, field, count)
+                for (_, field, error), count in counters.field_errors.items()
+            )
+        else:
+            field_errors = (
+                (error, field, count)
+                for error, _ in self.analyzer.children("fields/errors")
+                for field, count in self.analyzer.children("fields/errors/%s" % error)
             )
-            for count, field in field_errors_per_field.values():
-                self.errors.add_values(key=error, subkey=field, value=count)
-                self.fields.add_values(key=field, subkey=error, value=count)
+        for error, field, count in field_errors:
+            self.errors.add_values(key=error, subkey=field, value=count)
+            self.fields.add_values(key=field, subkey=error, value=count)
+        self._counters = counters
+
+    @property
+    def types(self):
+        if self._types is None:
+            if self._counters is not None:
+                names = list(self._counters.types)
+            else:
+                names = [
+                    name
+                    for _, name in self.analyzer.search(
+                        "types/([^/]+)/items$", include_matches=True
+                    ).values()
+                ]
+            self._types = dict((name, self._get_type_info(name)) for name in names)
+        return self._types
+
+    def get_error_samples(self, field=None, error=None):
+        """
+        Returns the samples of the errors found in ``field`` (in any field
+        by default) with the ``error`` name used in the stats (any error by
+        default), e.g. ``get_error_samples('url', 'missing_required_field')``.
+        Samples are dicts with the ``field`` and ``error`` found, and
+        truncated JSON snippets of its ``value`` and of the ``item``.
+        """
+        samples = []
+        for (_, field_name, error_name), reservoir in self._error_samples.items():
+            if field in (None, field_name) and error in (None, error_name):
+                samples.extend(reservoir.samples)
+        return samples
+
+    def _get_type_info(self, name):
+        counters = None
+        if self._counters is not None:
+            # Counters of all the types are written together, so they match
+            # the stats if the ones of all the items do
+            counters = self._counters.types.get(name)
+        analyzer = self.analyzer.get_child("types/%s" % name)
+        return ValidationInfo(
+            self.analyzer.stats,
+            counters=counters,
+            analyzer=analyzer,
+            check_counters=False,
+        )
+
+    def _match_counters(self, counters):
+        stats = self.analyzer.stats
+        prefix = self.analyzer.prefix
+        return all(
+            stats.get("/".join([prefix, name]), 0) == count
+            for name, count in [
+                ("items", counters.items),
+                ("items/errors", counters.items_with_errors),
+                ("items/dropped", counters.items_dropped),
+                ("fields", counters.fields),
+            ]
+        )
 
 
 class ValidationMonitorMixin(StatsMonitorMixin):
+    # Samples of the errors of each field included in failure messages
+    error_samples_in_messages = 3
+
     def __init__(self, correct_field_list_handling=False):
         super(ValidationMonitorMixin, self).__init__()
         self.correct_field_list_handling = correct_field_list_handling
 
     @property
     def validation(self):
-        if not hasattr(self, "_validation"):
-            self._validation = ValidationInfo(self.stats)
-        return self._validation
+        return self._get_stats_view("validation", self._get_validation_info)
+
+    def _get_validation_info(self, stats):
+        # Counters are only available when running in the same process as
+        # the validation pipeline
+        crawler = getattr(self.data, "crawler", None)
+        counters = None
+        if crawler is not None:
+            counters = get_validation_counters(crawler.stats)
+        return ValidationInfo(stats, counters=counters)
 
     def _get_all_fields(self):
         return sorted(self.validation.fields)
 
+    def _get_error_samples_msg(self, field_name, errors=None):
+        """
+        Returns the lines with samples of the ``errors`` (all of them by default) of a field to add to a failure
+        message, if there are samples of them (see ``SPIDERMON_VALIDATION_ERROR_SAMPLES``).
+        """
+        samples = []
+        for error in errors or [None]:
+            samples.extend(self.validation.get_error_samples(field_name, error))
+        lines = [
+            "\n  Sample: {value} ({error}) in {item}".format(
+                value="missing" if sample["value"] is None else sample["value"],
+                error=sample["error"],
+                item=sample["item"],
+            )
+            for sample in samples[: self.error_samples_in_messages]
+        ]
+        return "".join(lines)
+
     @staticmethod
     def _warn_list_handling():
-        warnings.warn('ValidationMonitorMixin behavior with is deprecated, please switch to per-field thresholds and set the '
-                      '"correct_field_list_handling" class attribute', DeprecationWarning)
+        warnings.warn(
+            "ValidationMonitorMixin behavior with is deprecated, please switch to per-field thresholds and set the "
+            '"correct_field_list_handling" class attribute',
+            DeprecationWarning,
+        )
 
     def check_missing_required_fields(self, field_names=None, allowed_count=0):
         """
@@ -131,13 +259,22 @@ class ValidationMonitorMixin(StatsMonitorMixin):
             field_names = self._get_all_fields()
         msgs = []
         for field_name in field_names:
-            missing_count = self.validation.fields[field_name].errors["missing_required_field"].count
+            missing_count = (
+                self.validation.fields[field_name]
+                .errors["missing_required_field"]
+                .count
+            )
             if missing_count > allowed_count:
-                msg = self._get_msg_for_missing_required_count(field_name, missing_count, allowed_count)
+                msg = self._get_msg_for_missing_required_count(
+                    field_name, missing_count, allowed_count
+                )
+                msg += self._get_error_samples_msg(
+                    field_name, ["missing_required_field"]
+                )
                 msgs.append(msg)
         if msgs:
-            msgs.insert(0, 'Required fields are missing:')
-            self.fail('\n'.join(msgs))
+            msgs.insert(0, "Required fields are missing:")
+            self.fail("\n".join(msgs))
 
     def check_missing_required_field(self, field_name, allowed_count=0):
         """
@@ -147,7 +284,11 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         missing_count = (
             self.validation.fields[field_name].errors["missing_required_field"].count
         )
-        msg = self._get_msg_for_missing_required_count(field_name, missing_count, allowed_count)
+        msg = self._get_msg_for_missing_required_count(
+            field_name, missing_count, allowed_count
+        )
+        if missing_count > allowed_count:
+            msg += self._get_error_samples_msg(field_name, ["missing_required_field"])
         self.assertLessEqual(missing_count, allowed_count, msg)
 
     @staticmethod
@@ -179,7 +320,9 @@ class ValidationMonitorMixin(StatsMonitorMixin):
                 allowed_percent,
                 msg="{percent}% of required fields are missing!{threshold_info}".format(
                     percent=missing_percent * 100,
-                    threshold_info=(" (maximum allowed %.0f%%)" % (allowed_percent * 100))
+                    threshold_info=(
+                        " (maximum allowed %.0f%%)" % (allowed_percent * 100)
+                    )
                     if allowed_percent > 0
                     else "",
                 ),
@@ -190,14 +333,21 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         msgs = []
         for field_name in field_names:
             missing_percent = (
-                self.validation.fields[field_name].errors["missing_required_field"].percent
+                self.validation.fields[field_name]
+                .errors["missing_required_field"]
+                .percent
             )
             if missing_percent > allowed_percent:
-                msg = self._get_msg_for_missing_required_percent(field_name, missing_percent, allowed_percent)
+                msg = self._get_msg_for_missing_required_percent(
+                    field_name, missing_percent, allowed_percent
+                )
+                msg += self._get_error_samples_msg(
+                    field_name, ["missing_required_field"]
+                )
                 msgs.append(msg)
         if msgs:
-            msgs.insert(0, 'Required fields are missing:')
-            self.fail('\n'.join(msgs))
+            msgs.insert(0, "Required fields are missing:")
+            self.fail("\n".join(msgs))
 
     def check_missing_required_field_percent(self, field_name, allowed_percent=0):
         """
@@ -207,11 +357,17 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         missing_percent = (
             self.validation.fields[field_name].errors["missing_required_field"].percent
         )
-        msg = self._get_msg_for_missing_required_percent(field_name, missing_percent, allowed_percent)
+        msg = self._get_msg_for_missing_required_percent(
+            field_name, missing_percent, allowed_percent
+        )
+        if missing_percent > allowed_percent:
+            msg += self._get_error_samples_msg(field_name, ["missing_required_field"])
         self.assertLessEqual(missing_percent, allowed_percent, msg)
 
     @staticmethod
-    def _get_msg_for_missing_required_percent(field_name, missing_percent, allowed_percent):
+    def _get_msg_for_missing_required_percent(
+        field_name, missing_percent, allowed_percent
+    ):
         msg = "{percent}% of required field {field} are missing!{threshold_info}".format(
             percent=missing_percent * 100,
             field=field_name,
@@ -251,11 +407,14 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         for field_name in field_names:
             errors_count = self._get_errors_count(errors, field_name)
             if errors_count > allowed_count:
-                msg = self._get_msg_for_field_errors(field_name, errors_count, allowed_count)
+                msg = self._get_msg_for_field_errors(
+                    field_name, errors_count, allowed_count
+                )
+                msg += self._get_error_samples_msg(field_name, errors)
                 msgs.append(msg)
         if msgs:
-            msgs.insert(0, 'There are field errors:')
-            self.fail('\n'.join(msgs))
+            msgs.insert(0, "There are field errors:")
+            self.fail("\n".join(msgs))
 
     def check_field_errors(self, field_name, errors=None, allowed_count=0):
         """
@@ -263,6 +422,8 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         """
         errors_count = self._get_errors_count(errors, field_name)
         msg = self._get_msg_for_field_errors(field_name, errors_count, allowed_count)
+        if errors_count > allowed_count:
+            msg += self._get_error_samples_msg(field_name, errors)
         self.assertLessEqual(errors_count, allowed_count, msg)
 
     def _get_errors_count(self, errors, field_name):
@@ -303,7 +464,9 @@ class ValidationMonitorMixin(StatsMonitorMixin):
                 allowed_percent,
                 msg="{percent}% of fields have validation errors!{threshold_info}".format(
                     percent=errors_percent * 100,
-                    threshold_info=(" (maximum allowed %.0f%%)" % (allowed_percent * 100))
+                    threshold_info=(
+                        " (maximum allowed %.0f%%)" % (allowed_percent * 100)
+                    )
                     if allowed_percent > 0
                     else "",
                 ),
@@ -315,11 +478,14 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         for field_name in field_names:
             errors_percent = self._get_errors_percent(errors, field_name)
             if errors_percent > allowed_percent:
-                msg = self._get_msg_for_field_errors_percent(field_name, errors_percent, allowed_percent)
+                msg = self._get_msg_for_field_errors_percent(
+                    field_name, errors_percent, allowed_percent
+                )
+                msg += self._get_error_samples_msg(field_name, errors)
                 msgs.append(msg)
         if msgs:
-            msgs.insert(0, 'There are field errors:')
-            self.fail('\n'.join(msgs))
+            msgs.insert(0, "There are field errors:")
+            self.fail("\n".join(msgs))
 
     def check_field_errors_percent(self, field_name, errors=None, allowed_percent=0):
         """
@@ -327,7 +493,11 @@ class ValidationMonitorMixin(StatsMonitorMixin):
         than ``allowed_percent``.
         """
         errors_percent = self._get_errors_percent(errors, field_name)
-        msg = self._get_msg_for_field_errors_percent(field_name, errors_percent, allowed_percent)
+        msg = self._get_msg_for_field_errors_percent(
+            field_name, errors_percent, allowed_percent
+        )
+        if errors_percent > allowed_percent:
+            msg += self._get_error_samples_msg(field_name, errors)
         self.assertLessEqual(errors_percent, allowed_percent, msg)
 
     def _get_errors_percent(self, errors, field_name):
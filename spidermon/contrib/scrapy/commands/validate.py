@@ -0,0 +1,135 @@
+from __future__ import absolute_import
+import json
+import multiprocessing
+import sys
+
+from scrapy import Spider
+from scrapy.commands import ScrapyCommand
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DropItem, NotConfigured, UsageError
+
+from spidermon.contrib.scrapy.extensions import Spidermon
+from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from spidermon.contrib.validation.jsonlines import DEFAULT_CHUNK_SIZE, validate_files
+from spidermon.contrib.validation.workers import check_workers_backend
+
+
+class ValidationSpider(Spider):
+    name = "validate"
+
+
+class Command(ScrapyCommand):
+    """
+    Validates the items of JSON Lines files with the validators configured
+    in the project settings, producing the same stats as
+    ``ItemValidationPipeline``.
+
+    example:
+    $ scrapy validate -t Product -o stats.json items.jl items-2.jl.gz
+    """
+
+    requires_project = False
+
+    def syntax(self):
+        return "[options] <file.jl[.gz]> ..."
+
+    def short_desc(self):
+        return "Validate the items of JSON Lines files"
+
+    def add_options(self, parser):
+        ScrapyCommand.add_options(self, parser)
+        # Scrapy commands use optparse in old versions and argparse in new ones
+        add_option = getattr(parser, "add_argument", None) or parser.add_option
+        add_option(
+            "-t",
+            "--item-type",
+            default="Item",
+            help="name of the item type whose validators are used " "(default: Item)",
+        )
+        add_option(
+            "-w",
+            "--workers",
+            default=None,
+            help="number of validation workers, 0 to validate in this process "
+            "(default: number of CPUs)",
+        )
+        add_option(
+            "-o", "--output", help="file to write the stats as JSON (default: stdout)"
+        )
+        add_option(
+            "--chunk-size",
+            default=DEFAULT_CHUNK_SIZE,
+            help="bytes of the files validated by a worker at once "
+            "(default: {})".format(DEFAULT_CHUNK_SIZE),
+        )
+        add_option(
+            "--monitors",
+            action="store_true",
+            help="run the spider_closed monitor suites with the stats",
+        )
+
+    def run(self, args, opts):
+        if not args:
+            raise UsageError()
+        try:
+            workers = (
+                multiprocessing.cpu_count()
+                if opts.workers is None
+                else int(opts.workers)
+            )
+            chunk_size = int(opts.chunk_size)
+        except ValueError as e:
+            raise UsageError(str(e))
+
+        crawler = Crawler(ValidationSpider, self.settings)
+        spider = crawler._create_spider()
+        crawler.spider = spider
+        pipeline = ItemValidationPipeline.from_crawler(crawler)
+        # Every item is validated, so the sampler must not adapt its rates
+        # nor write its stats
+        pipeline.sampler = None
+        # Items of a class named as the item type get its validators, the
+        # same as in the pipeline
+        item_class = type(str(opts.item_type), (dict,), {})
+        if not pipeline.find_validators(item_class()):
+            raise UsageError(
+                "There are no validators for <{}> items".format(opts.item_type)
+            )
+        if workers:
+            try:
+                check_workers_backend(pipeline.validators, pipeline.workers_backend)
+            except ValueError as e:
+                raise UsageError(str(e))
+
+        results = validate_files(
+            args,
+            pipeline.validators,
+            pipeline._get_validators_key(item_class()),
+            workers=workers,
+            chunk_size=chunk_size,
+            backend=pipeline.workers_backend,
+        )
+        for fields_count, item_results in results:
+            try:
+                pipeline.process_validation_results(
+                    item_class(), fields_count, item_results
+                )
+            except DropItem:
+                pass
+        pipeline.close_spider(spider)
+
+        if opts.monitors:
+            try:
+                spidermon = Spidermon.from_crawler(crawler)
+            except NotConfigured:
+                raise UsageError("Monitors require SPIDERMON_ENABLED = True")
+            spidermon._run_suites(spider, spidermon.spider_closed_suites)
+        self._write_stats(crawler.stats.get_stats(), opts.output)
+
+    def _write_stats(self, stats, output):
+        data = json.dumps(stats, sort_keys=True, indent=4, default=str)
+        if output:
+            with open(output, "w") as f:
+                f.write(data)
+        else:
+            sys.stdout.write(data + "\n")
@@ -1,4 +1,6 @@
 from __future__ import absolute_import
+import logging
+from timeit import default_timer
 
 from scrapy import signals
 from scrapy.exceptions import NotConfigured
@@ -6,7 +8,8 @@ from scrapy.utils.misc import load_object
 from twisted.internet.task import LoopingCall
 
 from spidermon import MonitorSuite
-from spidermon.contrib.scrapy.runners import SpiderMonitorRunner
+from spidermon.contrib.scrapy.runners import LOG_MESSAGE_HEADER, SpiderMonitorRunner
+from spidermon.data import Data
 from spidermon.python import factory
 from spidermon.python.monitors import ExpressionsMonitor
 from spidermon.utils.hubstorage import hs
@@ -113,7 +116,11 @@ class Spidermon(object):
         self._run_suites(spider, self.spider_opened_suites)
         self.periodic_tasks[spider] = []
         for suite, time in self.periodic_suites.items():
-            task = LoopingCall(self._run_periodic_suites, spider, [suite])
+            # Suites are loaded once and run again on every call, so their
+            # actions (and the connections they open) are reused
+            task = LoopingCall(
+                self._run_periodic_suites, spider, [self.load_suite(suite)]
+            )
             self.periodic_tasks[spider].append(task)
             task.start(time, now=False)
 
@@ -127,8 +134,17 @@ class Spidermon(object):
         self._run_suites(spider, self.engine_stopped_suites)
 
     def _run_periodic_suites(self, spider, suites):
-        suites = [self.load_suite(s) for s in suites]
+        start = default_timer()
         self._run_suites(spider, suites)
+        spider.log(
+            "[%s] Periodic suites %s run in %.3fs"
+            % (
+                LOG_MESSAGE_HEADER,
+                ", ".join(suite.name for suite in suites),
+                default_timer() - start,
+            ),
+            level=logging.INFO,
+        )
 
     def _run_suites(self, spider, suites):
         data = self._generate_data_for_spider(spider)
@@ -138,7 +154,8 @@ class Spidermon(object):
 
     def _generate_data_for_spider(self, spider):
         return {
-            "stats": self.crawler.stats.get_stats(spider),
+            # Stats are copied once and shared by all the suites
+            "stats": Data(self.crawler.stats.get_stats(spider)),
             "stats_history": spider.stats_history
             if hasattr(spider, "stats_history")
             else [],
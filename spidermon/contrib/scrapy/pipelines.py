@@ -1,25 +1,82 @@
 from __future__ import absolute_import
 import six
 import json
+import logging
+import hashlib
+import datetime
+import decimal
 from io import BytesIO
 from collections import defaultdict
+from functools import partial
 
 from scrapy.exceptions import DropItem, NotConfigured
 from scrapy.utils.misc import load_object
+from scrapy.utils.project import data_path
 from scrapy.exporters import JsonLinesItemExporter
 from scrapy import Field, Item
-from scrapy.utils.python import to_native_str
+from scrapy.utils.python import to_bytes, to_native_str
+from twisted.internet import defer
+from twisted.internet.task import LoopingCall
 
-from spidermon.contrib.validation import SchematicsValidator, JSONSchemaValidator
-from spidermon.contrib.validation.jsonschema.tools import get_schema_from
+from spidermon.contrib.validation import (
+    ColumnarJSONSchemaValidator,
+    CompiledJSONSchemaValidator,
+    JSONSchemaValidator,
+    SchematicsValidator,
+)
+from spidermon.contrib.validation.jsonschema.cache import SchemaCache
+from spidermon.contrib.validation.jsonschema.registry import SchemaRegistry
+from spidermon.contrib.validation.jsonschema.tools import (
+    get_schema_from,
+    get_schemas_from,
+)
+from spidermon.contrib.validation.workers import (
+    ValidationWorkerPool,
+    check_workers_backend,
+    DEFAULT_WORKERS_BACKEND,
+    validate_batch,
+)
+from spidermon.utils.cache import LRUCache
 from schematics.models import Model
 
-from .stats import ValidationStatsManager
+from .sampling import (
+    DEFAULT_ADAPTIVE_MIN_RATE,
+    DEFAULT_ADAPTIVE_TOLERANCE,
+    DEFAULT_ADAPTIVE_WINDOW,
+    AdaptiveItemSampler,
+    ItemSampler,
+)
+from .stats import ValidationStatsManager, BufferedValidationStatsManager
 
 
 DEFAULT_ERRORS_FIELD = "_validation"
 DEFAULT_ADD_ERRORS_TO_ITEM = False
 DEFAULT_DROP_ITEMS_WITH_ERRORS = False
+DEFAULT_FAIL_FAST = False
+DEFAULT_STATS_FLUSH_INTERVAL = 0
+DEFAULT_VALIDATION_WORKERS = 0
+DEFAULT_VALIDATION_BATCH_SIZE = 100
+DEFAULT_JSONSCHEMA_BACKEND = "jsonschema"
+DEFAULT_RESULTS_CACHE_SIZE = 0
+DEFAULT_TIMING = False
+TIMING_SUMMARY_KEYWORDS = 5
+DEFAULT_FIELD_ERRORS_LIMIT = 0
+OTHER_FIELD_ERRORS_SUMMARY_SIZE = 10
+DEFAULT_ERROR_SAMPLES = 0
+DEFAULT_ERROR_SAMPLES_MAX_LENGTH = 200
+DEFAULT_ITEM_TYPE_STATS = False
+DEFAULT_SCHEMAS_TIMEOUT = 30
+
+JSONSCHEMA_BACKENDS = {
+    "jsonschema": JSONSchemaValidator,
+    "compiled": CompiledJSONSchemaValidator,
+    "columnar": ColumnarJSONSchemaValidator,
+}
+
+# Value of the fields not found in the data of items
+_MISSING = object()
+
+JSON_SCALAR_TYPES = (six.text_type, bool, float, type(None)) + six.integer_types
 
 
 class ItemValidationPipeline(object):
@@ -30,19 +87,94 @@ class ItemValidationPipeline(object):
         drop_items_with_errors=DEFAULT_DROP_ITEMS_WITH_ERRORS,
         add_errors_to_items=DEFAULT_ADD_ERRORS_TO_ITEM,
         errors_field=None,
+        stats_flush_interval=DEFAULT_STATS_FLUSH_INTERVAL,
+        workers=DEFAULT_VALIDATION_WORKERS,
+        workers_backend=DEFAULT_WORKERS_BACKEND,
+        batch_size=DEFAULT_VALIDATION_BATCH_SIZE,
+        sampler=None,
+        fail_fast=DEFAULT_FAIL_FAST,
+        results_cache_size=DEFAULT_RESULTS_CACHE_SIZE,
+        timing=DEFAULT_TIMING,
+        field_errors_limit=DEFAULT_FIELD_ERRORS_LIMIT,
+        error_samples=DEFAULT_ERROR_SAMPLES,
+        error_samples_max_length=DEFAULT_ERROR_SAMPLES_MAX_LENGTH,
+        item_type_stats=DEFAULT_ITEM_TYPE_STATS,
     ):
         self.drop_items_with_errors = drop_items_with_errors
         self.add_errors_to_items = add_errors_to_items or DEFAULT_ADD_ERRORS_TO_ITEM
+        if fail_fast and (self.add_errors_to_items or not self.drop_items_with_errors):
+            raise NotConfigured(
+                "SPIDERMON_VALIDATION_FAIL_FAST can only be used when items with "
+                "errors are dropped and errors are not added to them"
+            )
+        self.fail_fast = fail_fast
         self.errors_field = errors_field or DEFAULT_ERRORS_FIELD
         self.validators = validators
-        self.stats = ValidationStatsManager(stats)
+        self._class_validators = {}
+        # Sampling rate, type and data of the item whose errors are added
+        self._errors_context = (None, None, None)
+        self.stats_flush_interval = stats_flush_interval
+        self.error_samples = error_samples
+        self.error_samples_max_length = (
+            error_samples_max_length or DEFAULT_ERROR_SAMPLES_MAX_LENGTH
+        )
+        stats_manager_class = (
+            BufferedValidationStatsManager
+            if self.stats_flush_interval
+            else ValidationStatsManager
+        )
+        self.stats = stats_manager_class(
+            stats,
+            field_errors_limit=field_errors_limit,
+            error_samples_size=error_samples,
+            item_type_stats=item_type_stats,
+        )
+        self.stats_flush_task = None
+        if workers:
+            try:
+                check_workers_backend(validators, workers_backend)
+            except ValueError as e:
+                raise NotConfigured(str(e))
+        if timing and workers:
+            raise NotConfigured(
+                "SPIDERMON_VALIDATION_TIMING can't be used together with "
+                "SPIDERMON_VALIDATION_WORKERS"
+            )
+        self.workers = workers
+        self.workers_backend = workers_backend
+        self.batch_size = batch_size or DEFAULT_VALIDATION_BATCH_SIZE
+        self.validate_in_batches = bool(workers) or any(
+            validator.supports_batches
+            for vals in validators.values()
+            for validator in vals
+        )
+        self.worker_pool = None
+        self._batch = []
+        self._batch_call = None
+        self.sampler = sampler
+        self.results_cache = None
+        if results_cache_size:
+            self.results_cache = LRUCache(maxsize=results_cache_size)
         for _type, vals in validators.items():
             [self.stats.add_validator(_type, val.name) for val in vals]
+        if self.fail_fast:
+            for vals in validators.values():
+                for validator in vals:
+                    validator.fail_fast = self.fail_fast
+            self.stats.add_fail_fast()
+        self.timing = timing
+        if self.timing:
+            for _, _, validator in self._get_named_validators():
+                validator.enable_timing()
 
     @classmethod
     def from_crawler(cls, crawler):
         validators = defaultdict(list)
         allowed_types = (list, tuple, dict)
+        jsonschema_backends = cls._get_jsonschema_backends(crawler.settings)
+        schemas = cls._get_schemas(crawler.settings)
+        # Parts shared by the schemas are kept and built only once
+        registry = SchemaRegistry()
 
         def set_validators(loader, schema):
             if type(schema) in (list, tuple):
@@ -50,12 +182,23 @@ class ItemValidationPipeline(object):
             for obj, paths in schema.items():
                 key = obj.__name__
                 paths = paths if type(paths) in (list, tuple) else [paths]
-                objects = [loader(v) for v in paths]
+                objects = [loader(v, key) for v in paths]
                 validators[key].extend(objects)
 
+        def load_jsonschema_validator(schema, key):
+            backend = jsonschema_backends.get(key, jsonschema_backends[None])
+            if isinstance(schema, six.string_types):
+                schema = schemas[schema]
+            return cls._load_jsonschema_validator(
+                schema, backend=backend, registry=registry
+            )
+
+        def load_schematics_validator(model_path, key):
+            return cls._load_schematics_validator(model_path)
+
         for loader, name in [
-            (cls._load_jsonschema_validator, "SPIDERMON_VALIDATION_SCHEMAS"),
-            (cls._load_schematics_validator, "SPIDERMON_VALIDATION_MODELS"),
+            (load_jsonschema_validator, "SPIDERMON_VALIDATION_SCHEMAS"),
+            (load_schematics_validator, "SPIDERMON_VALIDATION_MODELS"),
         ]:
             res = crawler.settings.get(name)
             if not res:
@@ -80,10 +223,152 @@ class ItemValidationPipeline(object):
                 "SPIDERMON_VALIDATION_ADD_ERRORS_TO_ITEMS"
             ),
             errors_field=crawler.settings.get("SPIDERMON_VALIDATION_ERRORS_FIELD"),
+            stats_flush_interval=crawler.settings.getfloat(
+                "SPIDERMON_VALIDATION_STATS_FLUSH_INTERVAL",
+                DEFAULT_STATS_FLUSH_INTERVAL,
+            ),
+            workers=crawler.settings.getint(
+                "SPIDERMON_VALIDATION_WORKERS", DEFAULT_VALIDATION_WORKERS
+            ),
+            workers_backend=crawler.settings.get(
+                "SPIDERMON_VALIDATION_WORKERS_BACKEND", DEFAULT_WORKERS_BACKEND
+            ),
+            batch_size=crawler.settings.getint(
+                "SPIDERMON_VALIDATION_BATCH_SIZE", DEFAULT_VALIDATION_BATCH_SIZE
+            ),
+            sampler=cls._load_sampler(crawler.settings),
+            fail_fast=cls._get_fail_fast(crawler.settings),
+            results_cache_size=crawler.settings.getint(
+                "SPIDERMON_VALIDATION_RESULTS_CACHE_SIZE", DEFAULT_RESULTS_CACHE_SIZE
+            ),
+            timing=crawler.settings.getbool(
+                "SPIDERMON_VALIDATION_TIMING", DEFAULT_TIMING
+            ),
+            field_errors_limit=crawler.settings.getint(
+                "SPIDERMON_VALIDATION_FIELD_ERRORS_LIMIT", DEFAULT_FIELD_ERRORS_LIMIT
+            ),
+            error_samples=crawler.settings.getint(
+                "SPIDERMON_VALIDATION_ERROR_SAMPLES", DEFAULT_ERROR_SAMPLES
+            ),
+            error_samples_max_length=crawler.settings.getint(
+                "SPIDERMON_VALIDATION_ERROR_SAMPLES_MAX_LENGTH",
+                DEFAULT_ERROR_SAMPLES_MAX_LENGTH,
+            ),
+            item_type_stats=crawler.settings.getbool(
+                "SPIDERMON_VALIDATION_ITEM_TYPE_STATS", DEFAULT_ITEM_TYPE_STATS
+            ),
         )
 
     @classmethod
-    def _load_jsonschema_validator(cls, schema):
+    def _get_fail_fast(cls, settings):
+        """
+        Returns ``True`` to stop validating items at their first error, or
+        the set of error messages that stop it.
+        """
+        value = settings.get("SPIDERMON_VALIDATION_FAIL_FAST", DEFAULT_FAIL_FAST)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return frozenset(value)
+        return settings.getbool("SPIDERMON_VALIDATION_FAIL_FAST", DEFAULT_FAIL_FAST)
+
+    @classmethod
+    def _load_sampler(cls, settings):
+        sampler = ItemSampler.from_setting(
+            settings.get("SPIDERMON_VALIDATION_SAMPLING_RATE")
+        )
+        if not settings.getbool("SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING"):
+            return sampler
+        if sampler is not None:
+            raise NotConfigured(
+                "SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING can not be used with "
+                "a fixed SPIDERMON_VALIDATION_SAMPLING_RATE"
+            )
+        return AdaptiveItemSampler(
+            min_rate=settings.getfloat(
+                "SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_MIN_RATE",
+                DEFAULT_ADAPTIVE_MIN_RATE,
+            ),
+            window=settings.getint(
+                "SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_WINDOW",
+                DEFAULT_ADAPTIVE_WINDOW,
+            ),
+            tolerance=settings.getfloat(
+                "SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_TOLERANCE",
+                DEFAULT_ADAPTIVE_TOLERANCE,
+            ),
+        )
+
+    @classmethod
+    def _get_schemas(cls, settings):
+        """
+        Returns a dict with the schema loaded from each source (URL, file
+        or object path) in SPIDERMON_VALIDATION_SCHEMAS. Schemas from URLs
+        are fetched in parallel, through the schema cache if configured.
+        """
+        value = settings.get("SPIDERMON_VALIDATION_SCHEMAS")
+        if isinstance(value, dict):
+            value = [
+                source
+                for sources in value.values()
+                for source in (
+                    sources if isinstance(sources, (list, tuple)) else [sources]
+                )
+            ]
+        if not isinstance(value, (list, tuple)):
+            return {}
+        return get_schemas_from(
+            [source for source in value if isinstance(source, six.string_types)],
+            timeout=settings.getfloat(
+                "SPIDERMON_VALIDATION_SCHEMAS_TIMEOUT", DEFAULT_SCHEMAS_TIMEOUT
+            ),
+            cache=cls._get_schema_cache(settings),
+        )
+
+    @classmethod
+    def _get_schema_cache(cls, settings):
+        cache_dir = settings.get("SPIDERMON_VALIDATION_SCHEMAS_CACHE_DIR")
+        offline = settings.getbool("SPIDERMON_VALIDATION_SCHEMAS_OFFLINE")
+        if not cache_dir:
+            if offline:
+                raise NotConfigured(
+                    "SPIDERMON_VALIDATION_SCHEMAS_OFFLINE requires "
+                    "SPIDERMON_VALIDATION_SCHEMAS_CACHE_DIR to be set"
+                )
+            return None
+        return SchemaCache(data_path(cache_dir, createdir=True), offline=offline)
+
+    @classmethod
+    def _get_jsonschema_backends(cls, settings):
+        """
+        Returns a dict with the JSON Schema backend of each item type name,
+        and the backend of the rest of types with the ``None`` key.
+        """
+        value = settings.get(
+            "SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND", DEFAULT_JSONSCHEMA_BACKEND
+        )
+        if isinstance(value, dict):
+            backends = dict(
+                (key if isinstance(key, six.string_types) else key.__name__, backend)
+                for key, backend in value.items()
+            )
+            backends.setdefault(None, DEFAULT_JSONSCHEMA_BACKEND)
+        else:
+            backends = {None: value or DEFAULT_JSONSCHEMA_BACKEND}
+        for backend in backends.values():
+            if backend not in JSONSCHEMA_BACKENDS:
+                raise NotConfigured(
+                    "Invalid <{}> JSON Schema backend, valid options are: "
+                    "{}".format(backend, ", ".join(sorted(JSONSCHEMA_BACKENDS)))
+                )
+            if backend == "columnar" and not ColumnarJSONSchemaValidator.available:
+                raise NotConfigured(
+                    "The columnar JSON Schema backend requires numpy to be installed"
+                )
+        return backends
+
+    @classmethod
+    def _load_jsonschema_validator(
+        cls, schema, backend=DEFAULT_JSONSCHEMA_BACKEND, registry=None
+    ):
         if isinstance(schema, six.string_types):
             schema = get_schema_from(schema)
         if not isinstance(schema, dict):
@@ -94,7 +379,7 @@ class ItemValidationPipeline(object):
                 "- an object path to a JSON string.\n"
                 "- a path to a JSON file."
             )
-        return JSONSchemaValidator(schema)
+        return JSONSCHEMA_BACKENDS[backend](schema, registry=registry)
 
     @classmethod
     def _load_schematics_validator(cls, model_path):
@@ -105,6 +390,103 @@ class ItemValidationPipeline(object):
             )
         return SchematicsValidator(model_class)
 
+    def open_spider(self, spider):
+        if self.stats_flush_interval:
+            self.stats_flush_task = LoopingCall(self._flush_stats)
+            self.stats_flush_task.start(self.stats_flush_interval, now=False)
+        if self.workers:
+            self._start_worker_pool()
+
+    def close_spider(self, spider):
+        if self.stats_flush_task and self.stats_flush_task.running:
+            self.stats_flush_task.stop()
+        if self.worker_pool:
+            self.worker_pool.close()
+            self.worker_pool = None
+        self._write_timings()
+        self.stats.close()
+        if self.timing:
+            self._log_timings(spider)
+        if self.stats.other_field_errors:
+            self._log_other_field_errors(spider)
+
+    def _flush_stats(self):
+        self._write_timings()
+        self.stats.flush()
+
+    def _write_timings(self):
+        if self.timing:
+            for _type, name, validator in self._get_named_validators():
+                self.stats.set_timings(_type, name, validator.timings)
+
+    def _get_named_validators(self):
+        """
+        Yields the item type, name and validator of every validator. Names
+        of validators of the same type with the same name are numbered.
+        """
+        for _type, vals in self.validators.items():
+            seen = defaultdict(int)
+            for validator in vals:
+                seen[validator.name] += 1
+                name = validator.name
+                if seen[name] > 1:
+                    name = "{}_{}".format(name, seen[name])
+                yield _type, name, validator
+
+    def _log_timings(self, spider):
+        """
+        Logs the time spent by every validator, slowest first, with the
+        slowest keywords of each one of them.
+        """
+        lines = []
+        named_validators = sorted(
+            self._get_named_validators(),
+            key=lambda named: named[2].timings.items.total,
+            reverse=True,
+        )
+        for _type, name, validator in named_validators:
+            items = validator.timings.items
+            lines.append(
+                "{}/{}: {} items in {:.3f}s ({:.1f}us per item, {:.1f}us max)".format(
+                    _type,
+                    name,
+                    items.count,
+                    items.total,
+                    items.mean * 1e6,
+                    items.max * 1e6,
+                )
+            )
+            keywords = sorted(
+                validator.timings.keywords.items(),
+                key=lambda keyword: keyword[1].total,
+                reverse=True,
+            )
+            for keyword, timing in keywords[:TIMING_SUMMARY_KEYWORDS]:
+                lines.append(
+                    "    {}: {} calls in {:.3f}s".format(
+                        "/".join(keyword), timing.count, timing.total
+                    )
+                )
+        spider.log(
+            "Validation timing:\n{}".format("\n".join(lines)), level=logging.INFO
+        )
+
+    def _log_other_field_errors(self, spider):
+        other_field_errors = self.stats.other_field_errors
+        lines = [
+            "Some field errors were counted as 'other' because of "
+            "SPIDERMON_VALIDATION_FIELD_ERRORS_LIMIT, the most frequent ones were:"
+        ]
+        for (item_type, field, error), count in other_field_errors.most_common(
+            OTHER_FIELD_ERRORS_SUMMARY_SIZE
+        ):
+            lines.append(
+                "    '{}' in field '{}' of {}: at least {} times".format(
+                    error, field, item_type, count
+                )
+            )
+        spider.log("\n".join(lines), level=logging.WARNING)
+
     def process_item(self, item, _):
         validators = self.find_validators(item)
         if not validators:
@@ -112,23 +494,250 @@ class ItemValidationPipeline(object):
             return item
 
         data = self._convert_item_to_dict(item)
-        self.stats.add_item()
-        self.stats.add_fields(len(list(data.keys())))
-        for validator in validators:
-            ok, errors = validator.validate(data)
-            if not ok:
-                self._add_error_stats(errors)
-                if self.add_errors_to_items:
-                    self._add_errors_to_item(item, errors)
-                if self.drop_items_with_errors:
-                    self._drop_item(item, errors)
-        return item
+        sampling_rate = None
+        if self.sampler is not None:
+            sampling_rate = self.sampler.get_rate(self._get_validators_key(item))
+            self.stats.add_sampling_item()
+            if not self.sampler.is_sampled(data, sampling_rate):
+                return item
+
+        if self.results_cache is not None:
+            cache_key = self._get_results_cache_key(item, data)
+            results = self.results_cache.get(cache_key)
+            if results is not None:
+                self.stats.add_results_cache_hit()
+                return self._process_validation_results(
+                    item, data, results, sampling_rate
+                )
+            self.stats.add_results_cache_miss()
+
+        if self.validate_in_batches:
+            return self._validate_in_batches(item, data, sampling_rate)
+        if self.results_cache is not None:
+            # Results of every validator are needed to reuse them
+            results = [validator.validate(data) for validator in validators]
+            self.results_cache.set(cache_key, results)
+        else:
+            results = (validator.validate(data) for validator in validators)
+        return self._process_validation_results(item, data, results, sampling_rate)
 
     def find_validators(self, item):
-        find = lambda x: self.validators.get(x.__name__, [])
-        return find(item.__class__) or find(Item)
+        return self._get_class_validators(item.__class__)[1]
+
+    def _get_validators_key(self, item):
+        return self._get_class_validators(item.__class__)[0]
+
+    def _get_class_validators(self, item_class):
+        """
+        Returns the key and the validators of the items of a class: the ones
+        of the closest class in its MRO with validators, or the ones of
+        ``Item`` if there are none.
+        """
+        try:
+            return self._class_validators[item_class]
+        except KeyError:
+            pass
+        for cls in item_class.__mro__:
+            if self.validators.get(cls.__name__):
+                key = cls.__name__
+                break
+        else:
+            key = Item.__name__
+        self._class_validators[item_class] = key, self.validators.get(key, [])
+        return self._class_validators[item_class]
+
+    def _get_results_cache_key(self, item, data):
+        """
+        Returns the key of the validation results of the data of an item,
+        that is the same for items of the same type with the same content.
+
+        The data only contains JSON values, whose ``repr`` tells them apart
+        and is faster to get than a JSON dump. Fields in a different order
+        produce a different key, which only costs a cache miss.
+        """
+        content = repr(data)
+        return self._get_validators_key(item), hashlib.md5(to_bytes(content)).digest()
+
+    def _process_validation_results(self, item, data, results, sampling_rate=None):
+        return self.process_validation_results(
+            item, len(data), results, sampling_rate=sampling_rate, data=data
+        )
+
+    def process_validation_results(
+        self, item, fields_count, results, sampling_rate=None, data=None
+    ):
+        """
+        Updates the stats and handles the item with the ``(ok, errors)``
+        results of its validators, being ``fields_count`` the number of
+        fields of its data. Results can be lazily evaluated, as no more
+        validators are needed once the item is dropped. Errors are only
+        sampled if the validated ``data`` is given.
+        """
+        item_type = self._get_validators_key(item)
+        self.stats.add_item(sampling_rate=sampling_rate, item_type=item_type)
+        self.stats.add_fields(
+            fields_count, sampling_rate=sampling_rate, item_type=item_type
+        )
+        fields_with_errors = set()
+        # Read by _add_error_stats, that keeps its signature so subclasses
+        # overriding it still work
+        self._errors_context = (sampling_rate, item_type, data)
+        try:
+            for ok, errors in results:
+                if not ok:
+                    fields_with_errors.update(errors.keys())
+                    self._add_error_stats(errors)
+                    if self.add_errors_to_items:
+                        self._add_errors_to_item(item, errors)
+                    if self.drop_items_with_errors:
+                        self._drop_item(item, errors)
+        finally:
+            self._errors_context = (None, None, None)
+            if self.sampler is not None:
+                self._observe_sampled_item(item, fields_with_errors)
+        return item
+
+    def _observe_sampled_item(self, item, fields_with_errors):
+        decision = self.sampler.observe(
+            self._get_validators_key(item), fields_with_errors
+        )
+        if decision is not None:
+            self.stats.add_sampling_decision(*decision)
+
+    def _validate_in_batches(self, item, data, sampling_rate=None):
+        from twisted.internet import reactor
+
+        deferred = defer.Deferred()
+        self._batch.append(
+            (self._get_validators_key(item), item, data, sampling_rate, deferred)
+        )
+        if len(self._batch) >= self.batch_size:
+            self._send_batch()
+        elif self._batch_call is None:
+            # Items returned by the same spider callback are processed in the
+            # same reactor iteration, so they are sent together after it
+            self._batch_call = reactor.callLater(0, self._send_batch)
+        return deferred
+
+    def _send_batch(self):
+        from twisted.internet import reactor
+
+        if self._batch_call is not None:
+            if self._batch_call.active():
+                self._batch_call.cancel()
+            self._batch_call = None
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        if not self.workers:
+            try:
+                results = validate_batch(
+                    self.validators, [(key, data) for key, _, data, _, _ in batch]
+                )
+            except Exception as e:
+                results = e
+            self._batch_validated(batch, results)
+            return
+        if self.worker_pool is None:
+            self._start_worker_pool()
+        self.worker_pool.validate(
+            [(key, data) for key, _, data, _, _ in batch],
+            callback=lambda results: reactor.callFromThread(
+                self._batch_validated, batch, results
+            ),
+        )
+
+    def _batch_validated(self, batch, results):
+        for i, (_, item, data, sampling_rate, deferred) in enumerate(batch):
+            if isinstance(results, Exception):
+                deferred.errback(results)
+                continue
+            if self.results_cache is not None:
+                self.results_cache.set(
+                    self._get_results_cache_key(item, data), results[i]
+                )
+            try:
+                item = self._process_validation_results(
+                    item, data, results[i], sampling_rate
+                )
+            except Exception:
+                deferred.errback()
+            else:
+                deferred.callback(item)
+
+    def _start_worker_pool(self):
+        self.worker_pool = ValidationWorkerPool(
+            self.validators, workers=self.workers, backend=self.workers_backend
+        )
 
     def _convert_item_to_dict(self, item):
+        """
+        Converts the item into the dict that would result from exporting it
+        as JSON and loading it back, without doing the JSON round-trip. Items
+        containing values that can't be converted directly are exported with
+        ``JsonLinesItemExporter`` instead.
+        """
+        try:
+            return self._serialize_item(item)
+        except TypeError:
+            return self._export_item_to_dict(item)
+
+    def _serialize_item(self, item):
+        if isinstance(item, dict):
+            return self._serialize_dict(item)
+        if not isinstance(item, Item):
+            raise TypeError("Unsupported item type %r" % type(item))
+        data = {}
+        for name, value in item._values.items():
+            serializer = item.fields[name].get("serializer")
+            if serializer is not None:
+                value = serializer(value)
+            data[name] = self._serialize_value(value)
+        return data
+
+    def _serialize_dict(self, value):
+        data = {}
+        for key, child in value.items():
+            if not isinstance(key, six.string_types):
+                raise TypeError("Unsupported key type %r" % type(key))
+            data[key] = (
+                child
+                if type(child) in JSON_SCALAR_TYPES
+                else self._serialize_value(child)
+            )
+        return data
+
+    def _serialize_value(self, value):
+        """
+        Mirrors the conversions applied by ``ScrapyJSONEncoder`` for the most
+        common value types. ``TypeError`` is raised for anything else so the
+        caller can fall back to the exporter.
+        """
+        value_type = type(value)
+        if value_type in JSON_SCALAR_TYPES:
+            return value
+        elif isinstance(value, (list, tuple, set)):
+            return [
+                child
+                if type(child) in JSON_SCALAR_TYPES
+                else self._serialize_value(child)
+                for child in value
+            ]
+        elif isinstance(value, dict):
+            return self._serialize_dict(value)
+        elif isinstance(value, Item):
+            return self._serialize_dict(value._values)
+        elif isinstance(value, datetime.datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        elif isinstance(value, datetime.date):
+            return value.strftime("%Y-%m-%d")
+        elif isinstance(value, datetime.time):
+            return value.strftime("%H:%M:%S")
+        elif isinstance(value, decimal.Decimal):
+            return str(value)
+        raise TypeError("Unsupported value type %r" % value_type)
+
+    def _export_item_to_dict(self, item):
         serialized_json = BytesIO()
         exporter = JsonLinesItemExporter(serialized_json)
         exporter.export_item(item)
@@ -156,7 +765,7 @@ class ItemValidationPipeline(object):
         is being dropped or to drop the item only when some specific errors
         are detected.
         """
-        self.stats.add_dropped_item()
+        self.stats.add_dropped_item(item_type=self._get_validators_key(item))
         raise DropItem("Validation failed!")
 
     def _add_error_stats(self, errors):
@@ -164,7 +773,59 @@ class ItemValidationPipeline(object):
         This method adds validation error stats that can be later used to
         detect alert conditions in the monitors.
         """
+        sampling_rate, item_type, data = self._errors_context
+        get_sample = None
         for field_name, messages in errors.items():
             for message in messages:
-                self.stats.add_field_error(field_name, message)
-        self.stats.add_item_with_errors()
+                if data is not None and self.error_samples:
+                    get_sample = partial(
+                        self._get_error_sample, data, field_name, message
+                    )
+                self.stats.add_field_error(
+                    field_name,
+                    message,
+                    sampling_rate=sampling_rate,
+                    item_type=item_type,
+                    get_sample=get_sample,
+                )
+        self.stats.add_item_with_errors(
+            sampling_rate=sampling_rate, item_type=item_type
+        )
+
+    def _get_error_sample(self, data, field_name, message):
+        """
+        Returns a sample of an error found in the data of an item, with the
+        JSON of the value of the field (``None`` if it is missing) and of
+        the item, truncated to ``error_samples_max_length`` characters.
+        """
+        value = self._get_field_value(data, field_name)
+        return {
+            "field": field_name,
+            "error": message,
+            "value": None if value is _MISSING else self._get_snippet(value),
+            "item": self._get_snippet(data),
+        }
+
+    def _get_field_value(self, data, field_name):
+        """
+        Returns the value of a field given by the path used in validation
+        errors (e.g. ``images.0.url``), or ``_MISSING``.
+        """
+        if field_name in data:
+            return data[field_name]
+        value = data
+        for part in field_name.split("."):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                return _MISSING
+        return value
+
+    def _get_snippet(self, value):
+        snippet = json.dumps(value, default=str)
+        max_length = self.error_samples_max_length
+        if len(snippet) > max_length:
+            snippet = snippet[: max(max_length - 3, 0)] + "..."
+        return snippet
@@ -0,0 +1,184 @@
+from __future__ import absolute_import
+import hashlib
+import json
+import struct
+from collections import defaultdict, namedtuple
+
+import six
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.python import to_bytes
+
+DEFAULT_SAMPLING_RATE = 1.0
+DEFAULT_ADAPTIVE_MIN_RATE = 0.01
+DEFAULT_ADAPTIVE_WINDOW = 200
+DEFAULT_ADAPTIVE_TOLERANCE = 0.05
+HASH_RESOLUTION = float(2 ** 64)
+
+SamplingDecision = namedtuple("SamplingDecision", ["key", "rate", "spiked_fields"])
+
+
+class ItemSampler(object):
+    """
+    Decides which items are validated when only a sample of them is needed.
+
+    ``rates`` maps the name of the item type with its sampling rate, the
+    fraction of items of that type that are validated. Types not found use
+    ``default_rate``.
+
+    Items are selected by a hash of their content, so the same items are
+    always selected for the same rate, in any order and in any run.
+
+    example:
+    >> sampler = ItemSampler({'ProductItem': 0.1})
+    >> sampler.get_rate('ProductItem')
+    0.1
+    >> sampler.is_sampled({'name': 'product'}, 0.1)
+    False
+    """
+
+    def __init__(self, rates=None, default_rate=DEFAULT_SAMPLING_RATE):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        for rate in list(self.rates.values()) + [default_rate]:
+            if not 0 < rate <= 1:
+                raise NotConfigured(
+                    "Invalid <{}> validation sampling rate, rates must be "
+                    "greater than 0 and not greater than 1".format(rate)
+                )
+
+    @classmethod
+    def from_setting(cls, value):
+        """
+        Creates the sampler from a setting, that can be a single rate for
+        all the items or a dict with the rate of each item type (as an item
+        class or its name). Returns ``None`` if every item is validated.
+        """
+        if value is None or value == "":
+            return None
+        if isinstance(value, dict):
+            rates = dict(
+                (
+                    key if isinstance(key, six.string_types) else key.__name__,
+                    float(rate),
+                )
+                for key, rate in value.items()
+            )
+            sampler = cls(rates)
+        else:
+            sampler = cls(default_rate=float(value))
+        if sampler.validates_all():
+            return None
+        return sampler
+
+    def validates_all(self):
+        return all(
+            rate == 1 for rate in list(self.rates.values()) + [self.default_rate]
+        )
+
+    def get_rate(self, key):
+        return self.rates.get(key, self.default_rate)
+
+    def observe(self, key, fields_with_errors):
+        """
+        Receives the fields with errors of each validated item. Returns a
+        ``SamplingDecision`` when the sampling rate of the item type is
+        changed, or ``None``. Rates of this sampler never change.
+        """
+        return None
+
+    def is_sampled(self, data, rate):
+        if rate >= 1:
+            return True
+        return self._get_hash(data) < rate
+
+    def _get_hash(self, data):
+        """
+        Returns a number in the [0, 1) range that depends only on the
+        content of the data.
+        """
+        content = json.dumps(data, sort_keys=True, default=str)
+        digest = hashlib.md5(to_bytes(content)).digest()
+        return struct.unpack(">Q", digest[:8])[0] / HASH_RESOLUTION
+
+
+class AdaptiveItemSampler(ItemSampler):
+    """
+    Sampler that validates all the items at the start and adapts the
+    sampling rate of each item type to the errors found.
+
+    Validated items of each type are observed in windows of ``window``
+    items. The rate is halved after every window (down to ``min_rate``)
+    while the fraction of items with errors in each field does not grow
+    more than ``tolerance`` over the one observed in previous windows. When
+    it does, the rate goes back to 1 so every item is validated again until
+    the error rates are stable.
+    """
+
+    def __init__(
+        self,
+        min_rate=DEFAULT_ADAPTIVE_MIN_RATE,
+        window=DEFAULT_ADAPTIVE_WINDOW,
+        tolerance=DEFAULT_ADAPTIVE_TOLERANCE,
+    ):
+        super(AdaptiveItemSampler, self).__init__(default_rate=1.0)
+        if not 0 < min_rate <= 1:
+            raise NotConfigured(
+                "Invalid <{}> minimum validation sampling rate, it must be "
+                "greater than 0 and not greater than 1".format(min_rate)
+            )
+        if window < 1:
+            raise NotConfigured(
+                "Invalid <{}> adaptive sampling window, at least one item is "
+                "required".format(window)
+            )
+        self.min_rate = min_rate
+        self.window = window
+        self.tolerance = tolerance
+        self._window_items = defaultdict(int)
+        self._window_errors = defaultdict(lambda: defaultdict(int))
+        self._baselines = {}
+
+    def validates_all(self):
+        return False
+
+    def observe(self, key, fields_with_errors):
+        self._window_items[key] += 1
+        window_errors = self._window_errors[key]
+        for field in fields_with_errors:
+            window_errors[field] += 1
+        if self._window_items[key] < self.window:
+            return None
+        return self._update_rate(key)
+
+    def _update_rate(self, key):
+        items = float(self._window_items.pop(key))
+        error_rates = dict(
+            (field, count / items)
+            for field, count in self._window_errors.pop(key).items()
+        )
+        baseline = self._baselines.get(key)
+        spiked_fields = []
+        if baseline is not None:
+            spiked_fields = sorted(
+                field
+                for field, error_rate in error_rates.items()
+                if error_rate - baseline.get(field, 0) > self.tolerance
+            )
+        if spiked_fields:
+            # Error rates of the new window become the reference, so the rate
+            # goes down again once they are stable
+            self._baselines[key] = error_rates
+            rate = 1.0
+        else:
+            self._baselines[key] = self._merge_error_rates(baseline, error_rates)
+            rate = max(self.get_rate(key) / 2, self.min_rate)
+        self.rates[key] = rate
+        return SamplingDecision(key=key, rate=rate, spiked_fields=spiked_fields)
+
+    def _merge_error_rates(self, baseline, error_rates):
+        if baseline is None:
+            return error_rates
+        return dict(
+            (field, (baseline.get(field, 0) + error_rates.get(field, 0)) / 2)
+            for field in set(baseline) | set(error_rates)
+        )
@@ -1,8 +1,20 @@
 from __future__ import absolute_import
+import weakref
+from collections import defaultdict
+
 from slugify import slugify
 
+from spidermon.utils.cache import LRUCache
+from spidermon.utils.sketches import HeavyHitters, Reservoir
+
 
 STATS_DEFAULT_VALIDATION_PREFIX = "spidermon/validation"
+STATS_NAMES_CACHE_SIZE = 10000
+# Minimum number of error, field and item type combinations that are kept
+# track of, when the number of field errors is limited
+OTHER_FIELD_ERRORS_MIN_CAPACITY = 1000
+# Maximum number of error, field and item type combinations with samples
+ERROR_SAMPLES_MAX_KEYS = 1000
 
 
 class NAMES:
@@ -11,13 +23,205 @@ class NAMES:
     FIELDS = "fields"
     ERRORS = "errors"
     VALIDATORS = "validators"
+    SAMPLING = "sampling"
+    EXTRAPOLATED = "extrapolated"
+    RATE = "rate"
+    ADAPTIVE = "adaptive"
+    DECREASES = "decreases"
+    RESETS = "resets"
+    FAIL_FAST = "fail_fast"
+    CACHE = "cache"
+    HITS = "hits"
+    MISSES = "misses"
+    TIMING = "timing"
+    TOTAL = "total"
+    MEAN = "mean"
+    MAX = "max"
+    KEYWORDS = "keywords"
+    CALLS = "calls"
+    OTHER = "other"
+    TYPES = "types"
+
+
+# Counters of the managers writing to each stats collector, by prefix
+_VALIDATION_COUNTERS = weakref.WeakKeyDictionary()
+
+
+def get_validation_counters(stats, prefix=None):
+    """
+    Returns the ``ValidationCounters`` of the manager writing validation
+    stats with ``prefix`` to the ``stats`` collector, or ``None`` if there
+    is no such manager in this process.
+    """
+    try:
+        managers = _VALIDATION_COUNTERS.get(stats)
+    except TypeError:
+        return None
+    if managers is None:
+        return None
+    return managers.get(prefix or STATS_DEFAULT_VALIDATION_PREFIX)
+
+
+class ValidationCounters(object):
+    """
+    Validation counts kept in memory by ``ValidationStatsManager``, so
+    monitors running in the same process can read them without parsing
+    the names of the stats (see ``get_validation_counters``).
+
+    They are the counts written to the stats, without the ones
+    extrapolated from sampled items. ``field_errors`` counts the errors by
+    item type, field and error, with the names used in the stats. The
+    counts of each item type are in ``types``, with the same attributes.
+
+    ``error_samples`` has a ``Reservoir`` with samples of the errors found
+    for the keys of ``field_errors``, if they are sampled (see
+    ``ValidationStatsManager.add_field_error``).
+    """
+
+    def __init__(self):
+        self.items = 0
+        self.items_with_errors = 0
+        self.items_dropped = 0
+        self.fields = 0
+        self.field_errors = defaultdict(int)
+        self.error_samples = {}
+        self.types = {}
+
+    def get_type(self, name):
+        """Returns the counters of an item type, creating them if needed."""
+        if name not in self.types:
+            self.types[name] = ValidationCounters()
+        return self.types[name]
+
+
+class ItemTypeStatsNames(object):
+    """
+    Names of the stats increased for the items of a type, computed once
+    per type: the ones of all the items, followed by the ones of the type
+    if it is known and the manager writes them. ``counters`` are the
+    ``ValidationCounters`` to update, including the ones of the type.
+    """
+
+    __slots__ = (
+        "name",
+        "prefixes",
+        "items",
+        "items_with_errors",
+        "items_dropped",
+        "fields",
+        "field_errors",
+        "counters",
+    )
+
+    def __init__(self, manager, item_type):
+        self.name = None
+        self.prefixes = [()]
+        self.counters = [manager.counters]
+        if item_type is not None:
+            self.name = manager._get_name(item_type)
+            self.counters.append(manager.counters.get_type(self.name))
+            if manager.item_type_stats:
+                self.prefixes.append((NAMES.TYPES, item_type))
+        for attribute, names in [
+            ("items", (NAMES.ITEMS,)),
+            ("items_with_errors", (NAMES.ITEMS, NAMES.ERRORS)),
+            ("items_dropped", (NAMES.ITEMS, NAMES.DROPPED)),
+            ("fields", (NAMES.FIELDS,)),
+            ("field_errors", (NAMES.FIELDS, NAMES.ERRORS)),
+        ]:
+            setattr(
+                self,
+                attribute,
+                tuple(manager._get_stats_name(*(p + names)) for p in self.prefixes),
+            )
+
+
+class FieldErrorStatsNames(object):
+    """
+    Names of the stats increased for an error in a field of an item type:
+    ``all`` of them, and the ``own`` ones, without the totals of errors.
+    ``key`` is the key of the error in the ``field_errors`` of the
+    ``counters``.
+    """
+
+    __slots__ = ("all", "own", "key", "counters")
+
+    def __init__(self, manager, field, error, item_type_names):
+        self.all = []
+        self.own = []
+        for prefix in item_type_names.prefixes:
+            errors_name = manager._get_stats_name(
+                *(prefix + (NAMES.FIELDS, NAMES.ERRORS))
+            )
+            error_name = manager._get_stats_name(
+                *(prefix + (NAMES.FIELDS, NAMES.ERRORS, error))
+            )
+            self.all.extend([errors_name, error_name, error_name + "/" + field])
+            self.own.extend([error_name, error_name + "/" + field])
+        error_name = error_name[len(errors_name) + 1 :]
+        self.key = (item_type_names.name, field, error_name)
+        self.counters = item_type_names.counters
 
 
 class ValidationStatsManager(object):
-    def __init__(self, stats, prefix=None, slugify=True):
+    """
+    Writes the validation stats into the Scrapy stats collector.
+
+    When ``field_errors_limit`` is set, list indexes in field names are
+    replaced by ``*`` (e.g. ``tags.*`` instead of ``tags.0``) and only that
+    number of error and field pairs get their own stats. The rest of them
+    are counted under the ``other`` field of the ``other`` error, so the
+    total number of errors is still exact.
+
+    Until the manager is closed only the total number of errors is
+    written, and the errors are counted in ``other_field_errors``, a
+    summary of the most frequent pairs that takes a bounded amount of
+    memory. When it is closed, the most frequent pairs with exact counts
+    get their own stats, and the rest of the errors are counted as
+    ``other``. The counts of errors in ``counters`` are also written then.
+
+    Items validated with their type (``item_type``) are also counted by
+    type in ``counters``, and in the same stats under ``types/<item type>``
+    if ``item_type_stats`` is set.
+
+    The same counts are kept in ``counters``, a ``ValidationCounters``,
+    together with up to ``error_samples_size`` random samples of each
+    error.
+    """
+
+    def __init__(
+        self,
+        stats,
+        prefix=None,
+        slugify=True,
+        names_cache_size=STATS_NAMES_CACHE_SIZE,
+        field_errors_limit=None,
+        error_samples_size=0,
+        item_type_stats=False,
+    ):
         self.stats = stats
         self.prefix = prefix or STATS_DEFAULT_VALIDATION_PREFIX
         self.slugify = slugify
+        self.field_errors_limit = field_errors_limit
+        self.error_samples_size = error_samples_size
+        self.item_type_stats = item_type_stats
+        self.other_field_errors = None
+        if field_errors_limit:
+            self.other_field_errors = HeavyHitters(
+                capacity=max(field_errors_limit, OTHER_FIELD_ERRORS_MIN_CAPACITY)
+            )
+        # Item type: [count, extrapolated count] of the errors not written
+        self._pending_field_errors = defaultdict(lambda: [0, 0])
+        self.counters = ValidationCounters()
+        try:
+            _VALIDATION_COUNTERS.setdefault(stats, {})[self.prefix] = self.counters
+        except TypeError:
+            # Stats collectors that can not be weakly referenced
+            pass
+        self._names = LRUCache(maxsize=names_cache_size)
+        self._field_error_names = LRUCache(maxsize=names_cache_size)
+        self._item_type_names = {}
+        self._extrapolated_names = LRUCache(maxsize=names_cache_size)
 
     def add_validator(self, type, class_name):
         self.stats.inc_value(self._get_stats_name(NAMES.VALIDATORS))
@@ -25,27 +229,315 @@ class ValidationStatsManager(object):
             self._get_stats_name(NAMES.VALIDATORS, type, class_name), True
         )
 
-    def add_field_error(self, field, error):
-        self.stats.inc_value(self._get_stats_name(NAMES.FIELDS, NAMES.ERRORS))
-        self.stats.inc_value(self._get_stats_name(NAMES.FIELDS, NAMES.ERRORS, error))
-        self.stats.inc_value(
-            self._get_stats_name(NAMES.FIELDS, NAMES.ERRORS, error) + "/" + field
+    def add_fail_fast(self):
+        """
+        Flags that items stop being validated at their first errors, so
+        field error counts are lower bounds.
+        """
+        self.stats.set_value(self._get_stats_name(NAMES.FAIL_FAST), True)
+
+    def set_timings(self, type, name, timings):
+        """
+        Writes the times (in seconds) measured for a validator of an item
+        type: in total, per item and in each keyword of its schema.
+        """
+        items = timings.items
+        values = [
+            ((NAMES.ITEMS,), items.count),
+            ((NAMES.TOTAL,), items.total),
+            ((NAMES.MEAN,), items.mean),
+            ((NAMES.MAX,), items.max),
+        ]
+        for keyword, timing in timings.keywords.items():
+            names = (NAMES.KEYWORDS,) + keyword
+            values.append((names + (NAMES.CALLS,), timing.count))
+            values.append((names + (NAMES.TOTAL,), timing.total))
+        for names, value in values:
+            self.stats.set_value(
+                self._get_stats_name(NAMES.TIMING, type, name, *names), value
+            )
+
+    def add_field_error(
+        self, field, error, sampling_rate=None, item_type=None, get_sample=None
+    ):
+        """
+        Counts an error found in a field. ``get_sample`` is called to get a
+        sample of the error when it is kept in the ``error_samples`` of the
+        counters, under the same key as its count.
+        """
+        if self.field_errors_limit:
+            self._add_limited_field_error(
+                self._normalize_field(field),
+                error,
+                sampling_rate,
+                item_type,
+                get_sample,
+            )
+            return
+        names = self._get_field_error_names(field, error, item_type)
+        self._inc_sampled_values(names.all, sampling_rate=sampling_rate)
+        for counters in names.counters:
+            counters.field_errors[names.key] += 1
+        if get_sample is not None and self.error_samples_size:
+            self._add_error_sample(names, get_sample)
+
+    def add_fields(self, count, sampling_rate=None, item_type=None):
+        names = self._get_item_type_names(item_type)
+        self._inc_sampled_values(names.fields, count=count, sampling_rate=sampling_rate)
+        for counters in names.counters:
+            counters.fields += count
+
+    def add_item(self, sampling_rate=None, item_type=None):
+        names = self._get_item_type_names(item_type)
+        self._inc_sampled_values(names.items, sampling_rate=sampling_rate)
+        for counters in names.counters:
+            counters.items += 1
+
+    def add_dropped_item(self, item_type=None):
+        names = self._get_item_type_names(item_type)
+        self._inc_values(names.items_dropped)
+        for counters in names.counters:
+            counters.items_dropped += 1
+
+    def add_item_with_errors(self, sampling_rate=None, item_type=None):
+        names = self._get_item_type_names(item_type)
+        self._inc_sampled_values(names.items_with_errors, sampling_rate=sampling_rate)
+        for counters in names.counters:
+            counters.items_with_errors += 1
+
+    def add_results_cache_hit(self):
+        """Counts an item whose validation results were already known."""
+        self._inc_value(self._get_stats_name(NAMES.CACHE, NAMES.HITS))
+
+    def add_results_cache_miss(self):
+        """Counts an item whose validation results were not cached."""
+        self._inc_value(self._get_stats_name(NAMES.CACHE, NAMES.MISSES))
+
+    def add_sampling_item(self):
+        """Counts an item that could be selected to be validated."""
+        self._inc_value(self._get_stats_name(NAMES.SAMPLING, NAMES.ITEMS))
+
+    def add_sampling_decision(self, key, rate, spiked_fields):
+        """
+        Records a change of the sampling rate of an item type, because of
+        the error rate of ``spiked_fields`` or, if there are none, because
+        error rates are stable.
+        """
+        self.stats.set_value(
+            self._get_stats_name(NAMES.SAMPLING, NAMES.RATE, key), rate
+        )
+        if not spiked_fields:
+            self._inc_value(
+                self._get_stats_name(NAMES.SAMPLING, NAMES.ADAPTIVE, NAMES.DECREASES)
+            )
+            return
+        self._inc_value(
+            self._get_stats_name(NAMES.SAMPLING, NAMES.ADAPTIVE, NAMES.RESETS)
         )
+        for field in spiked_fields:
+            self._inc_value(
+                self._get_stats_name(
+                    NAMES.SAMPLING, NAMES.ADAPTIVE, NAMES.RESETS, field
+                )
+            )
+
+    def flush(self):
+        """
+        Writes any pending value to the stats collector. Values are written
+        right away by this manager, so there is nothing to do.
+        """
+
+    def close(self):
+        """
+        Gives their own stats to the most frequent errors when their number
+        is limited, and writes any pending value.
+        """
+        if self.field_errors_limit:
+            self._write_limited_field_errors()
+        self.flush()
+
+    def _inc_value(self, name, count=1):
+        self.stats.inc_value(name, count=count)
 
-    def add_fields(self, count):
-        self.stats.inc_value(self._get_stats_name(NAMES.FIELDS), count=count)
+    def _inc_values(self, names, count=1):
+        for name in names:
+            self._inc_value(name, count=count)
 
-    def add_item(self):
-        self.stats.inc_value(self._get_stats_name(NAMES.ITEMS))
+    def _inc_sampled_values(self, names, count=1, sampling_rate=None):
+        """
+        Increases the values of some stats for a validated item. Items
+        validated with a ``sampling_rate`` also increase the extrapolated
+        stats, by the number of items that each one of them represents.
+        """
+        self._inc_values(names, count=count)
+        if sampling_rate is not None:
+            for name in names:
+                self._inc_value(
+                    self._get_extrapolated_stats_name(name),
+                    count=count / float(sampling_rate),
+                )
 
-    def add_dropped_item(self):
-        self.stats.inc_value(self._get_stats_name(NAMES.ITEMS, NAMES.DROPPED))
+    def _get_extrapolated_stats_name(self, name):
+        extrapolated_name = self._extrapolated_names.get(name)
+        if extrapolated_name is None:
+            extrapolated_name = "/".join(
+                [
+                    self._get_stats_name(NAMES.SAMPLING, NAMES.EXTRAPOLATED),
+                    name[len(self.prefix) + 1 :],
+                ]
+            )
+            self._extrapolated_names.set(name, extrapolated_name)
+        return extrapolated_name
 
-    def add_item_with_errors(self):
-        self.stats.inc_value(self._get_stats_name(NAMES.ITEMS, NAMES.ERRORS))
+    def _normalize_field(self, field):
+        if "." in field:
+            return ".".join(
+                "*" if part.isdigit() else part for part in field.split(".")
+            )
+        return "*" if field.isdigit() else field
+
+    def _add_limited_field_error(
+        self, field, error, sampling_rate=None, item_type=None, get_sample=None
+    ):
+        extrapolated = 1 / float(sampling_rate) if sampling_rate is not None else 0
+        self.other_field_errors.add((item_type, field, error), value=extrapolated)
+        pending = self._pending_field_errors[item_type]
+        pending[0] += 1
+        pending[1] += extrapolated
+        names = self._get_item_type_names(item_type)
+        self._inc_sampled_values(names.field_errors, sampling_rate=sampling_rate)
+        if get_sample is not None and self.error_samples_size:
+            self._add_error_sample(
+                self._get_field_error_names(field, error, item_type), get_sample
+            )
+
+    def _write_limited_field_errors(self):
+        """
+        Writes the stats of the pairs with the highest exact counts, adding
+        up all the item types, and counts the rest of the errors as
+        ``other``, together with their samples.
+        """
+        if not self._pending_field_errors:
+            # No errors, or already written
+            return
+        other_field_errors = self.other_field_errors
+        counts = defaultdict(int)
+        for key, count in other_field_errors.most_common():
+            if other_field_errors.is_exact(key):
+                counts[key[1:]] += count
+        limit = self.field_errors_limit
+        written = set()
+        for field, error in sorted(counts, key=counts.get, reverse=True)[:limit]:
+            for item_type, pending in self._pending_field_errors.items():
+                key = (item_type, field, error)
+                if key in other_field_errors and other_field_errors.is_exact(key):
+                    count, extrapolated = other_field_errors.pop(key)
+                    pending[0] -= count
+                    pending[1] -= extrapolated
+                    written.add(self._write_field_error(key, count, extrapolated))
+        for key in list(self.counters.error_samples):
+            if key not in written:
+                self._move_error_samples(key)
+        for item_type, (count, extrapolated) in self._pending_field_errors.items():
+            if count:
+                self._write_field_error(
+                    (item_type, NAMES.OTHER, NAMES.OTHER), count, extrapolated
+                )
+        self._pending_field_errors.clear()
+
+    def _write_field_error(self, key, count, extrapolated):
+        item_type, field, error = key
+        names = self._get_field_error_names(field, error, item_type)
+        # Totals of errors were already written
+        self._inc_values(names.own, count=count)
+        if extrapolated:
+            self._inc_values(
+                [self._get_extrapolated_stats_name(n) for n in names.own],
+                count=extrapolated,
+            )
+        for counters in names.counters:
+            counters.field_errors[names.key] += count
+        return names.key
+
+    def _move_error_samples(self, key):
+        """Merges the samples of an error into the ones of ``other``."""
+        type_name = key[0]
+        all_counters = [self.counters]
+        if type_name is not None:
+            all_counters.append(self.counters.types[type_name])
+        other_key = (type_name, NAMES.OTHER, NAMES.OTHER)
+        other_reservoir = self.counters.error_samples.get(other_key)
+        if other_reservoir is None:
+            other_reservoir = Reservoir(self.error_samples_size)
+        for counters in all_counters:
+            reservoir = counters.error_samples.pop(key)
+            counters.error_samples[other_key] = other_reservoir
+        other_reservoir.merge(reservoir)
+
+    def _add_error_sample(self, names, get_sample):
+        # Every counters of the error share the same reservoir
+        reservoir = self.counters.error_samples.get(names.key)
+        if reservoir is None:
+            if len(self.counters.error_samples) >= ERROR_SAMPLES_MAX_KEYS:
+                return
+            reservoir = Reservoir(self.error_samples_size)
+            for counters in names.counters:
+                counters.error_samples[names.key] = reservoir
+        slot = reservoir.next_slot()
+        if slot is not None:
+            reservoir.put(slot, get_sample())
+
+    def _get_item_type_names(self, item_type):
+        names = self._item_type_names.get(item_type)
+        if names is None:
+            names = ItemTypeStatsNames(self, item_type)
+            self._item_type_names[item_type] = names
+        return names
+
+    def _get_field_error_names(self, field, error, item_type=None):
+        key = (field, error, item_type)
+        names = self._field_error_names.get(key)
+        if names is None:
+            names = FieldErrorStatsNames(
+                self, field, error, self._get_item_type_names(item_type)
+            )
+            self._field_error_names.set(key, names)
+        return names
 
     def _get_stats_name(self, *names):
-        return "/".join([self.prefix] + list([self._get_name(n) for n in names]))
+        stats_name = self._names.get(names)
+        if stats_name is None:
+            stats_name = "/".join(
+                [self.prefix] + list([self._get_name(n) for n in names])
+            )
+            self._names.set(names, stats_name)
+        return stats_name
 
     def _get_name(self, name):
         return slugify(text=name, separator="_").lower() if self.slugify else name
+
+
+class BufferedValidationStatsManager(ValidationStatsManager):
+    """
+    Accumulates the counters locally instead of increasing them in the stats
+    collector on every call. Pending values are written in bulk when
+    ``flush`` is called, so it is up to the owner of the manager to flush it
+    periodically and when the spider is closed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(BufferedValidationStatsManager, self).__init__(*args, **kwargs)
+        self._buffer = defaultdict(int)
+
+    def flush(self):
+        buffer, self._buffer = self._buffer, defaultdict(int)
+        for name, count in buffer.items():
+            self.stats.inc_value(name, count=count)
+
+    def _inc_value(self, name, count=1):
+        self._buffer[name] += count
+
+    def _inc_values(self, names, count=1):
+        buffer = self._buffer
+        for name in names:
+            buffer[name] += count
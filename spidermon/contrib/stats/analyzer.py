@@ -1,18 +1,40 @@
 from __future__ import absolute_import
 import re
+from bisect import bisect_left
+
+import six
+
+REGEX_SPECIAL_CHARS = set(".^$*+?{}[]\\|()")
+REGEX_QUANTIFIER_CHARS = set("*+?{")
+MAX_CHAR = six.unichr(0x10FFFF) if six.PY3 else six.unichr(0xFFFF)
 
 
 class StatsAnalyzer(object):
+    """
+    Searches stats keys using regular expressions.
+
+    Stats keys are sorted the first time a search is done, so each search
+    only needs to check the range of keys starting with the literal part of
+    the pattern instead of scanning all the stats. Keys are sorted again
+    when the number of stats changes, e.g. when new stats are added.
+    """
+
     def __init__(self, stats, prefix=None):
         self.stats = stats
         self.prefix = prefix or ""
+        self._sorted_keys = None
+        self._keys_order = None
+        self._unindexed_keys = None
+        self._indexed_size = None
 
     def search(self, pattern, include_matches=False):
-        pattern = re.compile(self._get_pattern(pattern))
+        pattern = self._get_pattern(pattern)
+        compiled_pattern = re.compile(pattern)
         results = {}
-        for key, count in self.stats.items():
-            match = pattern.match(key)
+        for key in self._get_candidate_keys(pattern):
+            match = compiled_pattern.match(key)
             if match:
+                count = self.stats[key]
                 if include_matches:
                     results[key] = (
                         count,
@@ -22,8 +44,86 @@ class StatsAnalyzer(object):
                     results[key] = count
         return results
 
+    def children(self, path):
+        """
+        Returns a list of ``(name, count)`` tuples for the stats that are
+        directly under ``path``, in the same order they were added to the
+        stats. It is equivalent to searching for ``path/([^/]+)$``.
+        """
+        path = self._get_pattern(path) + "/"
+        start = len(path)
+        keys = [
+            key
+            for key in self._get_keys_starting_with(path)
+            if len(key) > start and key.find("/", start) == -1
+        ]
+        return [(key[start:], self.stats[key]) for key in self._sort_keys(keys)]
+
+    def get_child(self, path):
+        """
+        Returns an analyzer of the stats under ``path``, that shares the
+        sorted keys of this one, if they were already sorted, instead of
+        sorting them again.
+        """
+        child = StatsAnalyzer(stats=self.stats, prefix=self._get_pattern(path))
+        child._sorted_keys = self._sorted_keys
+        child._keys_order = self._keys_order
+        child._unindexed_keys = self._unindexed_keys
+        child._indexed_size = self._indexed_size
+        return child
+
     def _get_pattern(self, pattern):
         if self.prefix:
             return "/".join([self.prefix, pattern])
         else:
             return pattern
+
+    def _get_candidate_keys(self, pattern):
+        literal, remaining = self._split_literal_prefix(pattern)
+        self._build_index()
+        if remaining == "$":
+            # Full key: only that key (or the same key with a trailing new
+            # line, that is also matched by '$') can be matched
+            keys = [key for key in [literal, literal + "\n"] if key in self.stats]
+        else:
+            keys = self._sort_keys(self._get_keys_starting_with(literal))
+        return keys + self._unindexed_keys
+
+    def _split_literal_prefix(self, pattern):
+        """
+        Splits the pattern in the literal prefix every key matched by the
+        pattern must start with and the remaining part of the pattern.
+        """
+        if "|" in pattern:
+            return "", pattern
+        for i, char in enumerate(pattern):
+            if char in REGEX_SPECIAL_CHARS:
+                if char in REGEX_QUANTIFIER_CHARS:
+                    i = max(i - 1, 0)
+                return pattern[:i], pattern[i:]
+        return pattern, ""
+
+    def _get_keys_starting_with(self, prefix):
+        self._build_index()
+        if not prefix:
+            return self._sorted_keys
+        start = bisect_left(self._sorted_keys, prefix)
+        end = bisect_left(self._sorted_keys, prefix + MAX_CHAR, lo=start)
+        return self._sorted_keys[start:end]
+
+    def _sort_keys(self, keys):
+        """Sorts the keys in the same order they have in the stats."""
+        return sorted(keys, key=self._keys_order.__getitem__)
+
+    def _build_index(self):
+        if self._sorted_keys is not None and self._indexed_size == len(self.stats):
+            return
+        keys = list(self.stats)
+        self._indexed_size = len(keys)
+        self._keys_order = dict(zip(keys, range(len(keys))))
+        self._unindexed_keys = [
+            key for key in keys if not isinstance(key, six.string_types)
+        ]
+        if self._unindexed_keys:
+            keys = [key for key in keys if isinstance(key, six.string_types)]
+        self._sorted_keys = sorted(keys)
@@ -1,2 +1,6 @@
 from .schematics.validator import SchematicsValidator
-from .jsonschema.validator import JSONSchemaValidator
+from .jsonschema.validator import (
+    JSONSchemaValidator,
+    CompiledJSONSchemaValidator,
+    ColumnarJSONSchemaValidator,
+)
@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+import gzip
+import json
+import mmap
+import os
+
+from .workers import ValidationWorkerPool, validate_batch
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def get_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits a JSON Lines file, that can be compressed with gzip, in chunks
+    of about ``chunk_size`` bytes with whole lines, that are read with
+    ``read_lines``.
+
+    Plain files are memory-mapped only to find where their lines end, so
+    chunks are just ``(path, start, end)`` tuples and each one can be read
+    by a different process. Compressed files can only be read in order, so
+    their chunks are the lines read.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    return
+                yield data + f.readline()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = 0
+            while start < size:
+                end = mapped.find(b"\n", start + chunk_size - 1)
+                end = size if end == -1 else end + 1
+                yield path, start, end
+                start = end
+        finally:
+            mapped.close()
+
+
+def read_lines(chunk):
+    """Returns the lines of a chunk returned by ``get_chunks``."""
+    if isinstance(chunk, bytes):
+        return chunk.splitlines()
+    path, start, end = chunk
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return mapped[start:end].splitlines()
+        finally:
+            mapped.close()
+
+
+def validate_chunk(validators, element):
+    """
+    Validates the items in a ``(key, chunk)`` tuple with the lists of
+    ``validators`` of the key, returning their number of fields and the
+    ``(ok, errors)`` results of every validator for each item.
+    """
+    key, chunk = element
+    batch = []
+    for line in read_lines(chunk):
+        if not line.strip():
+            continue
+        data = json.loads(line.decode("utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("JSON Lines items must be objects: {!r}".format(line))
+        batch.append((key, data))
+    results = validate_batch(validators, batch)
+    return [(len(data), result) for (_, data), result in zip(batch, results)]
+
+
+def validate_files(
+    paths, validators, key, workers=0, chunk_size=DEFAULT_CHUNK_SIZE, backend=None
+):
+    """
+    Validates the items of JSON Lines files with the lists of
+    ``validators`` of ``key``, yielding their number of fields and the
+    ``(ok, errors)`` results of every validator for each item, in the same
+    order they have in the files.
+
+    Chunks of the files are validated by a pool of ``workers`` (see
+    ``ValidationWorkerPool``), or in this thread if there are none.
+    """
+    elements = (
+        (key, chunk) for path in paths for chunk in get_chunks(path, chunk_size)
+    )
+    if not workers:
+        for element in elements:
+            for result in validate_chunk(validators, element):
+                yield result
+        return
+    kwargs = {"backend": backend} if backend else {}
+    pool = ValidationWorkerPool(validators, workers=workers, **kwargs)
+    try:
+        for results in pool.map(validate_chunk, elements):
+            for result in results:
+                yield result
+    finally:
+        pool.close()
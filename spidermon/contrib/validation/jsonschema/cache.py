@@ -0,0 +1,153 @@
+from __future__ import absolute_import
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import closing
+
+from six.moves.urllib.error import HTTPError
+from six.moves.urllib.request import Request, urlopen
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCache(object):
+    """
+    On-disk cache of the schemas fetched from URLs, that can be shared by
+    every job using the same ``path``.
+
+    Contents are stored once, in files named by their SHA-256 hash. The
+    hash of the current contents of each URL is stored with the ``ETag``
+    and ``Last-Modified`` headers of its response, in a file named by the
+    hash of the URL. Cached URLs are revalidated with a conditional request,
+    so their contents are only downloaded again when they change. When the
+    request fails, or the cache is ``offline``, cached contents are used
+    without revalidating them.
+
+    Files are written to a temporary file that is renamed once complete, so
+    jobs running at the same time never read partial files.
+
+    example:
+    >> cache = SchemaCache('/tmp/schemas')
+    >> cache.get_contents('https://example.com/schema.json', timeout=10)
+    '{"type": "object"}'
+    """
+
+    def __init__(self, path, offline=False):
+        self.path = path
+        self.offline = offline
+        for directory in (self._get_urls_path(), self._get_contents_path()):
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+    def get_contents(self, url, timeout=None):
+        entry = self._read_entry(url)
+        cached = self._read_contents(entry["sha256"]) if entry else None
+        if self.offline:
+            if cached is None:
+                logger.error("'{}' is not in the schema cache".format(url))
+            return cached
+
+        headers = {}
+        if cached is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        try:
+            with closing(urlopen(Request(url, headers=headers), **kwargs)) as f:
+                contents = f.read()
+                info = f.info()
+            text = contents.decode("utf-8")
+        except HTTPError as e:
+            if e.code == 304 and cached is not None:
+                return cached
+            return self._get_cached_after_error(url, e, cached)
+        except Exception as e:
+            return self._get_cached_after_error(url, e, cached)
+
+        try:
+            sha256 = self._write_contents(contents)
+            self._write_entry(
+                url,
+                {
+                    "sha256": sha256,
+                    "etag": info.get("ETag"),
+                    "last_modified": info.get("Last-Modified"),
+                },
+            )
+        except (IOError, OSError) as e:
+            logger.warning(
+                "{}\nCould not store '{}' in the schema cache".format(e, url)
+            )
+        return text
+
+    def _get_cached_after_error(self, url, error, cached):
+        if cached is None:
+            logger.exception("{}\nFailed to get '{}'".format(error, url))
+        else:
+            logger.warning(
+                "{}\nFailed to get '{}', using the cached schema".format(error, url)
+            )
+        return cached
+
+    def _get_urls_path(self, *names):
+        return os.path.join(self.path, "urls", *names)
+
+    def _get_contents_path(self, *names):
+        return os.path.join(self.path, "contents", *names)
+
+    def _get_entry_path(self, url):
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json"
+        return self._get_urls_path(name)
+
+    def _read_entry(self, url):
+        try:
+            with open(self._get_entry_path(url), "r") as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    def _write_entry(self, url, entry):
+        entry = dict(entry, url=url)
+        self._write_file(self._get_entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def _read_contents(self, sha256):
+        try:
+            with open(self._get_contents_path(sha256 + ".json"), "rb") as f:
+                contents = f.read()
+        except (IOError, OSError):
+            return None
+        if hashlib.sha256(contents).hexdigest() != sha256:
+            return None
+        return contents.decode("utf-8")
+
+    def _write_contents(self, contents):
+        sha256 = hashlib.sha256(contents).hexdigest()
+        path = self._get_contents_path(sha256 + ".json")
+        if self._read_contents(sha256) is None:
+            self._write_file(path, contents)
+        return sha256
+
+    def _write_file(self, path, contents):
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(contents)
+            _replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+
+def _replace(source, destination):
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        # Python 2 only renames over existing files in POSIX systems
+        os.rename(source, destination)
@@ -0,0 +1,409 @@
+from __future__ import absolute_import
+import re
+from collections import defaultdict
+
+import six
+from jsonschema import _utils
+from jsonschema.validators import (
+    Draft4Validator,
+    Draft6Validator,
+    Draft7Validator,
+    RefResolver,
+    validator_for,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+DRAFTS = {Draft4Validator: 4, Draft6Validator: 6, Draft7Validator: 7}
+
+SIMPLE_KEYWORDS = frozenset(
+    [
+        "type",
+        "minLength",
+        "maxLength",
+        "minimum",
+        "maximum",
+        "exclusiveMinimum",
+        "exclusiveMaximum",
+        "enum",
+        "pattern",
+    ]
+)
+
+# Type codes of the values of a column. Values of other types (including
+# subclasses of these ones) are validated with jsonschema
+NULL, BOOLEAN, INTEGER, FLOAT, STRING, ARRAY, OBJECT, OTHER = range(8)
+TYPE_CODES = dict(
+    [(type(None), NULL), (bool, BOOLEAN), (float, FLOAT), (list, ARRAY), (dict, OBJECT)]
+    + [(int_type, INTEGER) for int_type in six.integer_types]
+    + [(str_type, STRING) for str_type in six.string_types]
+)
+JSON_TYPE_CODES = {
+    "null": [NULL],
+    "boolean": [BOOLEAN],
+    "integer": [INTEGER],
+    "number": [INTEGER, FLOAT],
+    "string": [STRING],
+    "array": [ARRAY],
+    "object": [OBJECT],
+}
+# Integers out of this range can not be compared exactly as floats
+MAX_EXACT_INTEGER = 2 ** 53
+
+
+class FieldColumn(object):
+    """
+    Checks the simple constraints of a top level property for the values of
+    that property in a batch of items.
+    """
+
+    def __init__(self, name, schema, draft, validator):
+        self.name = name
+        self.schema = schema
+        self.draft = draft
+        self.validator = validator
+        self._checks = []
+        for keyword, value in schema.items():
+            method = getattr(self, "_check_" + keyword, None)
+            if keyword in validator.VALIDATORS and method is not None:
+                self._checks.append((keyword, value, method))
+
+    def validate(self, values):
+        """
+        Returns the ``(index, keyword position, message)`` tuples of the
+        errors found in ``values``.
+        """
+        codes = np.fromiter(
+            (TYPE_CODES.get(type(value), OTHER) for value in values),
+            dtype=np.int8,
+            count=len(values),
+        )
+        column = _Column(values, codes)
+        errors = []
+        for position, (keyword, value, method) in enumerate(self._checks):
+            failed = method(column, value)
+            for index in np.flatnonzero(failed):
+                errors.append(
+                    (index, position, self._get_message(keyword, value, values[index]))
+                )
+        # Values that can't be checked in the column are checked one by one
+        for index in np.flatnonzero(column.is_other):
+            for error in self.validator.iter_errors(values[index]):
+                position = [keyword for keyword, _, _ in self._checks].index(
+                    error.schema_path[0]
+                )
+                errors.append((index, position, error.message))
+        return errors
+
+    def _get_message(self, keyword, value, instance):
+        if keyword == "type":
+            return _utils.types_msg(instance, _utils.ensure_list(value))
+        if keyword == "enum":
+            return "%r is not one of %r" % (instance, value)
+        if keyword == "pattern":
+            return "%r does not match %r" % (instance, value)
+        if keyword == "minLength":
+            return "%r is too short" % (instance,)
+        if keyword == "maxLength":
+            return "%r is too long" % (instance,)
+        if keyword in ("minimum", "exclusiveMinimum"):
+            exclusive = keyword == "exclusiveMinimum" or (
+                self.draft < 6 and self.schema.get("exclusiveMinimum", False)
+            )
+            return "%r is less than %sthe minimum of %r" % (
+                instance,
+                "or equal to " if exclusive else "",
+                value,
+            )
+        exclusive = keyword == "exclusiveMaximum" or (
+            self.draft < 6 and self.schema.get("exclusiveMaximum", False)
+        )
+        return "%r is greater than %sthe maximum of %r" % (
+            instance,
+            "or equal to " if exclusive else "",
+            value,
+        )
+
+    def _check_type(self, column, types):
+        codes = [
+            code for name in _utils.ensure_list(types) for code in JSON_TYPE_CODES[name]
+        ]
+        valid = np.isin(column.codes, codes)
+        if "integer" in types and self.draft >= 6:
+            valid |= column.is_float_integer
+        return ~valid & ~column.is_other
+
+    def _check_minLength(self, column, limit):
+        return column.is_string & (column.lengths < limit)
+
+    def _check_maxLength(self, column, limit):
+        return column.is_string & (column.lengths > limit)
+
+    def _check_minimum(self, column, limit):
+        if self.draft < 6 and self.schema.get("exclusiveMinimum", False):
+            return column.is_number & (column.numbers <= limit)
+        return column.is_number & (column.numbers < limit)
+
+    def _check_maximum(self, column, limit):
+        if self.draft < 6 and self.schema.get("exclusiveMaximum", False):
+            return column.is_number & (column.numbers >= limit)
+        return column.is_number & (column.numbers > limit)
+
+    def _check_exclusiveMinimum(self, column, limit):
+        return column.is_number & (column.numbers <= limit)
+
+    def _check_exclusiveMaximum(self, column, limit):
+        return column.is_number & (column.numbers >= limit)
+
+    def _check_pattern(self, column, pattern):
+        regex = re.compile(pattern)
+        # Values are often repeated, so each one is searched only once
+        matches = {}
+        failed = np.zeros(len(column.values), dtype=bool)
+        for index in column.string_indexes:
+            value = column.values[index]
+            if value not in matches:
+                matches[value] = regex.search(value) is None
+            failed[index] = matches[value]
+        return failed
+
+    def _check_enum(self, column, enums):
+        strings = set(each for each in enums if isinstance(each, six.string_types))
+        failed = np.zeros(len(column.values), dtype=bool)
+        for index in np.flatnonzero(~column.is_other):
+            value = column.values[index]
+            if column.codes[index] == STRING:
+                failed[index] = value not in strings
+            elif value == 0 or value == 1:
+                unbooled = _utils.unbool(value)
+                failed[index] = all(unbooled != _utils.unbool(each) for each in enums)
+            else:
+                failed[index] = value not in enums
+        return failed
+
+
+class _Column(object):
+    """Values of a property with the arrays needed to check them."""
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+        self.is_string = codes == STRING
+        is_number = (codes == INTEGER) | (codes == FLOAT)
+        self.is_other = codes == OTHER
+        self.numbers = np.zeros(len(values), dtype=np.float64)
+        number_indexes = np.flatnonzero(is_number)
+        numbers = []
+        for index in number_indexes:
+            value = values[index]
+            if codes[index] == INTEGER and abs(value) > MAX_EXACT_INTEGER:
+                self.is_other[index] = True
+                value = 0
+            numbers.append(value)
+        self.numbers[number_indexes] = numbers
+        self.is_number = is_number & ~self.is_other
+        with np.errstate(invalid="ignore"):
+            self.is_float_integer = (
+                (codes == FLOAT)
+                & np.isfinite(self.numbers)
+                & (np.floor(self.numbers) == self.numbers)
+            )
+        self._lengths = None
+
+    @property
+    def string_indexes(self):
+        return np.flatnonzero(self.is_string)
+
+    @property
+    def lengths(self):
+        if self._lengths is None:
+            self._lengths = np.zeros(len(self.values), dtype=np.int64)
+            indexes = self.string_indexes
+            self._lengths[indexes] = [len(self.values[index]) for index in indexes]
+        return self._lengths
+
+
+class ColumnarSchema(object):
+    """
+    JSON schema split in the simple constraints of its top level properties
+    (and its ``required`` properties), that are checked by columns for a
+    batch of items, and the rest of the schema, that is validated item by
+    item with ``jsonschema``.
+
+    ``iter_batch_errors`` returns the errors of each item of a batch in the
+    same order and with the same messages and paths as the ``jsonschema``
+    validator of the whole schema.
+    """
+
+    def __init__(self, schema, format_checker=None):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required to validate items by columns")
+        self.schema = schema
+        validator_cls = validator_for(schema)
+        self.validator = validator_cls(schema, format_checker=format_checker)
+        self.is_split = False
+        self.columns = []
+        self.required = []
+        self.residual = None
+        self._keyword_positions = {}
+        self._property_positions = {}
+        draft = DRAFTS.get(validator_cls)
+        if draft is not None and isinstance(schema, dict) and "$ref" not in schema:
+            self._split(draft, validator_cls, format_checker)
+
+    def _split(self, draft, validator_cls, format_checker):
+        self.is_split = True
+        residual = dict(self.schema)
+        properties = self.schema.get("properties")
+        if isinstance(properties, dict):
+            residual_properties = {}
+            for position, (name, subschema) in enumerate(properties.items()):
+                self._property_positions[name] = position
+                if self._is_simple(subschema, validator_cls):
+                    validator = validator_cls(subschema, format_checker=format_checker)
+                    self.columns.append(FieldColumn(name, subschema, draft, validator))
+                    # The property is kept for additionalProperties
+                    residual_properties[name] = {}
+                else:
+                    residual_properties[name] = subschema
+            residual["properties"] = residual_properties
+        required = self.schema.get("required")
+        if isinstance(required, list) and all(
+            isinstance(name, six.string_types) for name in required
+        ):
+            self.required = required
+            del residual["required"]
+        if "object" in _utils.ensure_list(residual.get("type", [])):
+            # Only objects are validated by columns
+            del residual["type"]
+        self._keyword_positions = dict(
+            (keyword, position) for position, keyword in enumerate(self.schema)
+        )
+        if self._needs_residual(residual, validator_cls):
+            self.residual = validator_cls(
+                residual,
+                resolver=RefResolver.from_schema(
+                    self.schema, id_of=validator_cls.ID_OF
+                ),
+                format_checker=format_checker,
+            )
+
+    def _is_simple(self, schema, validator_cls):
+        if not isinstance(schema, dict) or "$ref" in schema:
+            return False
+        for keyword, value in schema.items():
+            if keyword not in validator_cls.VALIDATORS:
+                continue
+            if keyword not in SIMPLE_KEYWORDS:
+                return False
+            if keyword == "type":
+                types = _utils.ensure_list(value)
+                if not isinstance(types, list) or not all(
+                    isinstance(name, six.string_types) and name in JSON_TYPE_CODES
+                    for name in types
+                ):
+                    return False
+            elif keyword == "enum":
+                if not isinstance(value, list):
+                    return False
+            elif keyword == "pattern":
+                try:
+                    re.compile(value)
+                except (re.error, TypeError):
+                    return False
+            elif isinstance(value, bool) or not isinstance(
+                value, six.integer_types + (float,)
+            ):
+                return False
+            elif abs(value) > MAX_EXACT_INTEGER:
+                return False
+        return True
+
+    def _needs_residual(self, residual, validator_cls):
+        for keyword, value in residual.items():
+            if keyword not in validator_cls.VALIDATORS:
+                continue
+            if (
+                keyword == "properties"
+                and isinstance(value, dict)
+                and all(subschema == {} for subschema in value.values())
+            ):
+                continue
+            return True
+        return False
+
+    def iter_batch_errors(self, batch):
+        """
+        Returns a list with the errors of each item of the batch, as
+        ``(absolute_path, message)`` tuples.
+        """
+        errors = [[] for _ in batch]
+        objects = []
+        for index, data in enumerate(batch):
+            if self.is_split and isinstance(data, dict):
+                objects.append(index)
+            else:
+                errors[index] = [
+                    (error.absolute_path, error.message)
+                    for error in self.validator.iter_errors(data)
+                ]
+        if not objects:
+            return errors
+
+        # Errors are sorted to get the same order they have in jsonschema,
+        # that follows the order of the keywords in the schema
+        sortable_errors = defaultdict(list)
+        properties_position = self._keyword_positions.get("properties")
+        for column in self.columns:
+            indexes = [index for index in objects if column.name in batch[index]]
+            values = [batch[index][column.name] for index in indexes]
+            if not values:
+                continue
+            property_position = self._property_positions[column.name]
+            for index, position, message in column.validate(values):
+                sortable_errors[indexes[index]].append(
+                    (
+                        (properties_position, property_position, position),
+                        [column.name],
+                        message,
+                    )
+                )
+        required_position = self._keyword_positions.get("required")
+        for position, name in enumerate(self.required):
+            message = "%r is a required property" % name
+            for index in objects:
+                if name not in batch[index]:
+                    sortable_errors[index].append(
+                        ((required_position, position, 0), [], message)
+                    )
+        if self.residual is not None:
+            for index in objects:
+                for position, error in enumerate(
+                    self.residual.iter_errors(batch[index])
+                ):
+                    keyword = error.schema_path[0]
+                    property_position = 0
+                    if keyword == "properties":
+                        property_position = self._property_positions[
+                            error.schema_path[1]
+                        ]
+                    sortable_errors[index].append(
+                        (
+                            (
+                                self._keyword_positions[keyword],
+                                property_position,
+                                position,
+                            ),
+                            error.absolute_path,
+                            error.message,
+                        )
+                    )
+        for index, item_errors in sortable_errors.items():
+            item_errors.sort(key=lambda error: error[0])
+            errors[index] = [(path, message) for _, path, message in item_errors]
+        return errors
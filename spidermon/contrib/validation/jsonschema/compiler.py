@@ -0,0 +1,643 @@
+from __future__ import absolute_import
+import numbers
+import re
+from collections import namedtuple
+
+import six
+from jsonschema import _utils
+from jsonschema.exceptions import FormatError, RefResolutionError
+from jsonschema.validators import (
+    Draft4Validator,
+    Draft6Validator,
+    Draft7Validator,
+    RefResolver,
+    validator_for,
+)
+
+SchemaError = namedtuple("SchemaError", ["absolute_path", "message"])
+
+DRAFT4_KEYWORDS = frozenset(Draft4Validator.VALIDATORS)
+DRAFT6_KEYWORDS = frozenset(Draft6Validator.VALIDATORS)
+DRAFT7_KEYWORDS = frozenset(Draft7Validator.VALIDATORS)
+
+SUPPORTED_DRAFTS = {
+    Draft4Validator: (4, DRAFT4_KEYWORDS, "id"),
+    Draft6Validator: (6, DRAFT6_KEYWORDS, "$id"),
+    Draft7Validator: (7, DRAFT7_KEYWORDS, "$id"),
+}
+
+TYPE_CHECKS = {
+    "array": "isinstance({0}, list)",
+    "boolean": "isinstance({0}, bool)",
+    "integer": "(isinstance({0}, int_types) and not isinstance({0}, bool))",
+    "null": "{0} is None",
+    # Checking the exact type first avoids the slower ABC check for the
+    # usual numbers
+    "number": (
+        "(type({0}) in number_types"
+        " or (isinstance({0}, Number) and not isinstance({0}, bool)))"
+    ),
+    "object": "isinstance({0}, dict)",
+    "string": "isinstance({0}, str_types)",
+}
+# Since draft 6, floats without a fractional part are integers too
+DRAFT6_INTEGER_CHECK = (
+    "((isinstance({0}, int_types) and not isinstance({0}, bool))"
+    " or (isinstance({0}, float) and {0}.is_integer()))"
+)
+
+
+class SchemaNotSupported(Exception):
+    """Raised when a schema uses features that can not be compiled."""
+
+
+def _is_valid(function, instance):
+    errors = []
+    function(instance, (), errors)
+    return not errors
+
+
+class CompiledSchema(object):
+    """
+    JSON schema compiled into Python functions.
+
+    ``iter_errors`` returns the errors found in an instance in the same
+    order and with the same messages and paths as the ``jsonschema``
+    validator of the schema, as ``SchemaError`` tuples.
+    """
+
+    def __init__(self, schema, source, function):
+        self.schema = schema
+        self.source = source
+        self._function = function
+
+    def iter_errors(self, instance):
+        errors = []
+        self._function(instance, (), errors)
+        return [SchemaError._make(error) for error in errors]
+
+    def report_errors(self, instance, callback):
+        """
+        Calls ``callback`` with the absolute path and the message of each
+        error as soon as it is found, so validation can be stopped by
+        raising an exception from it.
+        """
+        self._function(instance, (), _ErrorReporter(callback))
+
+
+class _ErrorReporter(list):
+    """
+    List of errors given to compiled functions that reports each error
+    instead of keeping it. Sub-schemas checked only to know if they are
+    valid (e.g. ``anyOf``) get their own lists, so only the errors of the
+    instance are reported.
+    """
+
+    def __init__(self, callback):
+        super(_ErrorReporter, self).__init__()
+        self._callback = callback
+
+    def append(self, error):
+        self._callback(*error)
+
+
+class SchemaCompiler(object):
+    """
+    Generates the source code of a Python function for each sub-schema of a
+    JSON schema, with the checks of its keywords unrolled for the values
+    found in the schema.
+
+    Schemas of drafts 4, 6 and 7 are supported, as long as they only
+    reference (with ``$ref``) parts of the same document and do not change
+    the resolution scope of sub-schemas. ``SchemaNotSupported`` is raised
+    otherwise.
+
+    With a ``SchemaRegistry``, sub-schemas without references that were
+    already compiled for other schemas of the registry reuse their
+    functions instead of being compiled again.
+
+    example:
+    >> compiled = SchemaCompiler({'required': ['url']}).compile()
+    >> compiled.iter_errors({})
+    [SchemaError(absolute_path=(), message="'url' is a required property")]
+    """
+
+    def __init__(self, schema, format_checker=None, registry=None):
+        self.schema = schema
+        self.format_checker = format_checker
+        self.registry = registry
+        try:
+            draft = SUPPORTED_DRAFTS[validator_for(schema)]
+        except (KeyError, AttributeError, TypeError):
+            raise SchemaNotSupported("Only drafts 4, 6 and 7 can be compiled")
+        self.draft, self.keywords, self.id_keyword = draft
+        self._resolver = None
+        self._namespace = {}
+        self._functions = {}
+        self._pending = []
+        self._compiled = []
+        self._lines = []
+        self._names = 0
+
+    def compile(self):
+        root = self._get_function(self.schema) or "_accept"
+        while self._pending:
+            self._compile_function(*self._pending.pop(0))
+        source = "\n".join(self._lines)
+        namespace = dict(
+            self._namespace,
+            FormatError=FormatError,
+            Number=numbers.Number,
+            number_types=six.integer_types + (float,),
+            equal=_utils.equal,
+            extras_msg=_utils.extras_msg,
+            int_types=six.integer_types,
+            is_valid=_is_valid,
+            iteritems=six.iteritems,
+            str_types=six.string_types,
+            types_msg=_utils.types_msg,
+            unbool=_utils.unbool,
+            uniq=_utils.uniq,
+        )
+        six.exec_("def _accept(instance, path, errors):\n    pass\n", namespace)
+        six.exec_(compile(source, "<compiled jsonschema>", "exec"), namespace)
+        if self.registry is not None:
+            for name, schema in self._compiled:
+                if self.registry.is_context_free(schema):
+                    self.registry.add_function(schema, self.draft, namespace[name])
+        return CompiledSchema(self.schema, source, namespace[root])
+
+    def _get_function(self, schema):
+        """
+        Returns the name of the function that validates ``schema``, or
+        ``None`` if the schema accepts any instance.
+        """
+        if schema is True or (
+            isinstance(schema, dict)
+            and "$ref" not in schema
+            and not self.keywords.intersection(schema)
+        ):
+            return None
+        if schema is not False and not isinstance(schema, dict):
+            raise SchemaNotSupported("Invalid schema: {!r}".format(schema))
+        if (
+            schema is not self.schema
+            and isinstance(schema, dict)
+            and self.id_keyword in schema
+        ):
+            raise SchemaNotSupported("Resolution scopes can not be changed")
+        key = id(schema)
+        if key not in self._functions:
+            shared = self._get_shared_function(schema)
+            if shared is not None:
+                self._functions[key] = self._constant(shared)
+            else:
+                name = "_validate_{}".format(len(self._functions))
+                self._functions[key] = name
+                self._pending.append((name, schema))
+        return self._functions[key]
+
+    def _get_shared_function(self, schema):
+        if self.registry is None or not self.registry.is_context_free(schema):
+            return None
+        return self.registry.get_function(schema, self.draft)
+
+    def _compile_function(self, name, schema):
+        self._compiled.append((name, schema))
+        self._lines.append("def {}(instance, path, errors):".format(name))
+        if schema is False:
+            self._error(1, '"False schema does not allow %r" % (instance,)')
+        elif schema.get("$ref") is not None:
+            self._compile_ref(schema["$ref"])
+        else:
+            for keyword, value in schema.items():
+                if keyword in self.keywords:
+                    method = "_compile_" + keyword.lstrip("$")
+                    getattr(self, method)(value, schema)
+        self._lines.append("    pass")
+        self._lines.append("")
+
+    def _emit(self, indent, line, *args):
+        self._lines.append("    " * indent + line.format(*args))
+
+    def _error(self, indent, message, path="path"):
+        self._emit(indent, "errors.append(({}, {}))", path, message)
+
+    def _call(self, indent, schema, instance="instance", path="path"):
+        function = self._get_function(schema)
+        if function is not None:
+            self._emit(indent, "{}({}, {}, errors)", function, instance, path)
+
+    def _is_valid(self, schema, instance="instance"):
+        function = self._get_function(schema)
+        if function is None:
+            return "True"
+        return "is_valid({}, {})".format(function, instance)
+
+    def _constant(self, value):
+        self._names += 1
+        name = "_c{}".format(self._names)
+        self._namespace[name] = value
+        return name
+
+    def _regex(self, pattern):
+        try:
+            return self._constant(re.compile(pattern))
+        except (re.error, TypeError):
+            raise SchemaNotSupported("Invalid regular expression: {!r}".format(pattern))
+
+    def _variable(self, prefix):
+        self._names += 1
+        return "{}{}".format(prefix, self._names)
+
+    def _type_check(self, type_name, instance="instance"):
+        if type_name == "integer" and self.draft >= 6:
+            return DRAFT6_INTEGER_CHECK.format(instance)
+        return TYPE_CHECKS[type_name].format(instance)
+
+    def _check_value(self, valid, value):
+        if not valid:
+            raise SchemaNotSupported("Invalid keyword value: {!r}".format(value))
+
+    def _compile_ref(self, ref):
+        self._check_value(isinstance(ref, six.string_types), ref)
+        if not ref.startswith("#"):
+            raise SchemaNotSupported("Only references to the same schema are supported")
+        if self._resolver is None:
+            self._resolver = RefResolver.from_schema(self.schema)
+        try:
+            resolved = self._resolver.resolve_fragment(self.schema, ref[1:])
+        except RefResolutionError:
+            raise SchemaNotSupported("Unresolvable reference: {}".format(ref))
+        self._call(1, resolved)
+
+    def _compile_type(self, types, schema):
+        types = _utils.ensure_list(types)
+        self._check_value(
+            all(
+                isinstance(type_name, six.string_types) and type_name in TYPE_CHECKS
+                for type_name in types
+            ),
+            types,
+        )
+        checks = " or ".join(self._type_check(type_name) for type_name in types)
+        self._emit(1, "if not ({}):", checks or "False")
+        self._error(2, "types_msg(instance, {})".format(self._constant(types)))
+
+    def _compile_properties(self, properties, schema):
+        self._check_value(isinstance(properties, dict), properties)
+        self._emit(1, "if isinstance(instance, dict):")
+        for property, subschema in properties.items():
+            function = self._get_function(subschema)
+            if function is None:
+                continue
+            property = self._constant(property)
+            self._emit(2, "if {} in instance:", property)
+            self._emit(
+                3,
+                "{}(instance[{}], path + ({},), errors)",
+                function,
+                property,
+                property,
+            )
+        self._emit(2, "pass")
+
+    def _compile_patternProperties(self, pattern_properties, schema):
+        self._check_value(isinstance(pattern_properties, dict), pattern_properties)
+        self._emit(1, "if isinstance(instance, dict):")
+        for pattern, subschema in pattern_properties.items():
+            key, value = self._variable("_k"), self._variable("_v")
+            self._emit(2, "for {}, {} in iteritems(instance):", key, value)
+            self._emit(3, "if {}.search({}):", self._regex(pattern), key)
+            self._call(4, subschema, value, "path + ({},)".format(key))
+            self._emit(4, "pass")
+        self._emit(2, "pass")
+
+    def _compile_propertyNames(self, property_names, schema):
+        property = self._variable("_p")
+        self._emit(1, "if isinstance(instance, dict):")
+        self._emit(2, "for {} in instance:", property)
+        self._call(3, property_names, property)
+        self._emit(3, "pass")
+
+    def _compile_additionalProperties(self, additional_properties, schema):
+        if isinstance(additional_properties, dict):
+            if self._get_function(additional_properties) is None:
+                return
+        elif additional_properties:
+            return
+        properties = schema.get("properties", {})
+        patterns = "|".join(schema.get("patternProperties", {}))
+        extras = self._variable("_extras")
+        property = self._variable("_p")
+        condition = "{} not in {}".format(property, self._constant(properties))
+        if patterns:
+            condition += " and not {}.search({})".format(
+                self._regex(patterns), property
+            )
+        self._emit(1, "if isinstance(instance, dict):")
+        self._emit(
+            2,
+            "{} = set({} for {} in instance if {})",
+            extras,
+            property,
+            property,
+            condition,
+        )
+        if isinstance(additional_properties, dict):
+            self._emit(2, "for {} in {}:", property, extras)
+            self._call(
+                3,
+                additional_properties,
+                "instance[{}]".format(property),
+                "path + ({},)".format(property),
+            )
+            self._emit(3, "pass")
+            return
+        self._emit(2, "if {}:", extras)
+        if "patternProperties" in schema:
+            patterns = ", ".join(map(repr, sorted(schema["patternProperties"])))
+            self._error(
+                3,
+                '"%s %s not match any of the regexes: %s" % ('
+                '", ".join(map(repr, sorted({0}))), '
+                '"does" if len({0}) == 1 else "do", {1})'.format(
+                    extras, self._constant(patterns)
+                ),
+            )
+        else:
+            self._error(
+                3,
+                '"Additional properties are not allowed (%s %s unexpected)"'
+                " % extras_msg({})".format(extras),
+            )
+
+    def _compile_required(self, required, schema):
+        self._check_value(isinstance(required, (list, tuple)), required)
+        if not required:
+            return
+        self._emit(1, "if isinstance(instance, dict):")
+        for property in required:
+            self._emit(2, "if {} not in instance:", self._constant(property))
+            self._error(3, self._constant("%r is a required property" % property))
+
+    def _compile_dependencies(self, dependencies, schema):
+        self._check_value(isinstance(dependencies, dict), dependencies)
+        self._emit(1, "if isinstance(instance, dict):")
+        for property, dependency in dependencies.items():
+            self._emit(2, "if {} in instance:", self._constant(property))
+            if isinstance(dependency, list):
+                for each in dependency:
+                    self._emit(3, "if {} not in instance:", self._constant(each))
+                    message = "%r is a dependency of %r" % (each, property)
+                    self._error(4, self._constant(message))
+            else:
+                self._call(3, dependency)
+            self._emit(3, "pass")
+        self._emit(2, "pass")
+
+    def _compile_minProperties(self, value, schema):
+        self._compile_length(
+            value, "object", "<", '"%r does not have enough properties"'
+        )
+
+    def _compile_maxProperties(self, value, schema):
+        self._compile_length(value, "object", ">", '"%r has too many properties"')
+
+    def _compile_minItems(self, value, schema):
+        self._compile_length(value, "array", "<", '"%r is too short"')
+
+    def _compile_maxItems(self, value, schema):
+        self._compile_length(value, "array", ">", '"%r is too long"')
+
+    def _compile_minLength(self, value, schema):
+        self._compile_length(value, "string", "<", '"%r is too short"')
+
+    def _compile_maxLength(self, value, schema):
+        self._compile_length(value, "string", ">", '"%r is too long"')
+
+    def _compile_length(self, value, type_name, operator, message):
+        self._check_value(isinstance(value, numbers.Number), value)
+        self._emit(
+            1,
+            "if {} and len(instance) {} {}:",
+            self._type_check(type_name),
+            operator,
+            self._constant(value),
+        )
+        self._error(2, "{} % (instance,)".format(message))
+
+    def _compile_items(self, items, schema):
+        self._emit(1, "if isinstance(instance, list):")
+        if self.draft < 6:
+            is_single_schema = isinstance(items, dict)
+        else:
+            self._check_value(isinstance(items, (dict, list, bool)), items)
+            is_single_schema = not isinstance(items, list)
+        if is_single_schema:
+            index = self._variable("_i")
+            item = self._variable("_item")
+            self._emit(2, "for {}, {} in enumerate(instance):", index, item)
+            self._call(3, items, item, "path + ({},)".format(index))
+            self._emit(3, "pass")
+            return
+        self._check_value(isinstance(items, list), items)
+        for index, subschema in enumerate(items):
+            function = self._get_function(subschema)
+            if function is not None:
+                self._emit(2, "if len(instance) > {}:", index)
+                self._emit(
+                    3, "{}(instance[{}], path + ({},), errors)", function, index, index
+                )
+        self._emit(2, "pass")
+
+    def _compile_additionalItems(self, additional_items, schema):
+        items = schema.get("items", {})
+        if isinstance(items, dict):
+            return
+        self._check_value(isinstance(items, list), items)
+        if isinstance(additional_items, dict):
+            if self._get_function(additional_items) is None:
+                return
+        elif additional_items:
+            return
+        self._emit(1, "if isinstance(instance, list):")
+        if isinstance(additional_items, dict):
+            index = self._variable("_i")
+            self._emit(2, "for {} in range({}, len(instance)):", index, len(items))
+            self._call(
+                3,
+                additional_items,
+                "instance[{}]".format(index),
+                "path + ({},)".format(index),
+            )
+            self._emit(3, "pass")
+        else:
+            self._emit(2, "if len(instance) > {}:", len(items))
+            self._error(
+                3,
+                '"Additional items are not allowed (%s %s unexpected)"'
+                " % extras_msg(instance[{}:])".format(len(items)),
+            )
+
+    def _compile_contains(self, contains, schema):
+        item = self._variable("_item")
+        self._emit(
+            1,
+            "if isinstance(instance, list) and not any({} for {} in instance):",
+            self._is_valid(contains, item),
+            item,
+        )
+        self._error(2, '"None of %r are valid under the given schema" % (instance,)')
+
+    def _compile_uniqueItems(self, unique_items, schema):
+        if not unique_items:
+            return
+        self._emit(1, "if isinstance(instance, list) and not uniq(instance):")
+        self._error(2, '"%r has non-unique elements" % (instance,)')
+
+    def _compile_enum(self, enums, schema):
+        enums = self._constant(enums)
+        message = '"%r is not one of %r" % (instance, {})'.format(enums)
+        self._emit(1, "if instance == 0 or instance == 1:")
+        self._emit(
+            2, "if all(unbool(instance) != unbool(each) for each in {}):", enums,
+        )
+        self._error(3, message)
+        self._emit(1, "elif instance not in {}:", enums)
+        self._error(2, message)
+
+    def _compile_const(self, const, schema):
+        self._emit(1, "if not equal(instance, {}):", self._constant(const))
+        self._error(2, self._constant("%r was expected" % (const,)))
+
+    def _compile_pattern(self, pattern, schema):
+        self._emit(
+            1,
+            "if isinstance(instance, str_types) and not {}.search(instance):",
+            self._regex(pattern),
+        )
+        self._error(
+            2, '"%r does not match %r" % (instance, {})'.format(self._constant(pattern))
+        )
+
+    def _compile_format(self, format, schema):
+        if self.format_checker is None:
+            return
+        self._emit(1, "try:")
+        self._emit(
+            2,
+            "{}(instance, {})",
+            self._constant(self.format_checker.check),
+            self._constant(format),
+        )
+        self._emit(1, "except FormatError as error:")
+        self._error(2, "error.message")
+
+    def _compile_minimum(self, minimum, schema):
+        exclusive = self.draft < 6 and schema.get("exclusiveMinimum", False)
+        self._compile_limit(minimum, "<=" if exclusive else "<", "minimum", exclusive)
+
+    def _compile_maximum(self, maximum, schema):
+        exclusive = self.draft < 6 and schema.get("exclusiveMaximum", False)
+        self._compile_limit(maximum, ">=" if exclusive else ">", "maximum", exclusive)
+
+    def _compile_exclusiveMinimum(self, minimum, schema):
+        self._compile_limit(minimum, "<=", "minimum", exclusive=True)
+
+    def _compile_exclusiveMaximum(self, maximum, schema):
+        self._compile_limit(maximum, ">=", "maximum", exclusive=True)
+
+    def _compile_limit(self, limit, operator, name, exclusive):
+        self._check_value(isinstance(limit, numbers.Number), limit)
+        comparison = "less than" if name == "minimum" else "greater than"
+        if exclusive:
+            comparison += " or equal to"
+        limit = self._constant(limit)
+        self._emit(
+            1, "if {} and instance {} {}:", self._type_check("number"), operator, limit
+        )
+        self._error(
+            2,
+            '"%r is {} the {} of %r" % (instance, {})'.format(comparison, name, limit),
+        )
+
+    def _compile_multipleOf(self, multiple_of, schema):
+        self._check_value(isinstance(multiple_of, numbers.Number), multiple_of)
+        value = self._constant(multiple_of)
+        self._emit(1, "if {}:", self._type_check("number"))
+        if isinstance(multiple_of, float):
+            quotient = self._variable("_quotient")
+            self._emit(2, "{} = instance / {}", quotient, value)
+            self._emit(2, "if int({0}) != {0}:", quotient)
+        else:
+            self._emit(2, "if instance % {}:", value)
+        self._error(3, '"%r is not a multiple of %r" % (instance, {})'.format(value))
+
+    def _compile_allOf(self, all_of, schema):
+        self._check_value(isinstance(all_of, list), all_of)
+        for subschema in all_of:
+            self._call(1, subschema)
+
+    def _compile_anyOf(self, any_of, schema):
+        self._check_value(isinstance(any_of, list), any_of)
+        conditions = [
+            "not {}".format(self._is_valid(subschema)) for subschema in any_of
+        ]
+        self._emit(1, "if {}:", " and ".join(conditions) or "True")
+        self._error(2, '"%r is not valid under any of the given schemas" % (instance,)')
+
+    def _compile_oneOf(self, one_of, schema):
+        self._check_value(isinstance(one_of, list), one_of)
+        subschemas = self._constant(one_of)
+        valid = self._variable("_valid")
+        first = self._variable("_first")
+        more_valid = self._variable("_more")
+        index = self._variable("_i")
+        # Every sub-schema is checked, as jsonschema does to find the ones
+        # that are valid after the first one
+        self._emit(
+            1,
+            "{} = [{}]",
+            valid,
+            ", ".join(self._is_valid(subschema) for subschema in one_of),
+        )
+        self._emit(1, "if not any({}):", valid)
+        self._error(2, '"%r is not valid under any of the given schemas" % (instance,)')
+        self._emit(1, "else:")
+        self._emit(2, "{} = {}.index(True)", first, valid)
+        self._emit(
+            2,
+            "{0} = [{1}[{2}] for {2} in range({3} + 1, {4}) if {5}[{2}]]".format(
+                more_valid, subschemas, index, first, len(one_of), valid
+            ),
+        )
+        self._emit(2, "if {}:", more_valid)
+        self._emit(3, "{}.append({}[{}])", more_valid, subschemas, first)
+        self._error(
+            3,
+            '"%r is valid under each of %s" % (instance, '
+            '", ".join(repr(each) for each in {}))'.format(more_valid),
+        )
+
+    def _compile_not(self, not_schema, schema):
+        self._emit(1, "if {}:", self._is_valid(not_schema))
+        self._error(
+            2,
+            '"%r is not allowed for %r" % ({}, instance)'.format(
+                self._constant(not_schema)
+            ),
+        )
+
+    def _compile_if(self, if_schema, schema):
+        # The schema is compiled even if it is not needed, so the schemas
+        # jsonschema fails to resolve are not compiled either
+        is_valid = self._is_valid(if_schema)
+        if "then" not in schema and "else" not in schema:
+            return
+        self._emit(1, "if {}:", is_valid)
+        self._call(2, schema.get("then", True))
+        self._emit(2, "pass")
+        self._emit(1, "else:")
+        self._call(2, schema.get("else", True))
+        self._emit(2, "pass")
@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+
+
+class SchemaRegistry(object):
+    """
+    Registry shared by the JSON Schema validators of a project, so the
+    schemas of different item types do not keep and build their own copy
+    of the same parts.
+
+    ``intern`` returns a schema where every sub-schema (or any other JSON
+    value) equal to one already registered, e.g. a ``definitions`` block
+    repeated in many schemas, is replaced by the registered object. Values
+    are only equal if they have the same types and keys in the same order,
+    so the errors reported for them are the same too.
+
+    Objects built from interned schemas are shared too: ``get_validator``
+    builds the validator of each schema only once, and ``get_function`` and
+    ``add_function`` let ``SchemaCompiler`` reuse the compiled functions of
+    sub-schemas that validate the same in any document (see
+    ``is_context_free``).
+
+    The registry is not pickled: validators pickled together share a new
+    empty registry once unpickled.
+
+    example:
+    >> registry = SchemaRegistry()
+    >> a = registry.intern({'properties': {'url': {'type': 'string'}}})
+    >> b = registry.intern({'items': {'type': 'string'}})
+    >> a['properties']['url'] is b['items']
+    True
+    """
+
+    def __init__(self):
+        self._objects = {}
+        self._validators = {}
+        self._functions = {}
+        self._context_free = {}
+
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def intern(self, value):
+        return self._intern(value)[0]
+
+    def _intern(self, value):
+        """
+        Returns the registered object equal to ``value`` and its key: the
+        type and value of scalars, or the type and keys of the items of
+        containers.
+        """
+        value_type = type(value)
+        if value_type is dict:
+            items = [(name,) + self._intern(item) for name, item in value.items()]
+            key = (dict, tuple((name, item_key) for name, _, item_key in items))
+        elif value_type is list or value_type is tuple:
+            items = [self._intern(item) for item in value]
+            key = (value_type, tuple(item_key for _, item_key in items))
+        else:
+            key = (value_type, value)
+            try:
+                return self._objects.setdefault(key, value), key
+            except TypeError:
+                # Unhashable values are only shared with themselves
+                key = (value_type, id(value))
+                return self._objects.setdefault(key, value), key
+        obj = self._objects.get(key)
+        if obj is None:
+            if value_type is dict:
+                obj = dict((name, item) for name, item, _ in items)
+            else:
+                obj = value_type(item for item, _ in items)
+            self._objects[key] = obj
+        # Containers are identified by their registered object, so keys of
+        # the containers holding them stay small
+        return obj, (value_type, id(obj))
+
+    def get_validator(self, schema, kind, build):
+        """
+        Returns the validator of ``kind`` for ``schema``, calling ``build``
+        to create it the first time.
+        """
+        key = (kind, id(schema))
+        if key not in self._validators:
+            self._validators[key] = (schema, build())
+        return self._validators[key][1]
+
+    def is_context_free(self, schema):
+        """
+        Returns ``True`` if ``schema`` does not contain references, so it
+        validates the same in any document that contains it.
+        """
+        if not isinstance(schema, (dict, list, tuple)):
+            return True
+        key = id(schema)
+        if key not in self._context_free:
+            if isinstance(schema, dict):
+                context_free = "$ref" not in schema and all(
+                    self.is_context_free(value) for value in schema.values()
+                )
+            else:
+                context_free = all(self.is_context_free(value) for value in schema)
+            self._context_free[key] = (schema, context_free)
+        return self._context_free[key][1]
+
+    def get_function(self, schema, draft):
+        """
+        Returns the function compiled for ``schema`` with the rules of
+        ``draft``, or ``None`` if it was not compiled yet.
+        """
+        entry = self._functions.get((draft, id(schema)))
+        return entry[1] if entry is not None else None
+
+    def add_function(self, schema, draft, function):
+        self._functions[(draft, id(schema))] = (schema, function)
@@ -1,6 +1,9 @@
 import logging
 
 import json
+from contextlib import closing
+from multiprocessing.pool import ThreadPool
+
 from scrapy.utils.misc import load_object
 import six
 from six.moves.urllib.parse import urlparse
@@ -8,10 +11,39 @@ from six.moves.urllib.request import urlopen
 
 logger = logging.getLogger(__name__)
 
+MAX_PARALLEL_FETCHES = 8
+
+
+def get_schemas_from(sources, timeout=None, cache=None):
+    """
+    Returns a dict with the schema of each one of the ``sources``, that
+    are loaded as in ``get_schema_from``. Schemas from URLs are fetched in
+    parallel.
+    """
+    sources = list(set(sources))
+    fetches = len([source for source in sources if is_schema_url(source)])
+    if fetches < 2 or getattr(cache, "offline", False):
+        schemas = [get_schema_from(s, timeout=timeout, cache=cache) for s in sources]
+        return dict(zip(sources, schemas))
+    pool = ThreadPool(min(fetches, MAX_PARALLEL_FETCHES))
+    try:
+        schemas = pool.map(
+            lambda s: get_schema_from(s, timeout=timeout, cache=cache), sources
+        )
+    finally:
+        pool.close()
+        pool.join()
+    return dict(zip(sources, schemas))
+
 
-def get_schema_from(source):
+def get_schema_from(source, timeout=None, cache=None):
+    """
+    Loads a schema from a URL, a JSON file or an object path. URLs are
+    fetched waiting up to ``timeout`` seconds, through a ``SchemaCache``
+    if ``cache`` is given.
+    """
     if is_schema_url(source):
-        schema = get_contents(source)
+        schema = get_contents(source, timeout=timeout, cache=cache)
         try:
             return json.loads(schema)
         except Exception as e:
@@ -41,9 +73,12 @@ def is_schema_url(path):
         return False
 
 
-def get_contents(url):
+def get_contents(url, timeout=None, cache=None):
+    if cache is not None:
+        return cache.get_contents(url, timeout=timeout)
+    kwargs = {} if timeout is None else {"timeout": timeout}
     try:
-        with urlopen(url) as f:
+        with closing(urlopen(url, **kwargs)) as f:
             return f.read().decode("utf-8")
     except Exception as e:
         logger.exception(str(e) + "\nFailed to get '{}'".format(url))
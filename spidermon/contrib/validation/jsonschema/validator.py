@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 import re
+from timeit import default_timer
 
-from jsonschema.validators import validator_for
-from spidermon.contrib.validation.validator import Validator
+from jsonschema.validators import extend, validator_for
+from spidermon.contrib.validation.validator import StopValidation, Validator
 
+from .columnar import ColumnarSchema, NUMPY_AVAILABLE
+from .compiler import CompiledSchema, SchemaCompiler, SchemaNotSupported
 from .translator import JSONSchemaMessageTranslator
 from .formats import format_checker
 
@@ -15,21 +18,162 @@ class JSONSchemaValidator(Validator):
     default_translator = JSONSchemaMessageTranslator()
     name = "JSONSchema"
 
-    def __init__(self, schema, translator=None, use_default_translator=True):
+    def __init__(
+        self, schema, translator=None, use_default_translator=True, registry=None
+    ):
         super(JSONSchemaValidator, self).__init__(
             translator=translator, use_default_translator=use_default_translator
         )
+        self._registry = registry
+        if registry is not None:
+            schema = registry.intern(schema)
         self._schema = schema
+        self._validator = self._get_validator()
 
-    def _validate(self, data, strict=False):
+    def _get_validator(self):
+        """
+        Returns the built validator of the schema, shared with the other
+        validators of the same class and schema when there is a
+        ``SchemaRegistry``.
+        """
+        if self._registry is None:
+            return self._build_validator()
+        return self._registry.get_validator(
+            self._schema, type(self), self._build_validator
+        )
+
+    def _build_validator(self):
+        """
+        Builds the jsonschema validator object for the schema. It is created
+        only once and shared by every item validated, so the validator class
+        lookup, the format checker and the reference resolver (with its cache
+        of already resolved ``$ref`` targets) are set up just one time.
+        """
+        validator_cls = validator_for(self._schema)
+        return validator_cls(schema=self._schema, format_checker=format_checker)
+
+    def enable_timing(self):
+        super(JSONSchemaValidator, self).enable_timing()
+        # Measured validators are not shared, as they measure their own time
+        self._validator = self._build_timed_validator()
+
+    def _build_timed_validator(self):
+        """
+        Builds a jsonschema validator that measures the time spent in each
+        keyword of the schema.
+        """
         validator_cls = validator_for(self._schema)
-        validator = validator_cls(schema=self._schema, format_checker=format_checker)
-        errors = validator.iter_errors(data)
+        timed_validators = dict(
+            (keyword, self.timings.time_keyword(keyword, function))
+            for keyword, function in validator_cls.VALIDATORS.items()
+        )
+        timed_validator_cls = extend(validator_cls, timed_validators)
+        return timed_validator_cls(schema=self._schema, format_checker=format_checker)
+
+    def __getstate__(self):
+        # The jsonschema validator is rebuilt instead of pickled
+        state = self.__dict__.copy()
+        del state["_validator"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.timings is not None:
+            self._validator = self._build_timed_validator()
+        else:
+            self._validator = self._get_validator()
+
+    def _validate(self, data, strict=False):
+        errors = self._validator.iter_errors(data)
 
         for error in errors:
-            absolute_path = list(error.absolute_path)
-            required_match = REQUIRED_RE.search(error.message)
-            if required_match:
-                absolute_path.append(required_match.group(1))
-            field_name = ".".join([str(p) for p in absolute_path])
-            self._add_errors({field_name: [error.message]})
+            self._add_schema_error(error.absolute_path, error.message)
+
+    def _add_schema_error(self, absolute_path, message):
+        absolute_path = list(absolute_path)
+        required_match = REQUIRED_RE.search(message)
+        if required_match:
+            absolute_path.append(required_match.group(1))
+        field_name = ".".join([str(p) for p in absolute_path])
+        self._add_errors({field_name: [message]})
+
+
+class CompiledJSONSchemaValidator(JSONSchemaValidator):
+    """
+    JSON Schema validator that compiles the schema into Python functions
+    with the checks of each sub-schema, instead of walking the schema for
+    every item. Errors are the same ones reported by ``JSONSchemaValidator``.
+
+    Schemas using features the compiler does not support (see
+    ``SchemaCompiler``) are validated with ``jsonschema``.
+    """
+
+    def _build_validator(self):
+        try:
+            return SchemaCompiler(
+                self._schema, format_checker=format_checker, registry=self._registry
+            ).compile()
+        except SchemaNotSupported:
+            return super(CompiledJSONSchemaValidator, self)._build_validator()
+
+    def _build_timed_validator(self):
+        # Compiled schemas are only measured as a whole
+        validator = self._get_validator()
+        if isinstance(validator, CompiledSchema):
+            return validator
+        return super(CompiledJSONSchemaValidator, self)._build_timed_validator()
+
+    def _validate(self, data, strict=False):
+        if not isinstance(self._validator, CompiledSchema):
+            return super(CompiledJSONSchemaValidator, self)._validate(data, strict)
+        # Errors are added as they are found, so it can stop at the first one
+        self._validator.report_errors(data, self._add_schema_error)
+
+
+class ColumnarJSONSchemaValidator(JSONSchemaValidator):
+    """
+    JSON Schema validator for batches of items, that checks the simple
+    constraints (``type``, ``minLength``, ``maxLength``, ``minimum``,
+    ``maximum``, ``enum`` and ``pattern``) of the top level properties and
+    the ``required`` properties of all the items of a batch at once, using
+    NumPy. The rest of the schema is validated item by item with
+    ``jsonschema``. Errors are the same ones reported by
+    ``JSONSchemaValidator``.
+
+    Requires numpy to be installed.
+    """
+
+    available = NUMPY_AVAILABLE
+    supports_batches = True
+
+    def _build_validator(self):
+        return ColumnarSchema(self._schema, format_checker=format_checker)
+
+    def _build_timed_validator(self):
+        # Batches are only measured as a whole
+        return self._get_validator()
+
+    def _validate(self, data, strict=False):
+        for absolute_path, message in self._validator.iter_batch_errors([data])[0]:
+            self._add_schema_error(absolute_path, message)
+
+    def validate_batch(self, batch, strict=True):
+        if self.timings is not None and batch:
+            start = default_timer()
+            try:
+                return self._validate_batch(batch, strict=strict)
+            finally:
+                self.timings.items.add(default_timer() - start, count=len(batch))
+        return self._validate_batch(batch, strict=strict)
+
+    def _validate_batch(self, batch, strict=True):
+        results = []
+        for errors in self._validator.iter_batch_errors(batch):
+            self._reset()
+            try:
+                for absolute_path, message in errors:
+                    self._add_schema_error(absolute_path, message)
+            except StopValidation:
+                pass
+            results.append((not self.has_errors, self.errors))
+        return results
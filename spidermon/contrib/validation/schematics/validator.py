@@ -22,7 +22,40 @@ class SchematicsValidator(Validator):
         self._save_required_fields()
         self._data = {}
 
+    @property
+    def thread_safe(self):
+        # Schematics 1.* validation changes the fields of the model class,
+        # that is shared by the copies of the validator in every thread
+        return not schematics.__version__.startswith("1.")
+
     def _validate(self, data, strict=False):
+        if schematics.__version__.startswith("1."):
+            self._validate_by_instance(data, strict=strict)
+        else:
+            self._validate_in_single_pass(data, strict=strict)
+
+    def _validate_in_single_pass(self, data, strict=False):
+        """
+        Converts and validates the data at once, collecting the conversion
+        and validation errors of every field without changing the model.
+        """
+        from schematics.exceptions import DataError
+        from schematics.validate import validate
+
+        # A lazy instance is not converted, it is only used as the object
+        # passed to model level validation methods
+        model = self._model(raw_data=data, lazy=True)
+        try:
+            validate(self._model._schema, model, raw_data=data, strict=strict)
+        except DataError as e:
+            self._add_errors(e.errors)
+
+    def _validate_by_instance(self, data, strict=False):
+        """
+        Schematics 1.* does not allow validating data without an instance of
+        the model, so fields with conversion errors are removed from the
+        data and set as not required until a valid instance can be created.
+        """
         self._set_data(data)
         model = self._get_model_instance(strict=strict)
         try:
@@ -69,8 +102,9 @@ class SchematicsValidator(Validator):
                     )
                     self._add_errors(transformed_errors)
                 else:
-                    self._errors[field_name] += (
-                        messages if isinstance(messages, list) else [messages]
+                    self._add_field_errors(
+                        field_name,
+                        messages if isinstance(messages, list) else [messages],
                     )
         else:
             from schematics.datastructures import FrozenDict
@@ -82,8 +116,7 @@ class SchematicsValidator(Validator):
                     )
                     self._add_errors(transformed_errors)
                 else:
-                    messages = self._clean_messages(messages)
-                    self._errors[field_name] += messages
+                    self._add_field_errors(field_name, self._clean_messages(messages))
 
     def _get_transformed_child_errors(self, field_name, errors):
         return dict([("%s.%s" % (field_name, k), v) for k, v in errors.items()])
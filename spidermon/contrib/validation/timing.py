@@ -0,0 +1,87 @@
+from __future__ import absolute_import
+from collections import defaultdict
+from timeit import default_timer
+
+
+class Timing(object):
+    """Time spent in something that is measured many times."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed, count=1):
+        """
+        Adds the time spent doing something ``count`` times, e.g. validating
+        a batch of items at once.
+        """
+        self.count += count
+        self.total += elapsed
+        self.max = max(self.max, elapsed / count)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class ValidationTimings(object):
+    """
+    Times spent by a validator: validating each item (``items``) and, for
+    validators that can measure them, in each one of the parts of its
+    schema (``keywords``, with tuples of names as keys, e.g.
+    ``('format', 'uri')``).
+
+    Keyword timings only count the time spent by each keyword itself, not
+    by the nested keywords it validates, e.g. the time of ``properties``
+    does not include the checks of each property.
+    """
+
+    def __init__(self):
+        self.items = Timing()
+        self.keywords = defaultdict(Timing)
+        # Time spent in nested keywords by each keyword being measured
+        self._nested = []
+
+    def time_keyword(self, name, function):
+        """
+        Wraps a ``jsonschema`` keyword function, that yields the errors
+        found, so the time spent in it is measured. ``format`` is measured
+        separately for each format.
+        """
+        keywords = self.keywords
+        nested = self._nested
+
+        def timed(validator, value, instance, schema):
+            key = (name, str(value)) if name == "format" else (name,)
+            spent = 0.0
+            # Only the time between resuming the keyword and its next error
+            # is measured
+            nested.append(0.0)
+            start = default_timer()
+            running = True
+            try:
+                errors = function(validator, value, instance, schema)
+                for error in errors or ():
+                    elapsed = default_timer() - start
+                    spent += elapsed - nested.pop()
+                    running = False
+                    if nested:
+                        nested[-1] += elapsed
+                    yield error
+                    nested.append(0.0)
+                    start = default_timer()
+                    running = True
+            finally:
+                # Also reached when validators stop looking for errors
+                # before all of them are found
+                if running:
+                    elapsed = default_timer() - start
+                    spent += elapsed - nested.pop()
+                    if nested:
+                        nested[-1] += elapsed
+                keywords[key].add(spent)
+
+        return timed
@@ -1,21 +1,104 @@
 from __future__ import absolute_import
 import re
 
+from spidermon.utils.cache import LRUCache
+
+TRANSLATIONS_CACHE_SIZE = 1024
+
+# Numbered backreferences would point to a different group once the patterns
+# are combined in a single regular expression, so they are not combined
+RE_NUMBERED_BACKREFERENCE = re.compile(r"\\[1-9]")
+
 
 class MessageTranslator(object):
+    """
+    Translates the error messages of a validation library into the messages
+    used by Spidermon.
+
+    ``messages`` maps regular expressions to the translated messages, that
+    can use the named groups of the expression as format arguments. The
+    first expression found in a message is used.
+
+    The same few messages are usually found over and over again, so
+    translations are kept in a LRU cache of ``cache_size`` messages. When
+    ``combine_patterns`` is enabled, messages not found in the cache are
+    matched against all the expressions at once instead of one by one.
+    """
 
     messages = {}
+    cache_size = TRANSLATIONS_CACHE_SIZE
+    combine_patterns = True
 
     def __init__(self):
         self.compiled_messages = dict([(m, re.compile(m)) for m in self.messages])
+        self._patterns = list(self.compiled_messages.items())
+        self._combined_pattern = (
+            self._get_combined_pattern() if self.combine_patterns else None
+        )
+        self._cache = LRUCache(maxsize=self.cache_size)
 
     def translate_messages(self, messages):
         return [self.translate_message(m) for m in messages]
 
     def translate_message(self, message):
-        for target_message, pattern in self.compiled_messages.items():
+        translated_message = self._cache.get(message)
+        if translated_message is None:
+            translated_message = self._translate_message(message)
+            self._cache.set(message, translated_message)
+        return translated_message
+
+    def cache_info(self):
+        """
+        Returns the hits, misses, maximum and current size of the
+        translations cache.
+        """
+        return self._cache.info()
+
+    def _translate_message(self, message):
+        if self._combined_pattern is not None:
+            match = self._combined_pattern.match(message)
+            if not match:
+                return message
+            index = int(match.lastgroup[len("__") :])
+            patterns = self._patterns[index : index + 1]
+        else:
+            patterns = self._patterns
+        for target_message, pattern in patterns:
             pattern_found = pattern.search(message)
             if pattern_found:
                 groups = pattern_found.groupdict()
                 return self.messages[target_message].format(**groups)
         return message
+
+    def _get_combined_pattern(self):
+        """
+        Combines all the expressions in a single one, with a named group
+        for each expression. Alternatives are tried in order and each one
+        can skip any prefix of the message, so the first group matched is
+        the one of the first expression that would be found by ``search``.
+
+        Returns ``None`` if the expressions can not be combined.
+        """
+        default_flags = re.compile("").flags
+        if not self._patterns or any(
+            RE_NUMBERED_BACKREFERENCE.search(m) or pattern.flags != default_flags
+            for m, pattern in self._patterns
+        ):
+            return None
+        try:
+            return re.compile(
+                "^(?:%s)"
+                % "|".join(
+                    r"(?P<__%d>%s(?:%s))" % (i, self._get_prefix_pattern(m), m)
+                    for i, (m, _) in enumerate(self._patterns)
+                )
+            )
+        except (re.error, AssertionError, OverflowError):
+            # Repeated group names, too many groups...
+            return None
+
+    def _get_prefix_pattern(self, message):
+        # Expressions anchored to the start do not need to skip any prefix
+        if message.startswith("^") and "|" not in message:
+            return ""
+        return r"[\s\S]*?"
@@ -1,6 +1,11 @@
 from __future__ import absolute_import
 import re
 
+from spidermon.utils.cache import memoize
+
+# Number of calls of each checker whose results are kept together
+VALUES_CACHE_SIZE = 10000
+
 URL_REGEX = re.compile(
     r"^(?:http|ftp)s?://"  # http:// or https://
     r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
@@ -22,9 +27,36 @@ EMAIL_REGEX = re.compile(
 )
 
 
+# Common shapes of valid URLs and emails (lowercase, without ftp or quoted
+# strings). They only match values that URL_REGEX and EMAIL_REGEX match too,
+# in less time, so the full regexes only run on the rest
+COMMON_URL_REGEX = re.compile(
+    r"https?://(?:(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,}|"
+    r"localhost|\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"
+    r"(?::\d+)?(?:/\S*)?$"
+)
+
+COMMON_EMAIL_REGEX = re.compile(
+    r"[a-z0-9_+-]+(?:\.[a-z0-9_+-]+)*"
+    r"@(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,32}$"
+)
+
+
+@memoize(maxsize=VALUES_CACHE_SIZE)
 def is_valid_url(url):
-    return not URL_REGEX.match(url) is None
+    # URL_REGEX can backtrack a lot before rejecting hosts followed by
+    # spaces, so values that can't be URLs because they don't start like
+    # its schemes or have spaces are rejected without it
+    if url[:1] not in "hHfF" or " " in url:
+        return False
+    return COMMON_URL_REGEX.match(url) is not None or URL_REGEX.match(url) is not None
 
 
+@memoize(maxsize=VALUES_CACHE_SIZE)
 def is_valid_email(email):
-    return not EMAIL_REGEX.match(email) is None
+    if "@" not in email:
+        return False
+    return (
+        COMMON_EMAIL_REGEX.match(email) is not None
+        or EMAIL_REGEX.match(email) is not None
+    )
@@ -1,14 +1,32 @@
 from __future__ import absolute_import
 import re
 from collections import defaultdict
+from timeit import default_timer
 
+import six
+
+from .timing import ValidationTimings
 
 RE_PATTERN_INSTANCE = type(re.compile(""))
 
 
+class StopValidation(Exception):
+    """Raised to stop validating the data once no more errors are needed."""
+
+
 class Validator(object):
     default_translator = None
     name = "validator"
+    # Validators that are faster validating many items at once
+    supports_batches = False
+    # Stops validating the data at the first error (True) or at the first
+    # error with one of the (translated) messages of a collection
+    fail_fast = False
+    # Times spent validating, only measured once timing is enabled
+    timings = None
+    # Validators that can run in many threads at once with the same state
+    # shared among their copies (e.g. classes they refer to)
+    thread_safe = True
 
     def __init__(self, translator=None, use_default_translator=True):
         self._errors = defaultdict(list)
@@ -17,10 +35,37 @@ class Validator(object):
         self._translator = translator
 
     def validate(self, data, strict=True):
+        if self.timings is not None:
+            start = default_timer()
+            try:
+                return self._validate_data(data, strict=strict)
+            finally:
+                self.timings.items.add(default_timer() - start)
+        return self._validate_data(data, strict=strict)
+
+    def _validate_data(self, data, strict=True):
         self._reset()
-        self._validate(data, strict=strict)
+        try:
+            self._validate(data, strict=strict)
+        except StopValidation:
+            pass
         return not self.has_errors, self.errors
 
+    def validate_batch(self, batch, strict=True):
+        """
+        Validates a list of data, returning the ``(ok, errors)`` result of
+        each one of them.
+        """
+        return [self.validate(data, strict=strict) for data in batch]
+
+    def enable_timing(self):
+        """
+        Starts measuring the time spent validating each item in
+        ``timings``. Validators that can also measure the parts of their
+        schemas do it from now on.
+        """
+        self.timings = ValidationTimings()
+
     def _reset(self):
         self._errors = defaultdict(list)
 
@@ -45,6 +90,24 @@ class Validator(object):
 
     def _add_errors(self, errors):
         for field_name, messages in errors.items():
-            self._errors[field_name] += (
-                messages if isinstance(messages, list) else [messages]
+            self._add_field_errors(
+                field_name, messages if isinstance(messages, list) else [messages]
             )
+
+    def _add_field_errors(self, field_name, messages):
+        if not self.fail_fast:
+            self._errors[field_name] += messages
+            return
+        for message in messages:
+            self._errors[field_name].append(message)
+            if self._stops_validation(message):
+                raise StopValidation()
+
+    def _stops_validation(self, message):
+        if self.fail_fast is True:
+            return True
+        if not isinstance(message, six.string_types):
+            return False
+        if self._translator:
+            message = self._translator.translate_message(message)
+        return message in self.fail_fast
@@ -0,0 +1,135 @@
+from __future__ import absolute_import
+import pickle
+import threading
+import traceback
+from collections import defaultdict, deque
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+from spidermon.exceptions import ValidationWorkerError
+
+
+WORKERS_BACKENDS = {"thread": ThreadPool, "process": Pool}
+DEFAULT_WORKERS_BACKEND = "process"
+
+# Validators are not thread-safe, so every worker keeps its own copy
+_worker = threading.local()
+
+
+def check_workers_backend(validators, backend):
+    """
+    Raises ``ValueError`` if the validators of the ``validators`` dict can
+    not be used by workers of ``backend``.
+    """
+    if backend not in WORKERS_BACKENDS:
+        raise ValueError(
+            "Invalid <{}> validation workers backend, valid options are: "
+            "{}".format(backend, ", ".join(sorted(WORKERS_BACKENDS)))
+        )
+    if backend == "thread":
+        names = sorted(
+            set(
+                validator.name
+                for vals in validators.values()
+                for validator in vals
+                if not validator.thread_safe
+            )
+        )
+        if names:
+            raise ValueError(
+                "{} validators can not be used by thread validation workers, "
+                "use the process backend instead".format(", ".join(names))
+            )
+
+
+def _init_worker(validators):
+    _worker.validators = pickle.loads(validators)
+
+
+def validate_batch(validators, batch):
+    """
+    Validates a batch of ``(key, data)`` tuples with the lists of
+    ``validators`` of each key, returning the ``(ok, errors)`` results of
+    every validator for each element of the batch. All the data with the
+    same key is given at once to each validator.
+    """
+    results = [[] for _ in batch]
+    indexes = defaultdict(list)
+    for index, (key, _) in enumerate(batch):
+        indexes[key].append(index)
+    for key, key_indexes in indexes.items():
+        data = [batch[index][1] for index in key_indexes]
+        for validator in validators[key]:
+            for index, result in zip(key_indexes, validator.validate_batch(data)):
+                results[index].append(result)
+    return results
+
+
+def _validate_batch(batch):
+    try:
+        return True, validate_batch(_worker.validators, batch)
+    except Exception:
+        return False, traceback.format_exc()
+
+
+def _call_with_validators(function, element):
+    return function(_worker.validators, element)
+
+
+class ValidationWorkerPool(object):
+    """
+    Validates batches of data in a pool of worker threads or processes.
+
+    ``validators`` is a dict with lists of validators, that is copied to
+    every worker. Batches are lists of ``(key, data)`` tuples, being ``key``
+    the key of the list of validators that must be used to validate the
+    data. The results of a batch are a list with the ``(ok, errors)`` tuples
+    returned by each one of the validators for each element of the batch.
+    """
+
+    def __init__(self, validators, workers, backend=DEFAULT_WORKERS_BACKEND):
+        check_workers_backend(validators, backend)
+        self.workers = workers
+        self.backend = backend
+        self._pool = WORKERS_BACKENDS[backend](
+            workers,
+            _init_worker,
+            (pickle.dumps(dict(validators), pickle.HIGHEST_PROTOCOL),),
+        )
+
+    def validate(self, batch, callback):
+        """
+        Validates the batch asynchronously. ``callback`` is called from a
+        different thread with the results of the batch, or with a
+        ``ValidationWorkerError`` if the validation failed.
+        """
+
+        def _callback(result):
+            success, results = result
+            callback(results if success else ValidationWorkerError(results))
+
+        self._pool.apply_async(_validate_batch, (batch,), callback=_callback)
+
+    def map(self, function, elements, max_pending=None):
+        """
+        Calls ``function(validators, element)`` in the workers for every
+        element, yielding the results in the same order. Only
+        ``max_pending`` elements (twice the number of workers by default)
+        are taken from ``elements`` before their results are yielded, so
+        they can be read lazily. Exceptions raised by ``function`` are
+        raised again here.
+        """
+        max_pending = max_pending or 2 * self.workers
+        pending = deque()
+        for element in elements:
+            pending.append(
+                self._pool.apply_async(_call_with_validators, (function, element))
+            )
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
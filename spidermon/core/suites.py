@@ -14,6 +14,9 @@ from .factories import MonitorFactory, ActionFactory
 
 
 class MonitorSuite(six.with_metaclass(MonitorOptionsMetaclass, TestSuite)):
+    # Keep monitors after running them, so the suite can be run again
+    _cleanup = False
+
     monitors = []
     monitors_finished_actions = []
     monitors_passed_actions = []
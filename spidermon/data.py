@@ -19,6 +19,22 @@ class Data(dict):
         else:
             raise AttributeError("Key '%s' not found." % name)
 
+    def get_view(self, name, factory):
+        """
+        Returns the view of the data called ``name``, created with
+        ``factory(data)`` the first time it is requested. As data can not be
+        modified, the same view is shared by everyone using this data.
+
+        example:
+        >> s = Data({'scraped_items': 100})
+        >> s.get_view('double', lambda data: data.scraped_items * 2)
+        200
+        """
+        views = self.__dict__.setdefault("_views", {})
+        if name not in views:
+            views[name] = factory(self)
+        return views[name]
+
     def _immutable(self, *args, **kws):
         raise InvalidDataOperation(
             "Immutable Data! You cannot add or modify read-only data."
@@ -40,3 +40,7 @@ class NotConfigured(SpidermonException):
 
 class SkipAction(SpidermonException):
     pass
+
+
+class ValidationWorkerError(SpidermonException):
+    pass
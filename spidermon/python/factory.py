@@ -72,16 +72,19 @@ def _create_monitor_class(expressions, monitor_class=None):
 
 
 def _create_test_method(expression, name=None, description=None, fail_reason=None):
+    interpreter = Interpreter()
+    expression_code = _compile_expression(interpreter, expression)
+    fail_reason_code = _compile_expression(interpreter, fail_reason)
+
     def _test_method(self):
-        interpreter = Interpreter()
         context = self.get_context_data()
-        result = interpreter.eval(expression, context=context)
+        result = interpreter.eval(expression_code, context=context)
         if result is not None:
             self.assertTrue(
                 bool(result),
                 msg=('Expression not safisfied: "%s"' % expression)
                 if not fail_reason
-                else interpreter.eval(fail_reason, context=context),
+                else interpreter.eval(fail_reason_code, context=context),
             )
 
     test_method = _test_method
@@ -91,3 +94,17 @@ def _create_test_method(expression, name=None, description=None, fail_reason=Non
         description or settings.MONITOR.DEFAULT_DESCRIPTION
     )
     return test_method
+
+
+def _compile_expression(interpreter, expression):
+    """
+    Compiles the expression once, when the test method is created. Invalid
+    expressions are returned as they are, so the error is raised when they
+    are evaluated by the test.
+    """
+    if not expression:
+        return expression
+    try:
+        return interpreter.compile(expression)
+    except Exception:
+        return expression
@@ -5,6 +5,15 @@ import ast
 from spidermon.exceptions import InvalidExpression
 
 
+class _CheckedExpression(object):
+    """Code object of an expression checked by ``Interpreter.compile``."""
+
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
+
+
 class Interpreter(object):
 
     ast_allowed_nodes = (
@@ -85,6 +94,30 @@ class Interpreter(object):
         pass
 
     def check(self, expression):
+        self._parse(expression)
+
+    def compile(self, expression):
+        """
+        Checks the expression and compiles it, so it can be evaluated many
+        times without parsing and checking it again.
+        """
+        node = self._parse(expression)
+        return _CheckedExpression(
+            compile(ast.Expression(body=node.value), "<string>", "eval")
+        )
+
+    def eval(self, expression, context=None, check=True):
+        """
+        Evaluates the expression. Expressions returned by ``compile`` are
+        already checked, so they are evaluated directly.
+        """
+        if isinstance(expression, _CheckedExpression):
+            return eval(expression.code, context)
+        if check:
+            self.check(expression)
+        return eval(expression, context)
+
+    def _parse(self, expression):
         if not isinstance(expression, six.string_types):
             raise InvalidExpression("Python expressions must be defined as strings")
         if not expression:
@@ -110,11 +143,7 @@ class Interpreter(object):
             )
 
         self._check_node(start_node)
-
-    def eval(self, expression, context=None, check=True):
-        if check:
-            self.check(expression)
-        return eval(expression, context)
+        return start_node
 
     def _check_node(self, node):
         if isinstance(node, list):
@@ -33,7 +33,7 @@ class MonitorRunner(object):
         data = data or {}
         new_data_dict = {}
         for attr_name, attr in data.items():
-            if attr_name in self.data_immutable_dicts:
+            if attr_name in self.data_immutable_dicts and not isinstance(attr, Data):
                 new_data = Data(attr)
             else:
                 new_data = attr
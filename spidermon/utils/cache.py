@@ -0,0 +1,145 @@
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+
+DEFAULT_CACHE_SIZE = 1024
+
+_MISSING = object()
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache(object):
+    """
+    Bounded mapping that discards the least recently used entries once it
+    holds more than ``maxsize`` of them.
+
+    Lookups are counted in ``hits`` and ``misses`` to make it possible to
+    evaluate if the cache is worth it and how big it needs to be.
+
+    example:
+    >> cache = LRUCache(maxsize=2)
+    >> cache.set('a', 1)
+    >> cache.get('a')
+    1
+    >> cache.get('b', 0)
+    0
+    >> cache.hits, cache.misses
+    (1, 1)
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+def memoize(maxsize=DEFAULT_CACHE_SIZE, min_hit_rate=0.5):
+    """
+    Decorator that keeps the results of a function of a single hashable
+    argument, for functions called so often that the bookkeeping of
+    ``LRUCache`` would cost as much as the function.
+
+    Calls are grouped in generations of ``maxsize`` calls. Results of the
+    previous generation are kept while the current one is built, and they
+    are moved to it when their values are found again, so results still in
+    use are not discarded.
+
+    Keeping results of values that are not found again only adds to the
+    time of the function, so if less than ``min_hit_rate`` of the calls of
+    a generation find a kept result, results are not kept anymore, until
+    ``cache_clear`` is called.
+
+    example:
+    >> @memoize(maxsize=1000)
+    >> def is_valid(value):
+    >>     return REGEX.match(value) is not None
+    """
+
+    def decorator(function):
+        generation = _MemoGeneration(maxsize)
+
+        @wraps(function)
+        def wrapper(value):
+            state = generation
+            if not state.memoizing:
+                return function(value)
+            if not state.calls_left:
+                state.next(maxsize, min_hit_rate)
+                if not state.memoizing:
+                    return function(value)
+            state.calls_left -= 1
+            results = state.results
+            result = results.get(value, _MISSING)
+            if result is _MISSING:
+                result = state.previous_results.get(value, _MISSING)
+                if result is _MISSING:
+                    result = function(value)
+                else:
+                    state.hits += 1
+                results[value] = result
+            else:
+                state.hits += 1
+            return result
+
+        def cache_clear():
+            generation.__init__(maxsize)
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+class _MemoGeneration(object):
+    """Results and counts of the current generation of ``memoize``."""
+
+    __slots__ = ("results", "previous_results", "calls_left", "hits", "memoizing")
+
+    def __init__(self, calls):
+        self.results = {}
+        self.previous_results = {}
+        self.calls_left = calls
+        self.hits = 0
+        self.memoizing = True
+
+    def next(self, calls, min_hit_rate):
+        if self.hits < calls * min_hit_rate:
+            self.memoizing = False
+            self.previous_results = {}
+        else:
+            self.previous_results = self.results
+        self.results = {}
+        self.calls_left = calls
+        self.hits = 0
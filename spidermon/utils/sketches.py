@@ -0,0 +1,167 @@
+import random
+
+
+class HeavyHitters(object):
+    """
+    Counts the most frequent keys of a stream using a bounded amount of
+    memory (Misra-Gries summary).
+
+    At most ``capacity`` keys are counted at the same time. When a new key
+    arrives and there is no room for it, every key is charged the same
+    amount until some of them reach zero and are discarded. Any key seen
+    more than ``total / (capacity + 1)`` times is guaranteed to be kept.
+
+    Counts returned are the number of times a key was seen since it was
+    added, so discarded keys that come back start over. Counts of keys
+    added before anything was discarded (see ``is_exact``) are exact.
+
+    Keys can also carry a ``value`` that is added up with their counts
+    (e.g. a weighted count).
+
+    example:
+    >> hitters = HeavyHitters(capacity=2)
+    >> for key in 'aabacad':
+    ..     hitters.add(key)
+    >> hitters.most_common(1)
+    [('a', 4)]
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.total = 0
+        # Key: [charged count, count, value, whether it is exact]
+        self._entries = {}
+        self._discarded = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key, count=1, value=0):
+        self.total += count
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            entry[0] += count
+            entry[1] += count
+            entry[2] += value
+            return
+        exact = not self._discarded
+        charged = count
+        if len(entries) >= self.capacity:
+            # Decreasing all the counts takes O(capacity), but it discards
+            # as many counts as it takes, so it is O(1) amortized
+            decrease = min(count, min(entry[0] for entry in entries.values()))
+            self._decrease(decrease)
+            if count == decrease:
+                self._discarded += 1
+                return
+            charged -= decrease
+        entries[key] = [charged, count, value, exact]
+
+    def _decrease(self, decrease):
+        for key, entry in list(self._entries.items()):
+            if entry[0] == decrease:
+                del self._entries[key]
+                self._discarded += 1
+            else:
+                entry[0] -= decrease
+
+    def get(self, key):
+        """Returns the ``(count, value)`` of a key, or ``None``."""
+        entry = self._entries.get(key)
+        return None if entry is None else (entry[1], entry[2])
+
+    def pop(self, key):
+        """Stops counting a key, returning its ``(count, value)``."""
+        entry = self._entries.pop(key)
+        return entry[1], entry[2]
+
+    def is_exact(self, key):
+        """
+        Returns ``True`` if the count of a key is its real count, because
+        no key had been discarded when it was added.
+        """
+        return self._entries[key][3]
+
+    @property
+    def max_error(self):
+        """Maximum difference between any count and the real one."""
+        charged = sum(entry[0] for entry in self._entries.values())
+        return (self.total - charged) // (self.capacity + 1)
+
+    def most_common(self, n=None):
+        """Returns a list of the ``(key, count)`` with the highest counts."""
+        counts = sorted(
+            ((key, entry[1]) for key, entry in self._entries.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return counts if n is None else counts[:n]
+
+
+class Reservoir(object):
+    """
+    Keeps a uniform random sample of at most ``size`` elements of a stream
+    (Algorithm R): every element seen has the same probability of being in
+    ``samples``.
+
+    Elements are added in two steps, so they are only built when they are
+    going to be kept: ``next_slot`` counts a new element and returns the
+    index of ``samples`` where it must be stored with ``put``, or ``None``
+    if it is not sampled.
+
+    example:
+    >> reservoir = Reservoir(size=2)
+    >> for element in range(100):
+    ..     reservoir.add(element)
+    >> len(reservoir.samples), reservoir.count
+    (2, 100)
+    """
+
+    def __init__(self, size, random=random.random):
+        self.size = size
+        self.count = 0
+        self.samples = []
+        self._random = random
+
+    def __len__(self):
+        return len(self.samples)
+
+    def next_slot(self):
+        self.count += 1
+        if self.count <= self.size:
+            return self.count - 1
+        slot = int(self._random() * self.count)
+        return slot if slot < self.size else None
+
+    def put(self, slot, element):
+        if slot == len(self.samples):
+            self.samples.append(element)
+        else:
+            self.samples[slot] = element
+
+    def add(self, element):
+        slot = self.next_slot()
+        if slot is not None:
+            self.put(slot, element)
+
+    def merge(self, other):
+        """
+        Adds the elements seen by another reservoir of the same size, so
+        ``samples`` is a uniform random sample of both streams.
+        """
+        counts = [self.count, other.count]
+        pools = [list(self.samples), list(other.samples)]
+        samples = []
+        while len(samples) < self.size and (pools[0] or pools[1]):
+            # Each sample comes from a stream with a probability proportional
+            # to the number of its elements that were not picked yet
+            index = 0 if self._random() * (counts[0] + counts[1]) < counts[0] else 1
+            pool = pools[index]
+            samples.append(pool.pop(int(self._random() * len(pool))))
+            counts[index] -= 1
+        self.samples = samples
+        self.count += other.count
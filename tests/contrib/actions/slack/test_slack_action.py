@@ -1,6 +1,10 @@
+import json
+import re
+
 import pytest
 
 from spidermon.contrib.actions.slack import SlackMessageManager
+from spidermon.contrib.actions.slack.notifiers import SendSlackMessageSpiderFinished
 
 
 @pytest.fixture
@@ -27,9 +31,7 @@ def test_log_text_and_attachment_when_fake_set(logger_info):
     manager = SlackMessageManager(
         sender_token="anything", sender_name="@someone", fake=True
     )
-    manager.send_message(
-        to=[], text=text_to_be_logged, attachments=attach_to_be_logged
-    )
+    manager.send_message(to=[], text=text_to_be_logged, attachments=attach_to_be_logged)
 
     assert logger_info.call_count == 2
     assert text_to_be_logged in logger_info.call_args_list[0][0]
@@ -59,3 +61,25 @@ def test_do_not_log_text_and_attach_when_fake_is_not_set(logger_info):
     )
 
     assert logger_info.call_count == 0
+
+
+def test_failed_attachments_include_failure_reasons(mocker):
+    result = mocker.Mock()
+    result.monitor.name = "Validation/test_errors"
+    result.reason = 'Field url has 1 validation errors!\n  Sample: "a" in {"url": "a"}'
+    action = SendSlackMessageSpiderFinished(
+        sender_token="anything",
+        sender_name="@someone",
+        recipients=["someone"],
+        fake=True,
+    )
+    action.result = mocker.Mock(
+        monitors_passed_results=[], monitors_failed_results=[result]
+    )
+    action.data = {}
+
+    attachments = action.get_attachments()
+    attachments = json.loads(re.sub(r",\s*\]", "]", attachments))
+    assert attachments[0]["text"] == (
+        u"\u2022  _Validation/test_errors_\n```{}```\n".format(result.reason)
+    )
@@ -1,27 +1,42 @@
 import re
 
 import pytest
+from scrapy import Spider
+from scrapy.exceptions import DropItem
+from scrapy.utils.test import get_crawler
 
 from spidermon.contrib.monitors.mixins import ValidationMonitorMixin
+from spidermon.contrib.monitors.mixins.validation import ValidationInfo
 from spidermon.contrib.scrapy.monitors import BaseScrapyMonitor
+from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from spidermon.contrib.scrapy.stats import get_validation_counters
 from spidermon.data import Data
+from tests.fixtures.items import TestItem, TreeItem
+from tests.fixtures.validators import test_schema, tree_schema
 
 
 stats = {
-    'spidermon/validation/fields': 100,
-    'spidermon/validation/fields/errors': 20,
-    'spidermon/validation/fields/errors/missing_required_field': 15,
-    'spidermon/validation/fields/errors/missing_required_field/field2': 5,
-    'spidermon/validation/fields/errors/missing_required_field/field3': 10,
-    'spidermon/validation/fields/errors/': 10,
-    'spidermon/validation/items': 10,
+    "spidermon/validation/fields": 100,
+    "spidermon/validation/fields/errors": 20,
+    "spidermon/validation/fields/errors/missing_required_field": 15,
+    "spidermon/validation/fields/errors/missing_required_field/field2": 5,
+    "spidermon/validation/fields/errors/missing_required_field/field3": 10,
+    "spidermon/validation/fields/errors/": 10,
+    "spidermon/validation/items": 10,
 }
 
 
 class DummyValidationMonitor(BaseScrapyMonitor, ValidationMonitorMixin):
-    def __init__(self, stats, correct_field_list_handling, methodName="runTest", name=None):
+    def __init__(
+        self,
+        stats,
+        correct_field_list_handling,
+        methodName="runTest",
+        name=None,
+        crawler=None,
+    ):
         super(DummyValidationMonitor, self).__init__(methodName, name)
-        self.data = Data({'stats': stats})
+        self.data = Data({"stats": stats, "crawler": crawler})
         self.correct_field_list_handling = correct_field_list_handling
 
     def runTest(self):
@@ -55,13 +70,13 @@ Required field field3 is missing in 10 items! (maximum allowed 7)
 
 
 def test_check_missing_required_fields_one_field(monitor):
-    monitor.check_missing_required_fields(field_names=['field1'])
+    monitor.check_missing_required_fields(field_names=["field1"])
     msg = """
 Required fields are missing:
 Required field field2 is missing in 5 items!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_missing_required_fields(field_names=['field2'])
+        monitor.check_missing_required_fields(field_names=["field2"])
 
 
 def test_check_missing_required_fields_multiple_fields(monitor):
@@ -71,7 +86,7 @@ Required field field2 is missing in 5 items!
 Required field field3 is missing in 10 items!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_missing_required_fields(field_names=['field2', 'field3'])
+        monitor.check_missing_required_fields(field_names=["field2", "field3"])
 
 
 def test_check_missing_required_fields_no_fields_old(old_monitor):
@@ -81,10 +96,10 @@ def test_check_missing_required_fields_no_fields_old(old_monitor):
 
 
 def check_missing_required_field(monitor):
-    monitor.check_missing_required_field(field_name='field1')
+    monitor.check_missing_required_field(field_name="field1")
     msg = "Required field field2 is missing in 5 items!"
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_missing_required_field(field_name='field2')
+        monitor.check_missing_required_field(field_name="field2")
 
 
 def test_check_missing_required_fields_percent_no_fields(monitor):
@@ -104,13 +119,13 @@ Required fields are missing:
 
 
 def test_check_missing_required_fields_percent_one_field(monitor):
-    monitor.check_missing_required_fields_percent(field_names=['field1'])
+    monitor.check_missing_required_fields_percent(field_names=["field1"])
     msg = """
 Required fields are missing:
 50.0% of required field field2 are missing!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_missing_required_fields_percent(field_names=['field2'])
+        monitor.check_missing_required_fields_percent(field_names=["field2"])
 
 
 def test_check_missing_required_fields_percent_multiple_fields(monitor):
@@ -120,7 +135,7 @@ Required fields are missing:
 100.0% of required field field3 are missing!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_missing_required_fields_percent(field_names=['field2', 'field3'])
+        monitor.check_missing_required_fields_percent(field_names=["field2", "field3"])
 
 
 def test_check_missing_required_fields_percent_no_fields_old(old_monitor):
@@ -130,10 +145,10 @@ def test_check_missing_required_fields_percent_no_fields_old(old_monitor):
 
 
 def check_missing_required_field_percent(monitor):
-    monitor.check_missing_required_field_percent(field_name='field1')
+    monitor.check_missing_required_field_percent(field_name="field1")
     msg = "50.0% of required field field2 are missing!"
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_missing_required_field_percent(field_name='field2')
+        monitor.check_missing_required_field_percent(field_name="field2")
 
 
 def test_check_fields_errors_no_fields(monitor):
@@ -153,13 +168,13 @@ Field field3 has 10 validation errors! (maximum allowed 7)
 
 
 def test_check_fields_errors_one_field(monitor):
-    monitor.check_fields_errors(field_names=['field1'])
+    monitor.check_fields_errors(field_names=["field1"])
     msg = """
 There are field errors:
 Field field2 has 5 validation errors!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_fields_errors(field_names=['field2'])
+        monitor.check_fields_errors(field_names=["field2"])
 
 
 def test_check_fields_errors_multiple_fields(monitor):
@@ -169,7 +184,7 @@ Field field2 has 5 validation errors!
 Field field3 has 10 validation errors!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_fields_errors(field_names=['field2', 'field3'])
+        monitor.check_fields_errors(field_names=["field2", "field3"])
 
 
 def test_check_fields_errors_no_fields_old(old_monitor):
@@ -179,10 +194,10 @@ def test_check_fields_errors_no_fields_old(old_monitor):
 
 
 def test_check_field_errors(monitor):
-    monitor.check_field_errors(field_name='field1')
+    monitor.check_field_errors(field_name="field1")
     msg = "Field field2 has 5 validation errors!"
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_field_errors(field_name='field2')
+        monitor.check_field_errors(field_name="field2")
 
 
 def test_check_fields_errors_percent_no_fields(monitor):
@@ -202,13 +217,13 @@ There are field errors:
 
 
 def test_check_fields_errors_percent_one_field(monitor):
-    monitor.check_fields_errors_percent(field_names=['field1'])
+    monitor.check_fields_errors_percent(field_names=["field1"])
     msg = """
 There are field errors:
 50.0% of field field2 have validation errors!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_fields_errors_percent(field_names=['field2'])
+        monitor.check_fields_errors_percent(field_names=["field2"])
 
 
 def test_check_fields_errors_percent_multiple_fields(monitor):
@@ -218,7 +233,7 @@ There are field errors:
 100.0% of field field3 have validation errors!
     """.strip()
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_fields_errors_percent(field_names=['field2', 'field3'])
+        monitor.check_fields_errors_percent(field_names=["field2", "field3"])
 
 
 def test_check_fields_errors_percent_no_fields_old(old_monitor):
@@ -228,7 +243,183 @@ def test_check_fields_errors_percent_no_fields_old(old_monitor):
 
 
 def test_check_field_errors_percent(monitor):
-    monitor.check_field_errors_percent(field_name='field1')
+    monitor.check_field_errors_percent(field_name="field1")
     msg = "50.0% of field field2 have validation errors!"
     with pytest.raises(AssertionError, match=msg):
-        monitor.check_field_errors_percent(field_name='field2')
+        monitor.check_field_errors_percent(field_name="field2")
+
+
+def test_validation_is_shared_by_monitors_with_same_stats():
+    shared_stats = Data(stats)
+    first = DummyValidationMonitor(shared_stats, True)
+    second = DummyValidationMonitor(shared_stats, True)
+    assert first.validation is second.validation
+    assert first.validation is not DummyValidationMonitor(stats, True).validation
+
+
+def test_validation_is_updated_with_new_stats(monitor):
+    assert monitor.validation.items.count == 10
+    assert monitor.validation is monitor.validation
+    monitor.init_data(
+        Data({"stats": dict(stats, **{"spidermon/validation/items": 20})})
+    )
+    assert monitor.validation.items.count == 20
+
+
+def get_validated_crawler(settings=None):
+    crawler = get_crawler(
+        settings_dict=dict(
+            {
+                "SPIDERMON_VALIDATION_SCHEMAS": {
+                    TestItem: test_schema,
+                    TreeItem: tree_schema,
+                },
+                "SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True,
+            },
+            **(settings or {})
+        )
+    )
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    pipe.open_spider(None)
+    items = [
+        TestItem(),
+        TestItem(url=1),
+        TestItem(url="a", title=2),
+        TestItem(url="a"),
+        TreeItem(),
+        TreeItem(child=[]),
+        TreeItem(child={}),
+        TestItem(title=2),
+    ]
+    for item in items:
+        try:
+            pipe.process_item(item, None)
+        except DropItem:
+            pass
+    pipe.close_spider(Spider("test"))
+    return crawler
+
+
+def get_counts(validation):
+    return (
+        validation.items.count,
+        validation.items.errors.count,
+        validation.items.dropped.count,
+        validation.fields.count,
+        dict(
+            (
+                error,
+                dict(
+                    (field, info.count)
+                    for field, info in validation.errors[error].fields.items()
+                ),
+            )
+            for error in validation.errors
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"SPIDERMON_VALIDATION_FIELD_ERRORS_LIMIT": 1},
+        {"SPIDERMON_VALIDATION_STATS_FLUSH_INTERVAL": 60},
+    ],
+)
+def test_validation_counters_match_stats(settings):
+    crawler = get_validated_crawler(settings)
+    stats = crawler.stats.get_stats()
+    counters = get_validation_counters(crawler.stats)
+    expected = get_counts(ValidationInfo(stats))
+    assert expected[0] == 8
+    assert get_counts(ValidationInfo(stats, counters=counters)) == expected
+
+
+def test_validation_uses_counters_of_same_crawler():
+    crawler = get_validated_crawler()
+    monitor = DummyValidationMonitor(
+        Data(crawler.stats.get_stats()), True, crawler=crawler
+    )
+    assert monitor.validation.errors["missing_required_field"].count == 3
+    # Stats names were not parsed
+    assert monitor.validation.analyzer._sorted_keys is None
+
+
+def test_validation_ignores_counters_not_matching_stats():
+    crawler = get_validated_crawler()
+    old_stats = dict(crawler.stats.get_stats(), **{"spidermon/validation/items": 7})
+    monitor = DummyValidationMonitor(Data(old_stats), True, crawler=crawler)
+    assert monitor.validation.items.count == 7
+    assert monitor.validation.analyzer._sorted_keys is not None
+
+
+@pytest.mark.parametrize("item_type_stats", [True, False])
+def test_validation_by_item_type(item_type_stats):
+    crawler = get_validated_crawler(
+        {"SPIDERMON_VALIDATION_ITEM_TYPE_STATS": item_type_stats}
+    )
+    stats = crawler.stats.get_stats()
+    counters = get_validation_counters(crawler.stats)
+    validations = [ValidationInfo(stats, counters=counters)]
+    if item_type_stats:
+        validations.append(ValidationInfo(stats))
+    else:
+        assert not [name for name in stats if "/types/" in name]
+    for validation in validations:
+        assert sorted(validation.types) == ["testitem", "treeitem"]
+        assert get_counts(validation.types["testitem"]) == (
+            5,
+            4,
+            4,
+            5,
+            {
+                "missing_required_field": {"url": 2},
+                "invalid_string": {"url": 1, "title": 2},
+            },
+        )
+        assert get_counts(validation.types["treeitem"]) == (
+            3,
+            2,
+            2,
+            2,
+            {"missing_required_field": {"child": 1}, "invalid_object": {"child": 1},},
+        )
+
+
+def test_validation_by_item_type_uses_counters():
+    crawler = get_validated_crawler()
+    monitor = DummyValidationMonitor(
+        Data(crawler.stats.get_stats()), True, crawler=crawler
+    )
+    testitem = monitor.validation.types["testitem"]
+    assert testitem.errors["missing_required_field"].count == 2
+    assert testitem.analyzer._sorted_keys is None
+
+
+def test_validation_error_samples():
+    crawler = get_validated_crawler({"SPIDERMON_VALIDATION_ERROR_SAMPLES": 5})
+    stats = crawler.stats.get_stats()
+    validation = ValidationInfo(stats, counters=get_validation_counters(crawler.stats))
+    samples = validation.get_error_samples("url", "missing_required_field")
+    assert sorted(sample["item"] for sample in samples) == ['{"title": 2}', "{}"]
+    assert len(validation.get_error_samples("url")) == 3
+    assert len(validation.get_error_samples()) == 7
+    assert len(validation.types["treeitem"].get_error_samples()) == 2
+    # Samples are only kept in memory
+    assert ValidationInfo(stats).get_error_samples() == []
+
+
+def test_check_field_errors_with_samples():
+    crawler = get_validated_crawler({"SPIDERMON_VALIDATION_ERROR_SAMPLES": 5})
+    monitor = DummyValidationMonitor(
+        Data(crawler.stats.get_stats()), True, crawler=crawler
+    )
+    with pytest.raises(AssertionError) as e:
+        monitor.check_missing_required_field("url")
+    message = str(e.value)
+    assert "\n  Sample: missing (Missing required field) in {}" in message
+    assert '\n  Sample: missing (Missing required field) in {"title": 2}' in message
+    with pytest.raises(AssertionError) as e:
+        monitor.check_fields_errors(["title"], errors=["invalid_string"])
+    assert str(e.value).count('\n  Sample: 2 (Invalid string) in {"') == 2
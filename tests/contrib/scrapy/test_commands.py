@@ -0,0 +1,131 @@
+from __future__ import absolute_import
+import json
+from optparse import OptionParser
+
+import pytest
+from scrapy.exceptions import UsageError
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from spidermon.contrib.scrapy.commands.validate import Command
+from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from tests.fixtures.items import TestItem
+from tests.fixtures.suites import ValidationStatsMonitor
+from tests.fixtures.validators import test_schema
+
+ITEMS = [
+    {"url": "http://example.com/1", "title": "Item"},
+    {"title": "Item"},
+    {"url": 1},
+    {"url": "http://example.com/2"},
+]
+SETTINGS = {"SPIDERMON_VALIDATION_SCHEMAS": {TestItem: test_schema}}
+
+
+def run_command(args, settings=SETTINGS, **options):
+    command = Command()
+    command.settings = Settings(settings)
+    parser = OptionParser()
+    command.add_options(parser)
+    opts, _ = parser.parse_args([])
+    opts.__dict__.update(options)
+    command.run(args, opts)
+
+
+def get_validation_stats(stats):
+    return dict(
+        (key, value)
+        for key, value in stats.items()
+        if key.startswith("spidermon/validation/")
+    )
+
+
+@pytest.fixture
+def items_path(tmpdir):
+    path = tmpdir.join("items.jl")
+    path.write("".join(json.dumps(item) + "\n" for item in ITEMS))
+    return str(path)
+
+
+@pytest.mark.parametrize("workers", ["0", "2"])
+def test_validate_command_stats_match_pipeline(tmpdir, items_path, workers):
+    output = str(tmpdir.join("stats.json"))
+    run_command(
+        [items_path, items_path],
+        item_type="TestItem",
+        workers=workers,
+        output=output,
+        chunk_size="10",
+    )
+    with open(output) as f:
+        stats = json.load(f)
+
+    crawler = get_crawler(settings_dict=SETTINGS)
+    pipeline = ItemValidationPipeline.from_crawler(crawler)
+    for item in ITEMS * 2:
+        pipeline.process_item(TestItem(item), None)
+    assert get_validation_stats(stats) == get_validation_stats(
+        crawler.stats.get_stats()
+    )
+    assert stats["spidermon/validation/items/errors"] == 4
+
+
+def test_validate_command_writes_stats_to_stdout(items_path, capsys):
+    run_command([items_path], item_type="TestItem", workers="0")
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["spidermon/validation/items"] == len(ITEMS)
+
+
+def test_validate_command_requires_validators(items_path):
+    with pytest.raises(UsageError):
+        run_command([items_path], item_type="OtherItem", workers="0")
+    with pytest.raises(UsageError):
+        run_command([], item_type="TestItem", workers="0")
+
+
+def test_validate_command_monitors_require_spidermon(items_path):
+    with pytest.raises(UsageError):
+        run_command([items_path], item_type="TestItem", workers="0", monitors=True)
+
+
+def test_validate_command_runs_monitors_on_stats(tmpdir, items_path):
+    del ValidationStatsMonitor.results[:]
+    settings = dict(
+        SETTINGS,
+        SPIDERMON_ENABLED=True,
+        SPIDERMON_SPIDER_CLOSE_MONITORS=["tests.fixtures.suites.ValidationStatsSuite"],
+    )
+    run_command(
+        [items_path],
+        settings=settings,
+        item_type="TestItem",
+        workers="0",
+        output=str(tmpdir.join("stats.json")),
+        monitors=True,
+    )
+    assert ValidationStatsMonitor.results == [(len(ITEMS), 2)]
+
+
+@pytest.mark.parametrize(
+    "sampling",
+    [
+        {
+            "SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING": True,
+            "SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_WINDOW": 2,
+        },
+        {"SPIDERMON_VALIDATION_SAMPLING_RATE": 0.5},
+    ],
+)
+def test_validate_command_does_not_sample_items(tmpdir, items_path, sampling):
+    output = str(tmpdir.join("stats.json"))
+    run_command(
+        [items_path],
+        settings=dict(SETTINGS, **sampling),
+        item_type="TestItem",
+        workers="0",
+        output=output,
+    )
+    with open(output) as f:
+        stats = json.load(f)
+    assert stats["spidermon/validation/items"] == len(ITEMS)
+    assert not [key for key in stats if "/sampling/" in key]
@@ -2,12 +2,22 @@ from __future__ import absolute_import
 from unittest import TestCase
 from slugify import slugify
 from scrapy.utils.test import get_crawler
-from scrapy import Item
+from scrapy.exceptions import DropItem, NotConfigured
+from scrapy import Item, Field
+from twisted.internet import defer
 from functools import partial
+from datetime import date, datetime, time
+from decimal import Decimal
 import sys
+from six.moves import queue
 
 import pytest
 from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from spidermon.contrib.validation import (
+    ColumnarJSONSchemaValidator,
+    CompiledJSONSchemaValidator,
+    JSONSchemaValidator,
+)
 from tests.fixtures.items import TreeItem, TestItem
 from tests.fixtures.validators import tree_schema, test_schema, test_schema_string
 import six
@@ -17,6 +27,7 @@ STATS_AMOUNTS = "spidermon/validation/validators"
 STATS_ITEM_ERRORS = "spidermon/validation/items/errors"
 STATS_MISSINGS = "spidermon/validation/fields/errors/missing_required_field"
 STATS_TYPES = "spidermon/validation/validators/{}/{}"
+STATS_TIMING = "spidermon/validation/timing"
 
 SETTING_SCHEMAS = "SPIDERMON_VALIDATION_SCHEMAS"
 SETTING_MODELS = "SPIDERMON_VALIDATION_MODELS"
@@ -217,7 +228,8 @@ class PipelineJSONSchemaValidator(PipelineTest):
 )
 def test_validator_from_url(mocker):
     mocked_get_contents = mocker.patch(
-        "spidermon.contrib.validation.jsonschema.tools.get_contents", return_value=test_schema_string
+        "spidermon.contrib.validation.jsonschema.tools.get_contents",
+        return_value=test_schema_string,
     )
     settings = {SETTING_SCHEMAS: {TestItem: "https://fixtures.com/testschema.json"}}
     test_item = TestItem()
@@ -350,3 +362,545 @@ class PipelineValidators(PipelineTest):
             ],
         ),
     ]
+
+
+class SerializedItem(Item):
+    name = Field(serializer=lambda value: value.upper())
+    price = Field()
+    updated = Field()
+    child = Field()
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        TestItem({"url": "http://example.com", "title": u"T\xedtulo"}),
+        TreeItem({"child": TreeItem({"child": TestItem(url="example.com")})}),
+        {"a": 1, "b": [1, 2.5, None, True], "c": {"d": (u"x", u"y")}},
+        SerializedItem(
+            name="product",
+            price=Decimal("10.50"),
+            updated=datetime(2019, 8, 1, 10, 30),
+            child={"day": date(2019, 8, 1), "time": time(10, 30), "tags": {"a"}},
+        ),
+        {"key": object()},
+        {1: "non string key"},
+    ],
+)
+def test_convert_item_to_dict_matches_exporter(item):
+    pipe = ItemValidationPipeline.from_crawler(
+        get_crawler(settings_dict={SETTING_SCHEMAS: [test_schema]})
+    )
+    try:
+        expected = pipe._export_item_to_dict(item)
+    except TypeError:
+        with pytest.raises(TypeError):
+            pipe._convert_item_to_dict(item)
+    else:
+        assert pipe._convert_item_to_dict(item) == expected
+
+
+class FakeReactor(object):
+    """
+    Runs the calls scheduled by the pipeline when asked to, so workers can
+    be tested without running the reactor.
+    """
+
+    def __init__(self):
+        self.calls = queue.Queue()
+
+    def callLater(self, delay, f, *args):
+        self.calls.put((f, args))
+        return self
+
+    def active(self):
+        # Scheduled calls are run as soon as the reactor is asked to, so
+        # there is never an active one to be cancelled
+        return False
+
+    def callFromThread(self, f, *args):
+        self.calls.put((f, args))
+
+    def run_until(self, condition, timeout=10):
+        while not condition():
+            f, args = self.calls.get(timeout=timeout)
+            f(*args)
+
+
+def get_workers_test_items():
+    return [
+        TestItem({"url": "http://example.com"}),
+        TestItem(),
+        TestItem({"url": 1, "title": 2}),
+        TreeItem(),
+        {"url": "http://example.com"},
+    ]
+
+
+def process_items(pipe, reactor, items=None):
+    pipe.open_spider(None)
+    results = [
+        defer.maybeDeferred(pipe.process_item, item, None)
+        for item in items or get_workers_test_items()
+    ]
+    reactor.run_until(lambda: all(d.called for d in results))
+    pipe.close_spider(None)
+    values = []
+    for d in results:
+        d.addErrback(lambda failure: failure.type)
+        values.append(d.result)
+    return values
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "thread",
+            "SPIDERMON_VALIDATION_BATCH_SIZE": 2,
+        },
+        {"SPIDERMON_VALIDATION_WORKERS_BACKEND": "process"},
+        {
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "thread",
+            "SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True,
+        },
+        {
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "thread",
+            "SPIDERMON_VALIDATION_ADD_ERRORS_TO_ITEMS": True,
+        },
+        {
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "process",
+            "SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND": "compiled",
+        },
+    ],
+)
+def test_validation_workers_match_sequential_validation(mocker, settings):
+    reactor = FakeReactor()
+    mocker.patch("twisted.internet.reactor", reactor)
+    settings.update(
+        {
+            SETTING_SCHEMAS: {TestItem: test_schema, Item: tree_schema},
+            SETTING_MODELS: {TestItem: TEST_VALIDATOR_PATH},
+        }
+    )
+
+    expected_pipe = ItemValidationPipeline.from_crawler(
+        get_crawler(settings_dict=settings)
+    )
+    expected_results = process_items(expected_pipe, reactor)
+
+    settings["SPIDERMON_VALIDATION_WORKERS"] = 2
+    pipe = ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+    results = process_items(pipe, reactor)
+
+    assert results == expected_results
+    assert pipe.stats.stats.get_stats() == expected_pipe.stats.stats.get_stats()
+
+
+def test_invalid_validation_workers_backend():
+    settings = {
+        SETTING_SCHEMAS: [test_schema],
+        "SPIDERMON_VALIDATION_WORKERS": 2,
+        "SPIDERMON_VALIDATION_WORKERS_BACKEND": "invalid",
+    }
+    with pytest.raises(NotConfigured):
+        ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+
+
+@pytest.mark.parametrize(
+    "version,backend,configured",
+    [
+        ("1.1.3", "thread", False),
+        ("1.1.3", "process", True),
+        ("2.1.0", "thread", True),
+    ],
+)
+def test_thread_workers_require_thread_safe_validators(
+    mocker, version, backend, configured
+):
+    mocker.patch("schematics.__version__", version)
+    settings = {
+        SETTING_MODELS: [TEST_VALIDATOR_PATH],
+        "SPIDERMON_VALIDATION_WORKERS": 2,
+        "SPIDERMON_VALIDATION_WORKERS_BACKEND": backend,
+    }
+    crawler = get_crawler(settings_dict=settings)
+    if configured:
+        ItemValidationPipeline.from_crawler(crawler)
+    else:
+        with pytest.raises(NotConfigured, match="Schematics validators"):
+            ItemValidationPipeline.from_crawler(crawler)
+
+
+@pytest.mark.parametrize(
+    "backend,expected_classes",
+    [
+        (None, {"TestItem": JSONSchemaValidator, "Item": JSONSchemaValidator}),
+        (
+            "compiled",
+            {
+                "TestItem": CompiledJSONSchemaValidator,
+                "Item": CompiledJSONSchemaValidator,
+            },
+        ),
+        (
+            {TestItem: "compiled"},
+            {"TestItem": CompiledJSONSchemaValidator, "Item": JSONSchemaValidator},
+        ),
+        (
+            {"Item": "compiled"},
+            {"TestItem": JSONSchemaValidator, "Item": CompiledJSONSchemaValidator},
+        ),
+    ],
+)
+def test_jsonschema_backend(backend, expected_classes):
+    settings = {SETTING_SCHEMAS: {TestItem: test_schema, Item: tree_schema}}
+    if backend is not None:
+        settings["SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND"] = backend
+    pipe = ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+    for key, validator_class in expected_classes.items():
+        assert [type(validator) for validator in pipe.validators[key]] == [
+            validator_class
+        ]
+    pipe.process_item(TestItem(), None)
+    assert pipe.stats.stats.get_value(STATS_MISSINGS) == 1
+
+
+@pytest.mark.parametrize("backend", ["invalid", {TestItem: "invalid"}])
+def test_invalid_jsonschema_backend(backend):
+    settings = {
+        SETTING_SCHEMAS: [test_schema],
+        "SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND": backend,
+    }
+    with pytest.raises(NotConfigured):
+        ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"SPIDERMON_VALIDATION_BATCH_SIZE": 4},
+        {"SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True},
+        {"SPIDERMON_VALIDATION_ADD_ERRORS_TO_ITEMS": True},
+        {
+            "SPIDERMON_VALIDATION_WORKERS": 2,
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "thread",
+        },
+    ],
+)
+def test_columnar_validation_matches_item_validation(mocker, settings):
+    pytest.importorskip("numpy")
+    reactor = FakeReactor()
+    mocker.patch("twisted.internet.reactor", reactor)
+    settings[SETTING_SCHEMAS] = {TestItem: test_schema, Item: tree_schema}
+
+    def get_items():
+        values = [None, 1, 1.5, "http://example.com", "", ["a"], 2 ** 60]
+        items = [TestItem({"url": value}) for value in values]
+        items += [TestItem({"title": value}) for value in values]
+        return items + get_workers_test_items()
+
+    expected_pipe = ItemValidationPipeline.from_crawler(
+        get_crawler(settings_dict=settings)
+    )
+    expected_results = process_items(expected_pipe, reactor, get_items())
+
+    settings["SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND"] = "columnar"
+    pipe = ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+    assert pipe.validate_in_batches
+    results = process_items(pipe, reactor, get_items())
+
+    assert results == expected_results
+    assert pipe.stats.stats.get_stats() == expected_pipe.stats.stats.get_stats()
+
+
+def test_columnar_backend_requires_numpy(mocker):
+    mocker.patch.object(ColumnarJSONSchemaValidator, "available", False)
+    settings = {
+        SETTING_SCHEMAS: [test_schema],
+        "SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND": "columnar",
+    }
+    with pytest.raises(NotConfigured):
+        ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"SPIDERMON_VALIDATION_FAIL_FAST": True},
+        {
+            "SPIDERMON_VALIDATION_FAIL_FAST": True,
+            "SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True,
+            "SPIDERMON_VALIDATION_ADD_ERRORS_TO_ITEMS": True,
+        },
+    ],
+)
+def test_fail_fast_requires_dropping_items(settings):
+    settings[SETTING_SCHEMAS] = [test_schema]
+    with pytest.raises(NotConfigured):
+        ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (False, False),
+        ("1", True),
+        (["Missing required field"], frozenset(["Missing required field"])),
+    ],
+)
+def test_fail_fast_setting(value, expected):
+    settings = {
+        SETTING_SCHEMAS: [test_schema],
+        "SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True,
+        "SPIDERMON_VALIDATION_FAIL_FAST": value,
+    }
+    crawler = get_crawler(settings_dict=settings)
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    assert pipe.fail_fast == expected
+    assert all(v.fail_fast == expected for v in pipe.validators["Item"])
+    assert crawler.stats.get_value("spidermon/validation/fail_fast") == (
+        True if expected else None
+    )
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND": "compiled"},
+        {
+            "SPIDERMON_VALIDATION_WORKERS": 2,
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "process",
+        },
+    ],
+)
+def test_fail_fast_stops_at_first_error(mocker, settings):
+    reactor = FakeReactor()
+    mocker.patch("twisted.internet.reactor", reactor)
+    schema = {
+        "type": "object",
+        "properties": {"url": {"type": "string"}, "title": {"type": "string"}},
+        "required": ["url", "title"],
+    }
+    settings.update(
+        {
+            SETTING_SCHEMAS: {TestItem: schema},
+            "SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True,
+        }
+    )
+    items = [TestItem(), TestItem(url="http://example.com", title="title")]
+
+    expected_pipe = ItemValidationPipeline.from_crawler(
+        get_crawler(settings_dict=settings)
+    )
+    expected_results = process_items(expected_pipe, reactor, items)
+    expected_stats = expected_pipe.stats.stats.get_stats()
+
+    settings["SPIDERMON_VALIDATION_FAIL_FAST"] = True
+    pipe = ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+    results = process_items(pipe, reactor, items)
+    stats = pipe.stats.stats.get_stats()
+
+    assert results == expected_results
+    assert results[0] is DropItem
+    # Items counters are the same, field errors counters are lower bounds
+    for name in ["items", "items/errors", "items/dropped"]:
+        name = "spidermon/validation/" + name
+        assert stats[name] == expected_stats[name]
+    assert expected_stats[STATS_MISSINGS] == 2
+    assert stats[STATS_MISSINGS] == 1
+    assert stats["spidermon/validation/fail_fast"] is True
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {},
+        {"SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS": True},
+        {"SPIDERMON_VALIDATION_ADD_ERRORS_TO_ITEMS": True},
+        {"SPIDERMON_VALIDATION_SAMPLING_RATE": 0.8},
+        {
+            "SPIDERMON_VALIDATION_WORKERS": 2,
+            "SPIDERMON_VALIDATION_WORKERS_BACKEND": "thread",
+        },
+    ],
+)
+def test_results_cache_matches_validation(mocker, settings):
+    reactor = FakeReactor()
+    mocker.patch("twisted.internet.reactor", reactor)
+    settings.update(
+        {
+            SETTING_SCHEMAS: {TestItem: test_schema, Item: tree_schema},
+            SETTING_MODELS: {TestItem: TEST_VALIDATOR_PATH},
+        }
+    )
+
+    def get_items():
+        return get_workers_test_items() * 3
+
+    expected_pipe = ItemValidationPipeline.from_crawler(
+        get_crawler(settings_dict=settings)
+    )
+    expected_results = process_items(expected_pipe, reactor, get_items())
+
+    settings["SPIDERMON_VALIDATION_RESULTS_CACHE_SIZE"] = 100
+    pipe = ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+    results = process_items(pipe, reactor, get_items())
+
+    assert results == expected_results
+    stats = pipe.stats.stats.get_stats()
+    hits = stats.pop("spidermon/validation/cache/hits", 0)
+    misses = stats.pop("spidermon/validation/cache/misses", 0)
+    assert stats == expected_pipe.stats.stats.get_stats()
+    assert hits + misses == stats.get("spidermon/validation/items", 0)
+    if "SPIDERMON_VALIDATION_WORKERS" not in settings:
+        # Results of items sent to the workers are cached once they return
+        assert hits > 0
+
+
+def test_results_cache_reuses_validation_results(mocker):
+    settings = {
+        SETTING_SCHEMAS: [test_schema],
+        "SPIDERMON_VALIDATION_RESULTS_CACHE_SIZE": 2,
+    }
+    crawler = get_crawler(settings_dict=settings)
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    validate = mocker.spy(pipe.validators["Item"][0], "validate")
+    items = [
+        TestItem(url="http://example.com/1"),
+        TestItem(url="http://example.com/1"),
+        TestItem(url="http://example.com/2"),
+        TestItem(url="http://example.com/3"),
+        TestItem(url="http://example.com/1"),
+        TestItem(url="http://example.com/3"),
+        TestItem(),
+        TestItem(),
+    ]
+    for item in items:
+        pipe.process_item(item, None)
+
+    # The first item is discarded from the cache before it is seen again
+    assert validate.call_count == 5
+    assert crawler.stats.get_value("spidermon/validation/cache/hits") == 3
+    assert crawler.stats.get_value("spidermon/validation/cache/misses") == 5
+    assert crawler.stats.get_value("spidermon/validation/items") == 8
+    assert crawler.stats.get_value(STATS_ITEM_ERRORS) == 2
+    assert crawler.stats.get_value(STATS_MISSINGS) == 2
+
+
+@pytest.mark.parametrize("backend", ["jsonschema", "compiled"])
+def test_timing_stats(caplog, backend):
+    settings = {
+        SETTING_SCHEMAS: {TestItem: [test_schema, test_schema]},
+        SETTING_MODELS: {TestItem: TEST_VALIDATOR_PATH},
+        "SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND": backend,
+        "SPIDERMON_VALIDATION_TIMING": True,
+    }
+    crawler = get_crawler(settings_dict=settings)
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    for item in [TestItem(), TestItem(url="http://example.com")]:
+        pipe.process_item(item, None)
+    assert not any("timing" in name for name in crawler.stats.get_stats())
+    with caplog.at_level("INFO"):
+        pipe.close_spider(crawler._create_spider("foo"))
+
+    timing_stats = dict(
+        (name, value)
+        for name, value in crawler.stats.get_stats().items()
+        if name.startswith(STATS_TIMING)
+    )
+    for name, stats_name in [
+        ("JSONSchema", "jsonschema"),
+        ("JSONSchema_2", "jsonschema_2"),
+        ("Schematics", "schematics"),
+    ]:
+        prefix = STATS_TIMING + "/testitem/{}/".format(stats_name)
+        assert timing_stats.pop(prefix + "items") == 2
+        total = timing_stats.pop(prefix + "total")
+        assert total > 0
+        assert timing_stats.pop(prefix + "mean") == total / 2
+        assert 0 < timing_stats.pop(prefix + "max") <= total
+        assert "TestItem/{}: 2 items".format(name) in caplog.text
+    if backend == "jsonschema":
+        keyword_prefix = STATS_TIMING + "/testitem/jsonschema/keywords/"
+        assert timing_stats[keyword_prefix + "required/calls"] == 2
+        assert "required: 2 calls" in caplog.text
+    else:
+        assert timing_stats == {}
+
+
+def test_timing_requires_no_workers():
+    settings = {
+        SETTING_SCHEMAS: [test_schema],
+        "SPIDERMON_VALIDATION_TIMING": True,
+        "SPIDERMON_VALIDATION_WORKERS": 2,
+    }
+    with pytest.raises(NotConfigured):
+        ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+
+
+class SpecialTestItem(TestItem):
+    pass
+
+
+def test_validators_found_through_item_class_mro():
+    settings = {
+        SETTING_SCHEMAS: {TestItem: test_schema, Item: tree_schema},
+        "SPIDERMON_VALIDATION_ITEM_TYPE_STATS": True,
+    }
+    crawler = get_crawler(settings_dict=settings)
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    assert pipe.find_validators(SpecialTestItem()) is pipe.validators["TestItem"]
+    assert pipe.find_validators(TreeItem()) is pipe.validators["Item"]
+    assert pipe.find_validators({}) is pipe.validators["Item"]
+
+    pipe.process_item(SpecialTestItem(url="a"), None)
+    pipe.process_item(TreeItem(), None)
+    stats = crawler.stats.get_stats()
+    assert stats["spidermon/validation/types/testitem/items"] == 1
+    assert stats["spidermon/validation/types/item/items"] == 1
+    assert stats["spidermon/validation/types/item/items/errors"] == 1
+
+
+def test_no_validators_for_item_class():
+    crawler = get_crawler(settings_dict={SETTING_SCHEMAS: {TestItem: test_schema}})
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    assert pipe.find_validators(TreeItem()) == []
+    item = TreeItem()
+    assert pipe.process_item(item, None) is item
+
+
+def test_subclass_overriding_add_error_stats():
+    class CustomPipeline(ItemValidationPipeline):
+        def _add_error_stats(self, errors):
+            self.errors = errors
+            super(CustomPipeline, self)._add_error_stats(errors)
+
+    crawler = get_crawler(
+        settings_dict={
+            SETTING_SCHEMAS: {TestItem: test_schema},
+            "SPIDERMON_VALIDATION_SAMPLING_RATE": 0.5,
+            "SPIDERMON_VALIDATION_ITEM_TYPE_STATS": True,
+        }
+    )
+    pipe = CustomPipeline.from_crawler(crawler)
+    data = {"title": "a"}
+    pipe._process_validation_results(
+        TestItem(data), data, [(False, {"url": ["Missing required field"]})], 0.5
+    )
+    assert pipe.errors == {"url": ["Missing required field"]}
+    assert crawler.stats.get_value(STATS_MISSINGS) == 1
+    assert (
+        crawler.stats.get_value(
+            "spidermon/validation/types/testitem/fields/errors/missing_required_field"
+        )
+        == 1
+    )
+    assert (
+        crawler.stats.get_value(
+            "spidermon/validation/sampling/extrapolated/fields/errors"
+            "/missing_required_field"
+        )
+        == 2
+    )
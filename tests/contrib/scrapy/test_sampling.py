@@ -0,0 +1,205 @@
+from __future__ import absolute_import
+import pytest
+from scrapy import Item
+from scrapy.exceptions import DropItem, NotConfigured
+from scrapy.utils.test import get_crawler
+
+from spidermon.contrib.monitors.mixins.validation import ValidationInfo
+from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from spidermon.contrib.scrapy.sampling import AdaptiveItemSampler, ItemSampler
+from tests.fixtures.items import TestItem, TreeItem
+from tests.fixtures.validators import test_schema, tree_schema
+
+STATS_ITEMS = "spidermon/validation/items"
+STATS_SAMPLING_ITEMS = "spidermon/validation/sampling/items"
+STATS_EXTRAPOLATED = "spidermon/validation/sampling/extrapolated"
+STATS_MISSING_URL = "spidermon/validation/fields/errors/missing_required_field/url"
+STATS_ADAPTIVE = "spidermon/validation/sampling/adaptive"
+
+
+@pytest.mark.parametrize(
+    "value,expected_rates,expected_default_rate",
+    [
+        (0.5, {}, 0.5),
+        ("0.5", {}, 0.5),
+        ({TestItem: 0.1, "TreeItem": "0.2"}, {"TestItem": 0.1, "TreeItem": 0.2}, 1),
+    ],
+)
+def test_sampler_from_setting(value, expected_rates, expected_default_rate):
+    sampler = ItemSampler.from_setting(value)
+    assert sampler.rates == expected_rates
+    assert sampler.default_rate == expected_default_rate
+
+
+@pytest.mark.parametrize("value", [None, "", 1, {TestItem: 1}])
+def test_sampler_not_needed(value):
+    assert ItemSampler.from_setting(value) is None
+
+
+@pytest.mark.parametrize("value", [0, -1, 1.5, {TestItem: 0}])
+def test_invalid_sampling_rate(value):
+    with pytest.raises(NotConfigured):
+        ItemSampler.from_setting(value)
+
+
+def test_sampled_items_are_deterministic():
+    sampler = ItemSampler()
+    items = [{"url": "http://example.com/%d" % i, "n": i} for i in range(1000)]
+    sampled = [item for item in items if sampler.is_sampled(item, 0.1)]
+    assert 50 < len(sampled) < 150
+    sampled_in_reverse = [
+        item for item in reversed(items) if sampler.is_sampled(dict(item), 0.1)
+    ]
+    assert sampled == sampled_in_reverse[::-1]
+    # Items sampled with a lower rate are sampled with higher rates too
+    assert all(sampler.is_sampled(item, 0.5) for item in sampled)
+    assert all(sampler.is_sampled(item, 1) for item in items)
+
+
+def get_pipeline(**settings):
+    settings.setdefault(
+        "SPIDERMON_VALIDATION_SCHEMAS", {TestItem: test_schema, Item: tree_schema}
+    )
+    crawler = get_crawler(settings_dict=settings)
+    return ItemValidationPipeline.from_crawler(crawler), crawler.stats
+
+
+def test_pipeline_validates_sampled_items():
+    pipe, stats = get_pipeline(SPIDERMON_VALIDATION_SAMPLING_RATE=0.25)
+    items = [TestItem({"title": "%d" % i}) for i in range(400)]
+    for item in items:
+        pipe.process_item(item, None)
+
+    sampled = [item for item in items if pipe.sampler.is_sampled(dict(item), 0.25)]
+    assert stats.get_value(STATS_SAMPLING_ITEMS) == 400
+    assert stats.get_value(STATS_ITEMS) == len(sampled)
+    assert stats.get_value(STATS_MISSING_URL) == len(sampled)
+    assert stats.get_value(STATS_EXTRAPOLATED + "/items") == len(sampled) * 4
+    extrapolated_missing_url = STATS_MISSING_URL.replace(
+        "spidermon/validation", STATS_EXTRAPOLATED
+    )
+    assert stats.get_value(extrapolated_missing_url) == len(sampled) * 4
+
+    # Percentages are computed from the validated items
+    validation = ValidationInfo(stats.get_stats())
+    assert validation.items.count == len(sampled)
+    assert validation.fields["url"].errors["missing_required_field"].percent == 1
+
+
+def test_pipeline_sampling_rate_per_item_type():
+    pipe, stats = get_pipeline(
+        SPIDERMON_VALIDATION_SAMPLING_RATE={TestItem: 0.5},
+        SPIDERMON_VALIDATION_ADD_ERRORS_TO_ITEMS=True,
+    )
+    test_items = [TestItem({"title": "%d" % i}) for i in range(100)]
+    tree_items = [TreeItem({"child": "%d" % i}) for i in range(100)]
+    for item in test_items + tree_items:
+        pipe.process_item(item, None)
+
+    sampled = [item for item in test_items if "_validation" in item]
+    assert 0 < len(sampled) < 100
+    assert all("_validation" in item for item in tree_items)
+    assert stats.get_value(STATS_ITEMS) == len(sampled) + 100
+    assert stats.get_value(STATS_EXTRAPOLATED + "/items") == len(sampled) * 2 + 100
+
+
+def test_pipeline_drops_only_sampled_items():
+    pipe, stats = get_pipeline(
+        SPIDERMON_VALIDATION_SAMPLING_RATE=0.5,
+        SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS=True,
+    )
+    dropped = 0
+    for i in range(100):
+        try:
+            pipe.process_item(TestItem({"title": "%d" % i}), None)
+        except DropItem:
+            dropped += 1
+    assert 0 < dropped < 100
+    assert stats.get_value("spidermon/validation/items/dropped") == dropped
+
+
+def observe_window(sampler, window, fields_with_errors, items_with_errors):
+    decisions = [
+        sampler.observe("TestItem", fields_with_errors if i < items_with_errors else [])
+        for i in range(window)
+    ]
+    assert all(decision is None for decision in decisions[:-1])
+    return decisions[-1]
+
+
+def test_adaptive_sampler_backs_off_while_errors_are_stable():
+    sampler = AdaptiveItemSampler(min_rate=0.1, window=100, tolerance=0.05)
+    assert sampler.get_rate("TestItem") == 1
+    rates = []
+    for _ in range(5):
+        decision = observe_window(sampler, 100, ["url"], 10)
+        assert decision.spiked_fields == []
+        rates.append(decision.rate)
+    assert rates == [0.5, 0.25, 0.125, 0.1, 0.1]
+    assert sampler.get_rate("TestItem") == 0.1
+    assert sampler.get_rate("OtherItem") == 1
+
+
+def test_adaptive_sampler_validates_all_items_on_error_spikes():
+    sampler = AdaptiveItemSampler(min_rate=0.1, window=100, tolerance=0.05)
+    for _ in range(3):
+        observe_window(sampler, 100, ["url"], 10)
+    assert sampler.get_rate("TestItem") == 0.125
+
+    # Small changes in the error rates are tolerated
+    assert observe_window(sampler, 100, ["url"], 14).spiked_fields == []
+    decision = observe_window(sampler, 100, ["url", "title"], 30)
+    assert decision == ("TestItem", 1, ["title", "url"])
+    assert sampler.get_rate("TestItem") == 1
+
+    # The new error rates are the reference from now on
+    assert observe_window(sampler, 100, ["url", "title"], 30).rate == 0.5
+
+
+@pytest.mark.parametrize("kwargs", [{"min_rate": 0}, {"min_rate": 1.5}, {"window": 0}])
+def test_invalid_adaptive_sampler(kwargs):
+    with pytest.raises(NotConfigured):
+        AdaptiveItemSampler(**kwargs)
+
+
+def test_adaptive_sampling_with_fixed_rate():
+    with pytest.raises(NotConfigured):
+        get_pipeline(
+            SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING=True,
+            SPIDERMON_VALIDATION_SAMPLING_RATE=0.5,
+        )
+
+
+def test_pipeline_adaptive_sampling():
+    pipe, stats = get_pipeline(
+        SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING=True,
+        SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_WINDOW=50,
+        SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_MIN_RATE=0.25,
+    )
+    assert isinstance(pipe.sampler, AdaptiveItemSampler)
+    for i in range(1000):
+        pipe.process_item(TestItem({"title": "%d" % i, "url": "http://x/%d" % i}), None)
+    assert stats.get_value("spidermon/validation/sampling/rate/testitem") == 0.25
+    assert stats.get_value(STATS_ADAPTIVE + "/decreases") >= 2
+    assert stats.get_value(STATS_ADAPTIVE + "/resets") is None
+    validated = stats.get_value(STATS_ITEMS)
+    assert validated < 500
+
+    # Items without url start to be returned
+    for i in range(1000):
+        pipe.process_item(TestItem({"title": "%d" % i}), None)
+    assert stats.get_value(STATS_ADAPTIVE + "/resets") >= 1
+    assert stats.get_value(STATS_ADAPTIVE + "/resets/url") >= 1
+    assert stats.get_value(STATS_MISSING_URL) > 0
+
+
+def test_pipeline_adaptive_sampling_observes_dropped_items():
+    pipe, stats = get_pipeline(
+        SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING=True,
+        SPIDERMON_VALIDATION_ADAPTIVE_SAMPLING_WINDOW=10,
+        SPIDERMON_VALIDATION_DROP_ITEMS_WITH_ERRORS=True,
+    )
+    for i in range(10):
+        with pytest.raises(DropItem):
+            pipe.process_item(TestItem({"title": "%d" % i}), None)
+    assert stats.get_value("spidermon/validation/sampling/rate/testitem") == 0.5
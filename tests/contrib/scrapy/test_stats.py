@@ -0,0 +1,355 @@
+from __future__ import absolute_import
+from scrapy import Spider
+from scrapy.utils.test import get_crawler
+
+from spidermon.contrib.scrapy.pipelines import _MISSING, ItemValidationPipeline
+from spidermon.contrib.scrapy.stats import (
+    ValidationStatsManager,
+    BufferedValidationStatsManager,
+    get_validation_counters,
+)
+from tests.fixtures.items import TestItem
+from tests.fixtures.validators import test_schema
+
+STATS_FIELDS_ERRORS = "spidermon/validation/fields/errors"
+STATS_MISSING_URL = "spidermon/validation/fields/errors/missing_required_field/url"
+
+
+def test_field_error_stats():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats)
+    manager.add_field_error("url", "Missing required field")
+    manager.add_field_error("url", "Missing required field")
+    manager.add_field_error("child.url", "Invalid URL")
+    assert stats.get_stats() == {
+        STATS_FIELDS_ERRORS: 3,
+        "spidermon/validation/fields/errors/missing_required_field": 2,
+        STATS_MISSING_URL: 2,
+        "spidermon/validation/fields/errors/invalid_url": 1,
+        "spidermon/validation/fields/errors/invalid_url/child.url": 1,
+    }
+
+
+def test_stats_names_cache_is_bounded():
+    manager = ValidationStatsManager(get_crawler().stats, names_cache_size=2)
+    for i in range(10):
+        manager.add_field_error("field_%d" % i, "Invalid URL")
+    assert len(manager._field_error_names) == 2
+    assert len(manager._names) == 2
+
+
+def test_buffered_stats_are_written_on_flush():
+    stats = get_crawler().stats
+    manager = BufferedValidationStatsManager(stats)
+    manager.add_validator("item", "JSONSchema")
+    manager.add_item()
+    manager.add_field_error("url", "Missing required field")
+    manager.add_field_error("url", "Missing required field")
+    assert "spidermon/validation/validators" in stats.get_stats()
+    assert "spidermon/validation/items" not in stats.get_stats()
+
+    manager.flush()
+    assert stats.get_value("spidermon/validation/items") == 1
+    assert stats.get_value(STATS_FIELDS_ERRORS) == 2
+    assert stats.get_value(STATS_MISSING_URL) == 2
+
+    manager.add_item()
+    manager.flush()
+    manager.flush()
+    assert stats.get_value("spidermon/validation/items") == 2
+
+
+def test_pipeline_flushes_buffered_stats_when_spider_is_closed():
+    crawler = get_crawler(
+        settings_dict={
+            "SPIDERMON_VALIDATION_SCHEMAS": [test_schema],
+            "SPIDERMON_VALIDATION_STATS_FLUSH_INTERVAL": 60,
+        }
+    )
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    assert isinstance(pipe.stats, BufferedValidationStatsManager)
+
+    pipe.open_spider(None)
+    assert pipe.stats_flush_task.running
+    pipe.process_item(TestItem(), None)
+    assert STATS_MISSING_URL not in crawler.stats.get_stats()
+
+    pipe.close_spider(None)
+    assert not pipe.stats_flush_task.running
+    assert crawler.stats.get_value(STATS_MISSING_URL) == 1
+
+
+def test_field_errors_limit():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats, field_errors_limit=2)
+    for i in range(3):
+        manager.add_field_error("tags.%d" % i, "Invalid URL")
+        manager.add_field_error("sku", "'%d' is not valid" % i)
+    manager.add_field_error("url", "Missing required field")
+    manager.add_field_error("url", "Missing required field")
+    manager.add_field_error("name", "Missing required field")
+    # Only the total is written until the manager is closed
+    assert stats.get_stats() == {STATS_FIELDS_ERRORS: 9}
+    manager.close()
+    assert stats.get_stats() == {
+        STATS_FIELDS_ERRORS: 9,
+        "spidermon/validation/fields/errors/invalid_url": 3,
+        "spidermon/validation/fields/errors/invalid_url/tags.*": 3,
+        "spidermon/validation/fields/errors/missing_required_field": 2,
+        STATS_MISSING_URL: 2,
+        "spidermon/validation/fields/errors/other": 4,
+        "spidermon/validation/fields/errors/other/other": 4,
+    }
+    assert manager.other_field_errors.most_common(1)[0][1] == 1
+    assert manager.counters.field_errors == {
+        (None, "tags.*", "invalid_url"): 3,
+        (None, "url", "missing_required_field"): 2,
+        (None, "other", "other"): 4,
+    }
+
+
+def test_field_errors_limit_keeps_most_frequent_errors():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats, field_errors_limit=1)
+    for _ in range(2):
+        manager.add_field_error("name", "Missing required field")
+    for _ in range(1000):
+        manager.add_field_error("url", "Missing required field")
+    manager.close()
+    assert stats.get_value(STATS_MISSING_URL) == 1000
+    assert stats.get_value("spidermon/validation/fields/errors/other/other") == 2
+    assert stats.get_value(STATS_FIELDS_ERRORS) == 1002
+
+
+def test_field_errors_limit_writes_extrapolated_counts():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats, field_errors_limit=1)
+    manager.add_field_error("url", "Missing required field", sampling_rate=0.5)
+    manager.add_field_error("url", "Missing required field", sampling_rate=0.25)
+    manager.add_field_error("url", "Missing required field")
+    manager.add_field_error("name", "Missing required field", sampling_rate=0.5)
+    manager.close()
+    assert stats.get_value(STATS_MISSING_URL) == 3
+    assert stats.get_value(STATS_FIELDS_ERRORS) == 4
+    extrapolated = "spidermon/validation/sampling/extrapolated/fields/errors"
+    assert stats.get_value(extrapolated) == 8
+    assert stats.get_value(extrapolated + "/missing_required_field/url") == 6
+    assert stats.get_value(extrapolated + "/other/other") == 2
+
+
+def test_field_errors_limit_without_other_errors():
+    stats = get_crawler().stats
+    manager = BufferedValidationStatsManager(stats, field_errors_limit=2)
+    manager.add_field_error("url", "Missing required field", item_type="TestItem")
+    manager.add_field_error("name", "Missing required field", item_type="TestItem")
+    manager.add_field_error("name", "Missing required field", item_type="TestItem")
+    manager.close()
+    assert not [name for name in stats.get_stats() if "other" in name]
+    assert manager.counters.field_errors == {
+        ("testitem", "url", "missing_required_field"): 1,
+        ("testitem", "name", "missing_required_field"): 2,
+    }
+    assert len(manager.other_field_errors) == 0
+
+
+def test_pipeline_field_errors_limit():
+    crawler = get_crawler(
+        settings_dict={
+            "SPIDERMON_VALIDATION_SCHEMAS": [test_schema],
+            "SPIDERMON_VALIDATION_FIELD_ERRORS_LIMIT": 1,
+        }
+    )
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    pipe.open_spider(None)
+    pipe.process_item(TestItem(), None)
+    assert STATS_MISSING_URL not in crawler.stats.get_stats()
+
+    pipe.close_spider(Spider("test"))
+    assert crawler.stats.get_value(STATS_MISSING_URL) == 1
+    assert crawler.stats.get_value("spidermon/validation/fields/errors/other") is None
+
+
+def test_counters_by_item_type():
+    stats = get_crawler().stats
+    manager = BufferedValidationStatsManager(stats)
+    assert get_validation_counters(stats) is manager.counters
+    manager.add_item(item_type="TestItem")
+    manager.add_fields(2, item_type="TestItem")
+    manager.add_field_error("url", "Missing required field", item_type="TestItem")
+    manager.add_field_error("url", "Missing required field", item_type="TreeItem")
+    manager.add_item_with_errors(item_type="TestItem")
+    manager.add_dropped_item(item_type="TestItem")
+    counters = manager.counters
+    assert (counters.items, counters.items_with_errors, counters.items_dropped) == (
+        1,
+        1,
+        1,
+    )
+    assert counters.fields == 2
+    assert counters.field_errors == {
+        ("testitem", "url", "missing_required_field"): 1,
+        ("treeitem", "url", "missing_required_field"): 1,
+    }
+    assert sorted(counters.types) == ["testitem", "treeitem"]
+    assert counters.types["treeitem"].items == 0
+    assert counters.types["treeitem"].field_errors == {
+        ("treeitem", "url", "missing_required_field"): 1
+    }
+
+
+def test_no_stats_by_item_type_by_default():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats)
+    manager.add_item(item_type="TestItem")
+    manager.add_field_error("url", "Missing required field", item_type="TestItem")
+    assert stats.get_stats() == {
+        "spidermon/validation/items": 1,
+        STATS_FIELDS_ERRORS: 1,
+        "spidermon/validation/fields/errors/missing_required_field": 1,
+        STATS_MISSING_URL: 1,
+    }
+    counters = manager.counters.types["testitem"]
+    assert counters.items == 1
+    assert counters.field_errors == {("testitem", "url", "missing_required_field"): 1}
+
+
+def test_stats_by_item_type():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats, item_type_stats=True)
+    manager.add_item(item_type="TestItem")
+    manager.add_item(item_type="TreeItem", sampling_rate=0.5)
+    manager.add_fields(2, item_type="TestItem")
+    manager.add_field_error("url", "Missing required field", item_type="TestItem")
+    manager.add_item_with_errors(item_type="TestItem")
+    manager.add_dropped_item(item_type="TestItem")
+    assert stats.get_stats() == {
+        "spidermon/validation/items": 2,
+        "spidermon/validation/types/testitem/items": 1,
+        "spidermon/validation/types/treeitem/items": 1,
+        "spidermon/validation/sampling/extrapolated/items": 2,
+        "spidermon/validation/sampling/extrapolated/types/treeitem/items": 2,
+        "spidermon/validation/fields": 2,
+        "spidermon/validation/types/testitem/fields": 2,
+        STATS_FIELDS_ERRORS: 1,
+        "spidermon/validation/fields/errors/missing_required_field": 1,
+        STATS_MISSING_URL: 1,
+        "spidermon/validation/types/testitem/fields/errors": 1,
+        "spidermon/validation/types/testitem/fields/errors/missing_required_field": 1,
+        "spidermon/validation/types/testitem/fields/errors/missing_required_field/url": 1,
+        "spidermon/validation/items/errors": 1,
+        "spidermon/validation/types/testitem/items/errors": 1,
+        "spidermon/validation/items/dropped": 1,
+        "spidermon/validation/types/testitem/items/dropped": 1,
+    }
+
+
+def test_field_errors_limit_by_item_type():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats, field_errors_limit=1, item_type_stats=True)
+    manager.add_field_error("url", "Missing required field", item_type="TestItem")
+    manager.add_field_error("url", "Missing required field", item_type="TreeItem")
+    manager.add_field_error("title", "Missing required field", item_type="TreeItem")
+    manager.add_field_error("url", "Missing required field", item_type="TestItem")
+    manager.close()
+    # Counts of the pair in every item type are added up
+    assert stats.get_value(STATS_MISSING_URL) == 3
+    assert stats.get_value("spidermon/validation/fields/errors/other/other") == 1
+    assert stats.get_value(STATS_FIELDS_ERRORS) == 4
+    for item_type, errors, missing_url, other in [
+        ("testitem", 2, 2, None),
+        ("treeitem", 2, 1, 1),
+    ]:
+        prefix = "spidermon/validation/types/{}/fields/errors".format(item_type)
+        assert stats.get_value(prefix) == errors
+        assert stats.get_value(prefix + "/missing_required_field/url") == missing_url
+        assert stats.get_value(prefix + "/other/other") == other
+
+
+def test_error_samples():
+    stats = get_crawler().stats
+    manager = ValidationStatsManager(stats, error_samples_size=2)
+    for i in range(5):
+        manager.add_field_error(
+            "url",
+            "Missing required field",
+            item_type="TestItem",
+            get_sample=lambda i=i: i,
+        )
+    manager.add_field_error("title", "Invalid string", item_type="TestItem")
+    key = ("testitem", "url", "missing_required_field")
+    reservoir = manager.counters.error_samples[key]
+    assert reservoir.count == 5
+    assert len(reservoir.samples) == 2
+    assert set(reservoir.samples) <= set(range(5))
+    # Errors without samples do not get a reservoir
+    assert list(manager.counters.error_samples) == [key]
+    assert manager.counters.types["testitem"].error_samples[key] is reservoir
+
+
+def test_error_samples_are_not_kept_by_default():
+    manager = ValidationStatsManager(get_crawler().stats)
+    manager.add_field_error("url", "Missing required field", get_sample=lambda: 1)
+    assert manager.counters.error_samples == {}
+
+
+def test_error_samples_with_field_errors_limit():
+    manager = ValidationStatsManager(
+        get_crawler().stats, field_errors_limit=1, error_samples_size=2
+    )
+    manager.add_field_error("name", "Missing required field", get_sample=lambda: 0)
+    for i in range(1, 4):
+        manager.add_field_error("url", "Missing required field", get_sample=lambda: i)
+    manager.add_field_error(
+        "title", "Missing required field", item_type="TestItem", get_sample=lambda: 4
+    )
+    manager.close()
+    # Samples are kept with the stats the errors were counted in
+    error_samples = manager.counters.error_samples
+    assert set(error_samples) == {
+        (None, "url", "missing_required_field"),
+        (None, "other", "other"),
+        ("testitem", "other", "other"),
+    }
+    url_samples = error_samples[(None, "url", "missing_required_field")]
+    assert url_samples.count == 3
+    assert len(url_samples.samples) == 2
+    assert set(url_samples.samples) <= {1, 2, 3}
+    assert error_samples[(None, "other", "other")].samples == [0]
+    other_samples = manager.counters.types["testitem"].error_samples
+    assert other_samples == {
+        ("testitem", "other", "other"): error_samples[("testitem", "other", "other")]
+    }
+    assert other_samples[("testitem", "other", "other")].samples == [4]
+
+    # Closing again does not change them
+    manager.close()
+    assert manager.counters.error_samples == error_samples
+
+
+def test_pipeline_error_samples():
+    crawler = get_crawler(
+        settings_dict={
+            "SPIDERMON_VALIDATION_SCHEMAS": {TestItem: test_schema},
+            "SPIDERMON_VALIDATION_ERROR_SAMPLES": 1,
+            "SPIDERMON_VALIDATION_ERROR_SAMPLES_MAX_LENGTH": 20,
+        }
+    )
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    pipe.process_item(TestItem(title="a" * 100), None)
+    pipe.process_item(TestItem(url="http://example.com", title=1), None)
+    error_samples = get_validation_counters(crawler.stats).error_samples
+    missing_url = error_samples[("testitem", "url", "missing_required_field")]
+    assert missing_url.samples == [
+        {
+            "field": "url",
+            "error": "Missing required field",
+            "value": None,
+            "item": '{"title": "aaaaaa...',
+        }
+    ]
+    invalid_title = error_samples[("testitem", "title", "invalid_string")]
+    assert invalid_title.samples[0]["value"] == "1"
+    data = {"images": [{"url": 1}], "a.b": 2}
+    assert pipe._get_field_value(data, "images.0.url") == 1
+    assert pipe._get_field_value(data, "a.b") == 2
+    assert pipe._get_field_value(data, "images.1.url") is _MISSING
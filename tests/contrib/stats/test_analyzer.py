@@ -0,0 +1,105 @@
+import re
+
+import pytest
+
+from spidermon.contrib.stats.analyzer import StatsAnalyzer
+
+STATS = {
+    "downloader/response_count": 10,
+    "downloader/response_status_count/200": 8,
+    "downloader/response_status_count/404": 2,
+    "spidermon/validation/items": 5,
+    "spidermon/validation/items/errors": 2,
+    "spidermon/validation/fields": 20,
+    "spidermon/validation/fields/errors": 3,
+    "spidermon/validation/fields/errors/missing_required_field": 2,
+    "spidermon/validation/fields/errors/missing_required_field/url": 1,
+    "spidermon/validation/fields/errors/missing_required_field/child.url": 1,
+    "spidermon/validation/fields/errors/invalid_url": 1,
+    "spidermon/validation/fields/errors/invalid_url/url": 1,
+    "spidermon/validation/fields/errors/invalid_url/a/b": 1,
+    "spidermon/validation/fields/errors/invalid_url/": 1,
+    "spidermon/validation/fields_other": 1,
+}
+
+
+def naive_search(stats, pattern, include_matches=False):
+    pattern = re.compile(pattern)
+    results = {}
+    for key, count in stats.items():
+        match = pattern.match(key)
+        if match:
+            if include_matches:
+                results[key] = (count, match.group(1) if match.groups() else "")
+            else:
+                results[key] = count
+    return results
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "downloader/response_count$",
+        r"downloader/response_status_count/(2\d{2})$",
+        "downloader/response_status_count/([^/]+)$",
+        "spidermon/validation/items$",
+        "spidermon/validation/fields",
+        "spidermon/validation/fields$",
+        "spidermon/validation/fields/errors/([^/]+)$",
+        "spidermon/validation/fields/errors/invalid_url/([^/]+)$",
+        "spidermon/validation/fields?/errors",
+        "spidermon/validation/(items|fields)$",
+        "downloader|spidermon",
+        "nothing/here$",
+        "nothing/here",
+        ".*",
+        "",
+    ],
+)
+def test_search_matches_naive_search(pattern):
+    analyzer = StatsAnalyzer(STATS)
+    for include_matches in [False, True]:
+        results = analyzer.search(pattern, include_matches=include_matches)
+        expected = naive_search(STATS, pattern, include_matches=include_matches)
+        assert results == expected
+        assert list(results) == list(expected)
+
+
+def test_search_with_prefix():
+    analyzer = StatsAnalyzer(STATS, prefix="spidermon/validation")
+    assert analyzer.search("items$") == {"spidermon/validation/items": 5}
+    assert analyzer.search("items/errors$") == {"spidermon/validation/items/errors": 2}
+
+
+def test_children():
+    analyzer = StatsAnalyzer(STATS, prefix="spidermon/validation")
+    assert analyzer.children("fields/errors") == [
+        ("missing_required_field", 2),
+        ("invalid_url", 1),
+    ]
+    assert analyzer.children("fields/errors/invalid_url") == [("url", 1)]
+    assert analyzer.children("fields/errors/unknown") == []
+
+
+def test_child_shares_sorted_keys():
+    analyzer = StatsAnalyzer(STATS, prefix="spidermon")
+    assert analyzer.get_child("validation")._sorted_keys is None
+    assert analyzer.search("validation/items$")
+    child = analyzer.get_child("validation")
+    assert child.prefix == "spidermon/validation"
+    assert child._sorted_keys is analyzer._sorted_keys
+    assert child.children("fields/errors") == [
+        ("missing_required_field", 2),
+        ("invalid_url", 1),
+    ]
+
+
+def test_search_finds_stats_added_after_first_search():
+    stats = dict(STATS)
+    analyzer = StatsAnalyzer(stats, prefix="spidermon/validation")
+    assert analyzer.search("items$") == {"spidermon/validation/items": 5}
+    stats["spidermon/validation/items/dropped"] = 1
+    assert analyzer.search("items/dropped$") == {
+        "spidermon/validation/items/dropped": 1
+    }
+    assert analyzer.children("items") == [("errors", 2), ("dropped", 1)]
@@ -0,0 +1,172 @@
+from __future__ import absolute_import
+import copy
+import pickle
+
+import pytest
+from scrapy.utils.test import get_crawler
+
+from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from spidermon.contrib.validation import (
+    ColumnarJSONSchemaValidator,
+    CompiledJSONSchemaValidator,
+    JSONSchemaValidator,
+)
+from spidermon.contrib.validation.jsonschema.registry import SchemaRegistry
+from tests.fixtures.items import TestItem, TreeItem
+
+DEFINITIONS = {
+    "price": {"type": "number", "minimum": 0},
+    "image": {
+        "type": "object",
+        "properties": {"url": {"type": "string", "format": "uri"}},
+        "required": ["url"],
+    },
+}
+
+
+def get_schema(**properties):
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema",
+        "definitions": copy.deepcopy(DEFINITIONS),
+        "type": "object",
+        "properties": dict(
+            {
+                "price": {"$ref": "#/definitions/price"},
+                "images": {"type": "array", "items": {"$ref": "#/definitions/image"}},
+            },
+            **properties
+        ),
+    }
+
+
+def test_intern_shares_equal_values():
+    registry = SchemaRegistry()
+    first = get_schema(name={"type": "string"})
+    second = get_schema(title={"type": "string"})
+    interned_first = registry.intern(first)
+    interned_second = registry.intern(second)
+
+    assert interned_first == first
+    assert interned_second == second
+    assert interned_first["definitions"] is interned_second["definitions"]
+    assert interned_first["properties"] is not interned_second["properties"]
+    assert (
+        interned_first["properties"]["name"] is interned_second["properties"]["title"]
+    )
+    assert registry.intern(get_schema(name={"type": "string"})) is interned_first
+    # Given schemas are not changed
+    assert first["definitions"] is not second["definitions"]
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        ({"enum": [1]}, {"enum": [True]}),
+        ({"enum": [1]}, {"enum": [1.0]}),
+        ({"enum": [[1]]}, {"enum": [(1,)]}),
+        ({"minimum": 0, "type": "number"}, {"type": "number", "minimum": 0}),
+    ],
+)
+def test_intern_keeps_types_and_order(first, second):
+    registry = SchemaRegistry()
+    interned_first = registry.intern(first)
+    interned_second = registry.intern(second)
+    assert interned_first is not interned_second
+    assert repr(interned_first) == repr(first)
+    assert repr(interned_second) == repr(second)
+
+
+@pytest.mark.parametrize(
+    "validator_class",
+    [JSONSchemaValidator, CompiledJSONSchemaValidator, ColumnarJSONSchemaValidator],
+)
+def test_validators_share_built_validators(validator_class):
+    if not getattr(validator_class, "available", True):
+        pytest.skip("numpy is not installed")
+    registry = SchemaRegistry()
+    first = validator_class(get_schema(), registry=registry)
+    second = validator_class(get_schema(), registry=registry)
+    other = validator_class(get_schema(name={"type": "string"}), registry=registry)
+    assert first._validator is second._validator
+    assert first._validator is not other._validator
+    assert JSONSchemaValidator(get_schema(), registry=registry)._validator is (
+        JSONSchemaValidator(get_schema(), registry=registry)._validator
+    )
+
+
+def test_compiled_validators_share_functions():
+    registry = SchemaRegistry()
+    first = CompiledJSONSchemaValidator(
+        get_schema(name={"type": "string"}), registry=registry
+    )
+    second = CompiledJSONSchemaValidator(
+        get_schema(title={"type": "string"}), registry=registry
+    )
+    alone = CompiledJSONSchemaValidator(get_schema(title={"type": "string"}))
+    # Only the sub-schemas with references are compiled again
+    assert second._validator.source.count("def ") < (
+        alone._validator.source.count("def ")
+    )
+    data = {
+        "name": 1,
+        "title": 2,
+        "price": -1,
+        "images": [{"url": "/a"}, {}],
+    }
+    for validator, schema in [
+        (first, get_schema(name={"type": "string"})),
+        (second, get_schema(title={"type": "string"})),
+    ]:
+        expected = JSONSchemaValidator(schema).validate(data)
+        assert expected[0] is False
+        assert validator.validate(data) == expected
+
+
+def test_compiled_references_resolved_in_their_schema():
+    registry = SchemaRegistry()
+    string_schema = {
+        "definitions": {"value": {"type": "string"}},
+        "properties": {"value": {"$ref": "#/definitions/value"}},
+    }
+    number_schema = {
+        "definitions": {"value": {"type": "number"}},
+        "properties": {"value": {"$ref": "#/definitions/value"}},
+    }
+    string_validator = CompiledJSONSchemaValidator(string_schema, registry=registry)
+    number_validator = CompiledJSONSchemaValidator(number_schema, registry=registry)
+    assert string_validator.validate({"value": "a"}) == (True, {})
+    assert number_validator.validate({"value": 1}) == (True, {})
+    assert number_validator.validate({"value": "a"})[0] is False
+    assert string_validator.validate({"value": 1})[0] is False
+
+
+def test_pickled_validators_share_registry():
+    registry = SchemaRegistry()
+    validators = [
+        CompiledJSONSchemaValidator(get_schema(), registry=registry),
+        CompiledJSONSchemaValidator(get_schema(), registry=registry),
+    ]
+    first, second = pickle.loads(pickle.dumps(validators))
+    assert first._registry is second._registry
+    assert first._registry is not registry
+    assert first._validator is second._validator
+    assert first.validate({"price": -1}) == validators[0].validate({"price": -1})
+
+
+def test_pipeline_validators_share_schemas():
+    settings = {
+        "SPIDERMON_VALIDATION_SCHEMAS": {
+            TestItem: get_schema(),
+            TreeItem: [get_schema(), get_schema(name={"type": "string"})],
+        },
+        "SPIDERMON_VALIDATION_JSONSCHEMA_BACKEND": "compiled",
+    }
+    crawler = get_crawler(settings_dict=settings)
+    pipe = ItemValidationPipeline.from_crawler(crawler)
+    test_validator = pipe.validators["TestItem"][0]
+    tree_validators = pipe.validators["TreeItem"]
+    assert test_validator._validator is tree_validators[0]._validator
+    assert (
+        test_validator._schema["definitions"]
+        is tree_validators[1]._schema["definitions"]
+    )
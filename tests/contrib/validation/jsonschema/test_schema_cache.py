@@ -0,0 +1,211 @@
+from __future__ import absolute_import
+import json
+import os
+import threading
+import time
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.test import get_crawler
+from six.moves import BaseHTTPServer, socketserver
+
+from spidermon.contrib.scrapy.pipelines import ItemValidationPipeline
+from spidermon.contrib.validation.jsonschema.cache import SchemaCache
+from spidermon.contrib.validation.jsonschema.tools import get_schemas_from
+
+SCHEMA = {"type": "object", "required": ["url"]}
+LAST_MODIFIED = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+class SchemaServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Local stand-in of a schema host. ``schemas`` maps paths with their
+    ``(body, headers)``, and every request is kept in ``requests``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", 0), SchemaHandler)
+        self.schemas = {}
+        self.requests = []
+        self.delay = 0
+        self.status = None
+
+    def url(self, path):
+        return "http://127.0.0.1:{}{}".format(self.server_address[1], path)
+
+
+class SchemaHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers.items())))
+        if server.delay:
+            time.sleep(server.delay)
+        if server.status is not None or self.path not in server.schemas:
+            self.send_response(server.status or 404)
+            self.end_headers()
+            return
+        body, headers = server.schemas[self.path]
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        last_modified = headers.get("Last-Modified")
+        if last_modified and self.headers.get("If-Modified-Since") == last_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = SchemaServer()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return SchemaCache(str(tmpdir))
+
+
+def test_schema_cache_revalidates_with_etag(server, cache, tmpdir):
+    server.schemas["/schema.json"] = (json.dumps(SCHEMA), {"ETag": '"v1"'})
+    url = server.url("/schema.json")
+
+    assert json.loads(cache.get_contents(url)) == SCHEMA
+    assert json.loads(cache.get_contents(url)) == SCHEMA
+    assert [headers.get("If-None-Match") for _, headers in server.requests] == [
+        None,
+        '"v1"',
+    ]
+    assert len(os.listdir(str(tmpdir.join("contents")))) == 1
+
+    # Contents are downloaded again once they change
+    server.schemas["/schema.json"] = ('{"type": "array"}', {"ETag": '"v2"'})
+    assert cache.get_contents(url) == '{"type": "array"}'
+    assert cache.get_contents(url) == '{"type": "array"}'
+    assert server.requests[-1][1].get("If-None-Match") == '"v2"'
+    assert len(os.listdir(str(tmpdir.join("contents")))) == 2
+
+
+def test_schema_cache_revalidates_with_last_modified(server, cache):
+    server.schemas["/schema.json"] = (
+        json.dumps(SCHEMA),
+        {"Last-Modified": LAST_MODIFIED},
+    )
+    url = server.url("/schema.json")
+    for _ in range(2):
+        assert json.loads(cache.get_contents(url)) == SCHEMA
+    assert server.requests[-1][1].get("If-Modified-Since") == LAST_MODIFIED
+
+
+def test_schema_cache_shares_contents_between_urls(server, cache, tmpdir):
+    for path in ["/a.json", "/b.json"]:
+        server.schemas[path] = (json.dumps(SCHEMA), {})
+        assert json.loads(cache.get_contents(server.url(path))) == SCHEMA
+    assert len(os.listdir(str(tmpdir.join("urls")))) == 2
+    assert len(os.listdir(str(tmpdir.join("contents")))) == 1
+
+
+@pytest.mark.parametrize("status", [500, 404])
+def test_schema_cache_uses_cached_contents_on_errors(server, cache, caplog, status):
+    server.schemas["/schema.json"] = (json.dumps(SCHEMA), {"ETag": '"v1"'})
+    url = server.url("/schema.json")
+    cache.get_contents(url)
+
+    server.status = status
+    assert json.loads(cache.get_contents(url)) == SCHEMA
+    assert "using the cached schema" in caplog.text
+    assert cache.get_contents(server.url("/other.json")) is None
+    assert "Failed to get '{}'".format(server.url("/other.json")) in caplog.text
+
+
+def test_schema_cache_timeout(server, cache):
+    server.schemas["/schema.json"] = (json.dumps(SCHEMA), {})
+    url = server.url("/schema.json")
+    cache.get_contents(url)
+
+    server.delay = 2
+    start = time.time()
+    assert json.loads(cache.get_contents(url, timeout=0.2)) == SCHEMA
+    assert time.time() - start < 1.5
+
+
+def test_schema_cache_offline(server, tmpdir, caplog):
+    server.schemas["/schema.json"] = (json.dumps(SCHEMA), {})
+    url = server.url("/schema.json")
+    SchemaCache(str(tmpdir)).get_contents(url)
+
+    cache = SchemaCache(str(tmpdir), offline=True)
+    assert json.loads(cache.get_contents(url)) == SCHEMA
+    assert cache.get_contents(server.url("/other.json")) is None
+    assert "is not in the schema cache" in caplog.text
+    assert len(server.requests) == 1
+
+
+def test_schema_cache_ignores_corrupted_contents(server, cache, tmpdir):
+    server.schemas["/schema.json"] = (json.dumps(SCHEMA), {"ETag": '"v1"'})
+    url = server.url("/schema.json")
+    cache.get_contents(url)
+    contents_dir = tmpdir.join("contents")
+    contents_dir.join(os.listdir(str(contents_dir))[0]).write("{")
+
+    assert json.loads(cache.get_contents(url)) == SCHEMA
+    # Nothing valid was cached, so the request was not conditional
+    assert server.requests[-1][1].get("If-None-Match") is None
+    assert json.loads(cache.get_contents(url)) == SCHEMA
+    assert server.requests[-1][1].get("If-None-Match") == '"v1"'
+
+
+def test_get_schemas_from_fetches_urls_in_parallel(server):
+    paths = ["/{}.json".format(i) for i in range(4)]
+    for path in paths:
+        server.schemas[path] = (json.dumps(dict(SCHEMA, title=path)), {})
+    server.delay = 0.5
+    urls = [server.url(path) for path in paths]
+
+    start = time.time()
+    schemas = get_schemas_from(urls + ["tests.fixtures.validators.test_schema"])
+    assert time.time() - start < 1.5
+    for path, url in zip(paths, urls):
+        assert schemas[url]["title"] == path
+    assert schemas["tests.fixtures.validators.test_schema"]["required"] == ["url"]
+
+
+def test_pipeline_loads_schemas_from_cache(server, tmpdir):
+    server.schemas["/schema.json"] = (json.dumps(SCHEMA), {"ETag": '"v1"'})
+    settings = {
+        "SPIDERMON_VALIDATION_SCHEMAS": [server.url("/schema.json")],
+        "SPIDERMON_VALIDATION_SCHEMAS_CACHE_DIR": str(tmpdir),
+    }
+    for offline in [False, False, True]:
+        settings["SPIDERMON_VALIDATION_SCHEMAS_OFFLINE"] = offline
+        pipe = ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
+        assert pipe.validators["Item"][0]._schema == SCHEMA
+    # The offline crawler does not request the schema
+    assert len(server.requests) == 2
+    assert server.requests[1][1].get("If-None-Match") == '"v1"'
+
+
+def test_pipeline_offline_requires_cache_dir():
+    settings = {
+        "SPIDERMON_VALIDATION_SCHEMAS": ["https://example.com/schema.json"],
+        "SPIDERMON_VALIDATION_SCHEMAS_OFFLINE": True,
+    }
+    with pytest.raises(NotConfigured):
+        ItemValidationPipeline.from_crawler(get_crawler(settings_dict=settings))
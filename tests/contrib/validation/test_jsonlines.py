@@ -0,0 +1,80 @@
+from __future__ import absolute_import
+import gzip
+import json
+
+import pytest
+
+from spidermon.contrib.validation import JSONSchemaValidator
+from spidermon.contrib.validation.jsonlines import (
+    get_chunks,
+    read_lines,
+    validate_files,
+)
+from tests.fixtures.validators import test_schema
+
+ITEMS = [{"url": "http://example.com/{}".format(i), "title": "Item"} for i in range(50)]
+ITEMS[3] = {"title": 3}
+ITEMS[20] = {"url": 20}
+
+
+def write_items(path, items, compress=False):
+    data = "".join(json.dumps(item) + "\n" for item in items).encode("utf-8")
+    with (gzip.open if compress else open)(str(path), "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 100, 1024 * 1024])
+def test_chunks_have_whole_lines(tmpdir, compress, chunk_size):
+    name = "items.jl.gz" if compress else "items.jl"
+    path = write_items(tmpdir.join(name), ITEMS, compress)
+    chunks = list(get_chunks(path, chunk_size))
+    lines = [line for chunk in chunks for line in read_lines(chunk)]
+    assert [json.loads(line.decode("utf-8")) for line in lines] == ITEMS
+    if chunk_size == 1:
+        assert len(chunks) == len(ITEMS)
+
+
+def test_chunks_of_empty_files(tmpdir):
+    assert list(get_chunks(write_items(tmpdir.join("items.jl"), []))) == []
+
+
+def test_chunks_without_trailing_newline(tmpdir):
+    path = tmpdir.join("items.jl")
+    path.write(b'{"a": 1}\n\n{"a": 2}', mode="wb")
+    lines = [line for chunk in get_chunks(str(path), 4) for line in read_lines(chunk)]
+    assert lines == [b'{"a": 1}', b"", b'{"a": 2}']
+
+
+@pytest.mark.parametrize("workers,backend", [(0, None), (2, "thread"), (2, "process")])
+def test_validate_files(tmpdir, workers, backend):
+    paths = [
+        write_items(tmpdir.join("items.jl"), ITEMS[:25]),
+        write_items(tmpdir.join("items.jl.gz"), ITEMS[25:], compress=True),
+    ]
+    validators = {"Item": [JSONSchemaValidator(test_schema)]}
+    results = list(
+        validate_files(
+            paths, validators, "Item", workers=workers, chunk_size=64, backend=backend
+        )
+    )
+    assert [fields_count for fields_count, _ in results] == [len(i) for i in ITEMS]
+    errors = [
+        (i, errors)
+        for i, (_, item_results) in enumerate(results)
+        for ok, errors in item_results
+        if not ok
+    ]
+    assert errors == [
+        (3, {"url": ["Missing required field"], "title": ["Invalid string"]}),
+        (20, {"url": ["Invalid string"]}),
+    ]
+
+
+def test_validate_files_requires_objects(tmpdir):
+    path = tmpdir.join("items.jl")
+    path.write('{"url": "http://example.com"}\n[1, 2]\n')
+    validators = {"Item": [JSONSchemaValidator(test_schema)]}
+    with pytest.raises(ValueError):
+        list(validate_files([str(path)], validators, "Item"))
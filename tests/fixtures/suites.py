@@ -1,5 +1,6 @@
 from __future__ import absolute_import
-from spidermon import MonitorSuite
+from spidermon import Monitor, MonitorSuite
+from spidermon.contrib.monitors.mixins import ValidationMonitorMixin
 
 
 from .cases import *
@@ -23,3 +24,16 @@ class Suite03(MonitorSuite):
 
 class Suite04(MonitorSuite):
     monitors = [Suite01, Suite02, Monitor01, Monitor02]
+
+
+class ValidationStatsMonitor(Monitor, ValidationMonitorMixin):
+    results = []
+
+    def test_validation_stats(self):
+        self.results.append(
+            (self.validation.items.count, self.validation.items.errors.count)
+        )
+
+
+class ValidationStatsSuite(MonitorSuite):
+    monitors = [ValidationStatsMonitor]
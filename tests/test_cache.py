@@ -0,0 +1,60 @@
+from spidermon.utils.cache import LRUCache, memoize
+
+
+def test_lru_cache_discards_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_lru_cache_counters():
+    cache = LRUCache()
+    assert cache.get("a") is None
+    cache.set("a", None)
+    assert cache.get("a", default=0) is None
+    assert cache.get("b", default=0) == 0
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.info() == (1, 2, 1024, 1)
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_memoize_keeps_results_in_use():
+    calls = []
+
+    @memoize(maxsize=2, min_hit_rate=0)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    assert [double(v) for v in [1, 2, 1, 3, 1, 4, 1]] == [2, 4, 2, 6, 2, 8, 2]
+    # 1 is kept in every generation because it is used again
+    assert calls == [1, 2, 3, 4]
+    double.cache_clear()
+    assert double(1) == 2
+    assert calls == [1, 2, 3, 4, 1]
+
+
+def test_memoize_stops_when_results_are_not_found_again():
+    calls = []
+
+    @memoize(maxsize=4, min_hit_rate=0.5)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    # Only 1 of the first 4 calls finds a kept result
+    assert [double(v) for v in [1, 2, 3, 1]] == [2, 4, 6, 2]
+    assert [double(v) for v in [1, 1]] == [2, 2]
+    assert calls == [1, 2, 3, 1, 1]
+
+    # Results are kept again after clearing them
+    double.cache_clear()
+    assert [double(v) for v in [1, 1]] == [2, 2]
+    assert calls == [1, 2, 3, 1, 1, 1]
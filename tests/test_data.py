@@ -1,4 +1,9 @@
 from __future__ import absolute_import
+
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
 import pytest
 
 from spidermon.data import Data
@@ -51,3 +56,11 @@ def test_update(data):
 def test_setdefault(data):
     with pytest.raises(InvalidDataOperation):
         data.setdefault("another_value", 0)
+
+
+def test_get_view(data):
+    factory = mock.Mock(side_effect=lambda data: data.item_scraped_count * 2)
+    assert data.get_view("double", factory) == 300
+    assert data.get_view("double", factory) == 300
+    factory.assert_called_once_with(data)
+    assert "_views" not in data
@@ -2,6 +2,10 @@ from __future__ import absolute_import
 import pytest
 
 from spidermon.python import Interpreter
+from spidermon.python.factory import (
+    PythonExpressionsMonitor,
+    create_monitor_class_from_dict,
+)
 from spidermon.exceptions import InvalidExpression
 from spidermon.data import Data
 
@@ -37,3 +41,64 @@ def test_evaluated_expressions(interpreter):
         assert result == interpreter.eval(
             expression, data
         ), 'Expression fails: "%s" != %s' % (expression, result)
+
+
+def test_compiled_expressions(interpreter):
+    data = Data({"stats": Data(STATS_TO_EVALUATE)})
+    for expression, result in EXPRESSIONS_TO_EVALUATE:
+        assert result == interpreter.eval(
+            interpreter.compile(expression), data
+        ), 'Expression fails: "%s" != %s' % (expression, result)
+
+
+def test_invalid_compiled_expressions(interpreter):
+    for expression in SYNTAXERROR_EXPRESSIONS:
+        with pytest.raises(SyntaxError):
+            interpreter.compile(expression)
+    for expression in INVALID_EXPRESSIONS:
+        with pytest.raises(InvalidExpression):
+            interpreter.compile(expression)
+
+
+def test_code_objects_are_checked(interpreter):
+    code = compile("__import__('os')", "<string>", "eval")
+    with pytest.raises(InvalidExpression):
+        interpreter.eval(code, {})
+
+
+def test_expression_monitors_are_compiled_once(mocker):
+    class StatsExpressionsMonitor(PythonExpressionsMonitor):
+        def get_context_data(self):
+            return {"stats": Data(STATS_TO_EVALUATE)}
+
+    def get_test_methods(monitor_class):
+        return [m for m in dir(monitor_class) if m.startswith("test_")]
+
+    compile_spy = mocker.spy(Interpreter, "compile")
+    check_spy = mocker.spy(Interpreter, "check")
+    monitor_class = create_monitor_class_from_dict(
+        {
+            "tests": [
+                {"expression": expression}
+                for expression, result in EXPRESSIONS_TO_EVALUATE
+                if result
+            ]
+        },
+        monitor_class=StatsExpressionsMonitor,
+    )
+    methods = get_test_methods(monitor_class)
+    assert compile_spy.call_count == len(methods)
+    for _ in range(2):
+        for method in methods:
+            getattr(monitor_class(method), method)()
+    assert compile_spy.call_count == len(methods)
+    assert check_spy.call_count == 0
+
+    # Invalid expressions fail when the test is run
+    monitor_class = create_monitor_class_from_dict(
+        {"tests": [{"expression": "lambda x: x"}]},
+        monitor_class=StatsExpressionsMonitor,
+    )
+    (method,) = get_test_methods(monitor_class)
+    with pytest.raises(InvalidExpression):
+        getattr(monitor_class(method), method)()
@@ -6,6 +6,7 @@ import pytest
 
 from scrapy import signals
 from spidermon.contrib.scrapy.extensions import Spidermon
+from spidermon.contrib.scrapy.runners import SpiderMonitorRunner
 
 
 @pytest.fixture
@@ -74,3 +75,42 @@ def test_engine_stopped_suites_should_run_from_signal(get_crawler, suites):
     spidermon.engine_stopped_suites[0].run = mock.MagicMock()
     crawler.signals.send_catch_log(signal=signals.engine_stopped, spider=crawler.spider)
     spidermon.engine_stopped_suites[0].run.assert_called_once_with(mock.ANY)
+
+
+def test_suites_share_stats_data(get_crawler, suites):
+    """Stats are copied once for all the suites run for the same signal"""
+    crawler = get_crawler()
+    spidermon = Spidermon(crawler, spider_opened_suites=suites * 2)
+    for suite in spidermon.spider_opened_suites:
+        suite.run = mock.MagicMock()
+    spidermon.spider_opened(crawler.spider)
+    first, second = [
+        suite.all_monitors[0].data for suite in spidermon.spider_opened_suites
+    ]
+    assert first is not second
+    assert first.stats is second.stats
+
+
+def test_periodic_suites_are_loaded_once(get_crawler, suites):
+    """Periodic suites are loaded when the spider is opened and run on every call"""
+    crawler = get_crawler()
+    spidermon = Spidermon(crawler, periodic_suites={suites[0]: 60})
+    with mock.patch.object(
+        spidermon, "load_suite", wraps=spidermon.load_suite
+    ) as load_suite:
+        spidermon.spider_opened(crawler.spider)
+        (task,) = spidermon.periodic_tasks[crawler.spider]
+        results = []
+        run = SpiderMonitorRunner.run
+        with mock.patch(
+            "spidermon.contrib.scrapy.extensions.SpiderMonitorRunner.run",
+            autospec=True,
+            side_effect=lambda runner, suite, **data: results.append(
+                run(runner, suite, **data)
+            ),
+        ):
+            for _ in range(3):
+                task.f(*task.a, **task.kw)
+        spidermon.spider_closed(crawler.spider)
+    assert load_suite.call_count == 1
+    assert [len(result.monitor_results) for result in results] == [3, 3, 3]
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import pytest
 
 from spidermon.contrib.validation.translator import MessageTranslator
@@ -21,7 +23,62 @@ def message_translator():
         ("Simple Message", "Translated Simple Message"),
         ("email is a required property", "Missing Required Property"),
         ("Options: a, b, c", "Translated With Options: a, b, c"),
+        ("Other Options: a", "Translated With Options: a"),
+        ("Unknown Message", "Unknown Message"),
     ],
 )
-def test_message_translator(message_translator, original_message, translated_message):
-    assert message_translator.translate_message(original_message) == translated_message
+@pytest.mark.parametrize("combine_patterns", [True, False])
+def test_message_translator(
+    message_translator, original_message, translated_message, combine_patterns
+):
+    translator = type(
+        "CombineMessageTranslator",
+        (type(message_translator),),
+        {"combine_patterns": combine_patterns},
+    )()
+    assert (translator._combined_pattern is not None) == combine_patterns
+    assert translator.translate_message(original_message) == translated_message
+
+
+def test_message_translator_cache(message_translator):
+    for _ in range(3):
+        assert message_translator.translate_messages(
+            ["Simple Message", "Unknown Message"]
+        ) == ["Translated Simple Message", "Unknown Message"]
+    assert message_translator.cache_info() == (4, 2, 1024, 2)
+
+
+def test_message_translator_uses_first_matching_pattern():
+    class OrderedMessageTranslator(MessageTranslator):
+        messages = OrderedDict(
+            [
+                (r"value$", "Value"),
+                (r"^Invalid (?P<name>.+)$", "Invalid: {name}"),
+                (r"(?P<subject>\w+) is", "Is {subject}"),
+            ]
+        )
+
+    translator = OrderedMessageTranslator()
+    assert translator._combined_pattern is not None
+    assert translator.translate_message("Invalid value") == "Value"
+    assert translator.translate_message("Invalid field") == "Invalid: field"
+    assert translator.translate_message("The field is wrong") == "Is field"
+
+
+@pytest.mark.parametrize(
+    "messages",
+    [
+        {r"^(?P<a>x)$": "X", r"^(?P<a>y)$": "Y"},
+        {r"^(x)\1$": "X", r"^(y)$": "Y"},
+        {r"(?i)^x$": "X", r"^y$": "Y"},
+    ],
+)
+def test_message_translator_patterns_not_combined(messages):
+    class UncombinedMessageTranslator(MessageTranslator):
+        pass
+
+    UncombinedMessageTranslator.messages = messages
+    translator = UncombinedMessageTranslator()
+    assert translator._combined_pattern is None
+    assert translator.translate_message("y") == "Y"
+    assert translator.translate_message("z") == "z"
@@ -0,0 +1,99 @@
+from spidermon.utils.sketches import HeavyHitters, Reservoir
+
+
+def test_heavy_hitters_keeps_most_frequent_keys():
+    hitters = HeavyHitters(capacity=2)
+    for key in "aabacad":
+        hitters.add(key)
+    assert len(hitters) <= 2
+    assert hitters.most_common(1) == [("a", 4)]
+    assert hitters.total == 7
+    assert hitters.max_error <= 7 // 3
+
+
+def test_heavy_hitters_counts_are_exact_until_keys_are_discarded():
+    hitters = HeavyHitters(capacity=2)
+    hitters.add("a", value=0.5)
+    hitters.add("a", value=0.5)
+    hitters.add("b")
+    assert hitters.get("a") == (2, 1.0)
+    assert hitters.is_exact("a")
+
+    # No room for "c": every count is decreased by one and "b" is discarded
+    hitters.add("c")
+    assert "b" not in hitters
+    assert "c" not in hitters
+    # Counts of kept keys are not decreased
+    hitters.add("a", value=0.5)
+    assert hitters.get("a") == (3, 1.5)
+    assert hitters.is_exact("a")
+
+    # "b" may have been discarded before, so its count is not exact
+    hitters.add("b")
+    assert hitters.get("b") == (1, 0)
+    assert not hitters.is_exact("b")
+    assert hitters.pop("b") == (1, 0)
+    assert hitters.get("b") is None
+
+
+def test_reservoir_keeps_first_elements_until_full():
+    reservoir = Reservoir(size=3)
+    for element in "ab":
+        reservoir.add(element)
+    assert reservoir.samples == ["a", "b"]
+    assert reservoir.count == 2
+
+
+def test_reservoir_replaces_samples_with_decreasing_probability():
+    randoms = iter([0.9, 0.1, 0.6])
+    reservoir = Reservoir(size=2, random=lambda: next(randoms))
+    for element in "ab":
+        reservoir.add(element)
+    # Third element: slot int(0.9 * 3) = 2 is out of the reservoir
+    assert reservoir.next_slot() is None
+    # Fourth element: slot int(0.1 * 4) = 0
+    assert reservoir.next_slot() == 0
+    reservoir.put(0, "d")
+    # Fifth element: slot int(0.6 * 5) = 3 is out of the reservoir
+    reservoir.add("e")
+    assert reservoir.samples == ["d", "b"]
+    assert reservoir.count == 5
+
+
+def test_reservoir_sample_is_uniform():
+    counts = [0] * 10
+    for _ in range(2000):
+        reservoir = Reservoir(size=2)
+        for element in range(10):
+            reservoir.add(element)
+        for element in reservoir.samples:
+            counts[element] += 1
+    # Every element is expected 400 times
+    assert all(300 < count < 500 for count in counts)
+
+
+def test_reservoir_merge_keeps_all_samples_if_they_fit():
+    reservoir = Reservoir(size=3)
+    reservoir.add("a")
+    other = Reservoir(size=3)
+    other.add("b")
+    reservoir.merge(other)
+    assert sorted(reservoir.samples) == ["a", "b"]
+    assert reservoir.count == 2
+
+
+def test_reservoir_merged_sample_is_uniform():
+    counts = [0] * 10
+    for _ in range(2000):
+        reservoir, other = Reservoir(size=2), Reservoir(size=2)
+        for element in range(8):
+            reservoir.add(element)
+        for element in range(8, 10):
+            other.add(element)
+        reservoir.merge(other)
+        assert len(reservoir.samples) == 2
+        assert reservoir.count == 10
+        for element in reservoir.samples:
+            counts[element] += 1
+    # Every element is expected 400 times
+    assert all(300 < count < 500 for count in counts)
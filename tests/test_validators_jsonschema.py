@@ -2,18 +2,27 @@
 from __future__ import absolute_import
 from unittest import TestCase
 
-from spidermon.contrib.validation import JSONSchemaValidator
+from spidermon.contrib.validation import (
+    ColumnarJSONSchemaValidator,
+    CompiledJSONSchemaValidator,
+    JSONSchemaValidator,
+)
 from spidermon.contrib.validation import messages
+from spidermon.contrib.validation.jsonschema.compiler import CompiledSchema
 
+import pytest
 from slugify import slugify
+import json
+from collections import defaultdict
+from decimal import Decimal
 import six
 
 
 class SchemaTestCaseMetaclass(type):
     def __new__(mcs, name, bases, attrs):
-        def _test_function(data_test):
+        def _test_function(data_test, validator_class):
             def _function(self):
-                validator = JSONSchemaValidator(data_test.schema or self.schema)
+                validator = validator_class(data_test.schema or self.schema)
                 assert validator.validate(data_test.data) == (
                     data_test.valid,
                     data_test.expected_errors,
@@ -21,10 +30,33 @@ class SchemaTestCaseMetaclass(type):
 
             return _function
 
+        def _test_compiled_function(data_test):
+            def _function(self):
+                schema = data_test.schema or self.schema
+                validator = CompiledJSONSchemaValidator(
+                    schema, use_default_translator=False
+                )
+                assert isinstance(validator._validator, CompiledSchema)
+                # Untranslated messages and their order must be the same too
+                expected = JSONSchemaValidator(schema, use_default_translator=False)
+                assert validator.validate(data_test.data) == expected.validate(
+                    data_test.data
+                )
+
+            return _function
+
         cls = super(SchemaTestCaseMetaclass, mcs).__new__(mcs, name, bases, attrs)
         for dt in getattr(cls, "data_tests", []):
             function_name = "test_%s" % slugify(dt.name, separator="_").lower()
-            setattr(cls, function_name, _test_function(dt))
+            setattr(cls, function_name, _test_function(dt, JSONSchemaValidator))
+            setattr(
+                cls,
+                function_name + "_compiled",
+                _test_function(dt, CompiledJSONSchemaValidator),
+            )
+            setattr(
+                cls, function_name + "_compiled_messages", _test_compiled_function(dt)
+            )
         return cls
 
 
@@ -1628,3 +1660,299 @@ class Unique(SchemaTest):
             expected_errors={"": [messages.NOT_UNIQUE]},
         ),
     ]
+
+
+def test_validator_is_built_once_per_schema(mocker):
+    import spidermon.contrib.validation.jsonschema.validator as jsonschema_validator
+
+    spy = mocker.spy(jsonschema_validator, "validator_for")
+    schema = {
+        "type": "object",
+        "definitions": {"positive": {"type": "number", "minimum": 0}},
+        "properties": {"price": {"$ref": "#/definitions/positive"}},
+        "required": ["price"],
+    }
+    validator = JSONSchemaValidator(schema)
+    assert validator.validate({"price": 1}) == (True, {})
+    assert validator.validate({"price": -1}) == (
+        False,
+        {"price": [messages.NUMBER_TOO_LOW]},
+    )
+    assert validator.validate({}) == (
+        False,
+        {"price": [messages.MISSING_REQUIRED_FIELD]},
+    )
+    assert spy.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "validator_class", [JSONSchemaValidator, CompiledJSONSchemaValidator]
+)
+def test_validator_can_be_pickled(validator_class):
+    import pickle
+
+    schema = {
+        "type": "object",
+        "properties": {"url": {"type": "string", "format": "url"}},
+        "required": ["url"],
+    }
+    validator = pickle.loads(pickle.dumps(validator_class(schema)))
+    assert validator.validate({"url": "http://example.com"}) == (True, {})
+    assert validator.validate({"url": "invalid"}) == (
+        False,
+        {"url": [messages.INVALID_URL]},
+    )
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        {"$schema": "http://json-schema.org/draft-03/schema#", "type": "object"},
+        {"properties": {"url": {"$ref": "http://example.com/url.json"}}},
+        {"properties": {"url": {"$id": "#url", "type": "string"}}},
+        {"properties": {"url": {"type": "url"}}},
+    ],
+)
+def test_compiled_validator_falls_back_to_jsonschema(schema):
+    validator = CompiledJSONSchemaValidator(schema)
+    assert not isinstance(validator._validator, CompiledSchema)
+    assert validator.validate(1) == JSONSchemaValidator(schema).validate(1)
+
+
+def test_compiled_validator_recursive_schema():
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "children": {"type": "array", "items": {"$ref": "#"}},
+        },
+        "required": ["name"],
+    }
+    validator = CompiledJSONSchemaValidator(schema)
+    assert isinstance(validator._validator, CompiledSchema)
+    data = {"name": "a", "children": [{"name": "b", "children": [{}, {"name": 1}]}]}
+    assert validator.validate(data) == (
+        False,
+        {
+            "children.0.children.0.name": [messages.MISSING_REQUIRED_FIELD],
+            "children.0.children.1.name": [messages.INVALID_STRING],
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "schema_test",
+    [cls for cls in SchemaTest.__subclasses__() if cls.data_tests],
+    ids=lambda cls: cls.__name__,
+)
+def test_columnar_validator_data_tests(schema_test):
+    pytest.importorskip("numpy")
+    data_tests = defaultdict(list)
+    for data_test in schema_test.data_tests:
+        schema = data_test.schema or schema_test.schema
+        data_tests[json.dumps(schema, sort_keys=True)].append(data_test)
+    for same_schema_tests in data_tests.values():
+        schema = same_schema_tests[0].schema or schema_test.schema
+        validator = ColumnarJSONSchemaValidator(schema)
+        results = validator.validate_batch([dt.data for dt in same_schema_tests])
+        assert results == [(dt.valid, dt.expected_errors) for dt in same_schema_tests]
+        for data_test in same_schema_tests:
+            assert validator.validate(data_test.data) == (
+                data_test.valid,
+                data_test.expected_errors,
+            )
+
+
+def test_columnar_validator_checks_simple_properties_by_columns():
+    pytest.importorskip("numpy")
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "minLength": 1},
+            "price": {"type": "number", "minimum": 0},
+            "currency": {"enum": ["EUR", "USD"]},
+            "sku": {"type": "string", "pattern": "^[0-9]+$"},
+            "images": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["name", "price"],
+    }
+    validator = ColumnarJSONSchemaValidator(schema)
+    columns = validator._validator.columns
+    assert [column.name for column in columns] == ["name", "price", "currency", "sku"]
+    batch = [
+        {"name": "a", "price": 1, "currency": "EUR", "sku": "1", "images": ["a"]},
+        {"name": "", "price": -1, "currency": "GBP", "sku": "a", "images": [1]},
+        {"price": Decimal("-1"), "images": "a"},
+        {"name": "b", "price": 2 ** 60},
+        None,
+    ]
+    expected = [
+        JSONSchemaValidator(schema, use_default_translator=False).validate(data)
+        for data in batch
+    ]
+    validator = ColumnarJSONSchemaValidator(schema, use_default_translator=False)
+    assert validator.validate_batch(batch) == expected
+    assert [ok for ok, _ in expected] == [True, False, False, True, False]
+
+
+@pytest.mark.parametrize(
+    "validator_class",
+    [JSONSchemaValidator, CompiledJSONSchemaValidator, ColumnarJSONSchemaValidator],
+)
+@pytest.mark.parametrize(
+    "fail_fast,expected_errors",
+    [
+        (
+            False,
+            {
+                "name": [messages.FIELD_TOO_SHORT],
+                "price": [messages.NUMBER_TOO_LOW],
+                "url": [messages.MISSING_REQUIRED_FIELD],
+            },
+        ),
+        (True, {"name": [messages.FIELD_TOO_SHORT]}),
+        (
+            frozenset([messages.NUMBER_TOO_LOW]),
+            {"name": [messages.FIELD_TOO_SHORT], "price": [messages.NUMBER_TOO_LOW]},
+        ),
+        (
+            frozenset([messages.INVALID_URL]),
+            {
+                "name": [messages.FIELD_TOO_SHORT],
+                "price": [messages.NUMBER_TOO_LOW],
+                "url": [messages.MISSING_REQUIRED_FIELD],
+            },
+        ),
+    ],
+)
+def test_validator_fail_fast(validator_class, fail_fast, expected_errors):
+    if not getattr(validator_class, "available", True):
+        pytest.skip("numpy is not installed")
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "minLength": 1},
+            "price": {"type": "number", "minimum": 0},
+            "url": {"type": "string", "format": "url"},
+        },
+        "required": ["name", "price", "url"],
+    }
+    validator = validator_class(schema)
+    validator.fail_fast = fail_fast
+    data = {"name": "", "price": -1}
+    assert validator.validate(data) == (False, expected_errors)
+    assert validator.validate_batch([data, data]) == [(False, expected_errors)] * 2
+    assert validator.validate({"name": "a", "price": 1, "url": "http://x.com"}) == (
+        True,
+        {},
+    )
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "http://example.com",
+        "HTTPS://EXAMPLE.COM/A",
+        "https://example.com/a b",
+        "https://example.com\n",
+        "https://example.com/a\nb",
+        "https://example.com\t",
+        "https://" + "a." * 30 + " x",
+        "/p/1",
+        "httpſ://example.com",
+        "http://example\u212a.com",
+        "ftps://127.0.0.1:21/x",
+        "john@example.com",
+        "john doe@example.com",
+        '"john\\ doe"@example.com',
+        "john@example",
+        "example.com",
+        "https://-example.com",
+        "https://example-.com/a",
+        "https://example.c0m",
+        "https://example.com:8080/a",
+        "https://example.com/\n",
+        "https://www.example.co.uk/?q=1",
+        "john..doe@example.com",
+        ".john@example.com",
+        "john.@example.com",
+        "john+tag@mail.example.org",
+        "JOHN@EXAMPLE.COM",
+    ],
+)
+def test_url_and_email_checkers_match_regexes(value):
+    from spidermon.contrib.validation import utils
+
+    for _ in range(2):
+        assert utils.is_valid_url(value) == (utils.URL_REGEX.match(value) is not None)
+        assert utils.is_valid_email(value) == (
+            utils.EMAIL_REGEX.match(value) is not None
+        )
+
+
+SLOW_PATTERN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "pattern": "^(a+)+$"},
+        "url": {"type": "string", "format": "url"},
+    },
+    "required": ["name"],
+}
+
+
+def test_timing_measures_keywords():
+    validator = JSONSchemaValidator(SLOW_PATTERN_SCHEMA)
+    data = {"name": "a" * 18 + "!", "url": "http://example.com"}
+    expected = validator.validate(data)
+    validator.enable_timing()
+    assert validator.validate(data) == expected
+    assert validator.validate({}) == (
+        False,
+        {"name": [messages.MISSING_REQUIRED_FIELD]},
+    )
+
+    timings = validator.timings
+    assert timings.items.count == 2
+    assert timings.items.max <= timings.items.total
+    assert {keyword: timing.count for keyword, timing in timings.keywords.items()} == {
+        ("type",): 4,
+        ("properties",): 2,
+        ("required",): 2,
+        ("pattern",): 1,
+        ("format", "url"): 1,
+    }
+    # Keywords do not include the time of the nested ones
+    pattern = timings.keywords[("pattern",)].total
+    assert timings.keywords[("properties",)].total < pattern / 10
+    assert pattern < timings.items.total
+
+
+def test_timing_measures_abandoned_keywords():
+    schema = {"anyOf": [{"type": "string"}, {"minimum": 0}]}
+    validator = JSONSchemaValidator(schema)
+    validator.enable_timing()
+    validator.fail_fast = True
+    assert validator.validate(-1)[0] is False
+    # Validation stops at the first error, before anyOf is resumed
+    assert validator.timings.keywords[("anyOf",)].count == 1
+    assert validator.timings.keywords[("type",)].count == 1
+    assert validator.timings.keywords[("minimum",)].count == 1
+    assert validator.timings._nested == []
+
+
+@pytest.mark.parametrize(
+    "validator_class", [CompiledJSONSchemaValidator, ColumnarJSONSchemaValidator]
+)
+def test_timing_of_validators_without_keywords(validator_class):
+    if not getattr(validator_class, "available", True):
+        pytest.skip("numpy is not installed")
+    validator = validator_class(SLOW_PATTERN_SCHEMA)
+    data = [{"name": "a"}, {"name": "b"}, {}]
+    expected = validator.validate_batch(data)
+    validator.enable_timing()
+    assert validator.validate_batch(data) == expected
+    assert validator.validate({}) == expected[2]
+    assert validator.timings.items.count == 4
+    assert validator.timings.items.total > 0
+    assert not validator.timings.keywords
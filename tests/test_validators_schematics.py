@@ -778,3 +778,55 @@ def test_validation_error_on_model_level_validation():
         data={"field_a": "some_data"},
         expected=(False, {"field_a": ["Model-level validation failed."]}),
     )
+
+
+def test_conversion_errors_do_not_change_model():
+    """
+    messages:
+        - INVALID_FLOAT
+        - MISSING_REQUIRED_FIELD
+    """
+
+    class Coordinates(Model):
+        latitude = FloatType(required=True)
+        longitude = FloatType(required=True)
+
+    class Data(Model):
+        latitude = FloatType(required=True)
+        coordinates = ModelType(Coordinates, required=True)
+
+    v = SchematicsValidator(Data)
+    assert v.validate({"latitude": "x", "coordinates": {"longitude": "y"}}) == (
+        False,
+        {
+            "latitude": [messages.INVALID_FLOAT],
+            "coordinates.longitude": [messages.INVALID_FLOAT],
+        }
+        if SCHEMATICS1
+        else {
+            "latitude": [messages.INVALID_FLOAT],
+            "coordinates.latitude": [messages.MISSING_REQUIRED_FIELD],
+            "coordinates.longitude": [messages.INVALID_FLOAT],
+        },
+    )
+    assert Data.latitude.required
+    assert Data.coordinates.required
+    assert v.validate({}) == (
+        False,
+        {
+            "latitude": [messages.MISSING_REQUIRED_FIELD],
+            "coordinates": [messages.MISSING_REQUIRED_FIELD],
+        },
+    )
+
+
+def test_fail_fast():
+    class Data(Model):
+        a = StringType(required=True)
+        b = StringType(required=True)
+
+    validator = SchematicsValidator(Data)
+    validator.fail_fast = True
+    ok, errors = validator.validate({})
+    assert not ok
+    assert list(errors.values()) == [[messages.MISSING_REQUIRED_FIELD]]